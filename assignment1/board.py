@@ -59,6 +59,8 @@ class GoBoard(object):
         self.maxpoint = size * size + 3 * (size + 1)
         self.board = np.full(self.maxpoint, BORDER, dtype=GO_POINT)
         self._initialize_empty_points(self.board)
+        # one record per play_move, for undo_move
+        self.undo_stack = []
 
     def copy(self):
         b = GoBoard(self.size)
@@ -70,6 +72,7 @@ class GoBoard(object):
         b.current_player = self.current_player
         assert b.maxpoint == self.maxpoint
         b.board = np.copy(self.board)
+        b.undo_stack = list(self.undo_stack)
         return b
 
     def get_color(self, point):
@@ -80,13 +83,11 @@ class GoBoard(object):
 
     def is_legal(self, point, color):
         """
-        Check whether it is legal for color to play on point
-        This method tries to play the move on a temporary copy of the board.
-        This prevents the board from being modified by the move
+        Check whether it is legal for color to play on point.
+        The same test as in play_move, without playing the move.
         """
-        board_copy = self.copy()
-        can_play_move = board_copy.play_move(point, color)
-        return can_play_move
+        assert is_black_white(color)
+        return self.board[point] == EMPTY and color == self.current_player
 
     def get_empty_points(self):
         """
@@ -208,11 +209,21 @@ class GoBoard(object):
         if color != self.current_player:
             return False
 
+        self.undo_stack.append((point, self.last_move, self.current_player))
         self.board[point] = color
         self.current_player = GoBoardUtil.opponent(color)
         self.last_move = point
         return True
 
+    def undo_move(self):
+        """
+        Take back the last move of play_move.
+        The moves of this board capture nothing, so the stone, the last move
+        and the player to move are all there is to restore.
+        """
+        point, self.last_move, self.current_player = self.undo_stack.pop()
+        self.board[point] = EMPTY
+
     def neighbors_of_color(self, point, color):
         """ List of neighbors of point of given color """
         nbc = []
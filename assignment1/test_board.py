@@ -50,6 +50,21 @@ class SimpleGoBoardTestCase(unittest.TestCase):
         count = count_colors(goboard)
         self.assertEqual(count, [size * size - 1, 1, 0, 3 * (size + 1)])
 
+    def test_undo_move(self):
+        goboard = GoBoard(7)
+        goboard.play_move(goboard.pt(4, 4), BLACK)
+        start = goboard.copy()
+        goboard.play_move(goboard.pt(4, 5), WHITE)
+        goboard.play_move(goboard.pt(3, 3), BLACK)
+        goboard.undo_move()
+        goboard.undo_move()
+        self.assertTrue(np.array_equal(goboard.board, start.board))
+        self.assertEqual(goboard.last_move, goboard.pt(4, 4))
+        self.assertEqual(goboard.current_player, WHITE)
+        start.undo_move()
+        self.assertEqual(count_colors(start), [49, 0, 0, 3 * 8])
+        self.assertEqual(start.current_player, BLACK)
+
 
 """Utility"""
 def count_colors(goboard):
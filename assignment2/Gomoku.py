@@ -6,7 +6,8 @@ import signal
 from gtp_connection import GtpConnection, color_to_string, format_point, point_to_coord
 from board_util import GoBoardUtil
 from board import GoBoard
-from alphabeta import call_alphabeta
+from alphabeta import call_alphabeta, SearchStats
+from tablebase import TableBase, WIN, LOSS
 
 def handler(signum, frame):
     raise TimeoutException
@@ -32,8 +33,17 @@ class Gomoku():
         """
         self.name = "GomokuAssignment2"
         self.version = 2.0
+        # statistics of the last search, see search_stats
+        self.last_stats = None
+        self.tablebase = TableBase.load()
 
     def get_move(self, board, color, timelimit, tTable, hasher):
+        move = self.tablebase.best_move(board)
+        if move is not None:
+            self.last_stats = SearchStats()
+            self.last_stats.tablebase_hit = True
+            return move
+
         outcome, move = self.solve(board, timelimit, tTable, hasher)
 
         if move is not None:
@@ -43,10 +53,15 @@ class Gomoku():
 
     def solve(self, board, timelimit, tTable, hasher):
         # print(tTable.returnTable())
+        entry = self.tablebase.probe(board)
+        if entry is not None:
+            return self.solve_from_tablebase(board, entry[0])
+
         board_copy = board.copy()
+        self.last_stats = SearchStats()
         signal.alarm(timelimit)  # sets an alarm for the given time_limit
         try:
-            score, move = call_alphabeta(board, tTable, hasher)
+            score, move = call_alphabeta(board, tTable, hasher, self.last_stats)
 
             if score == 0:
                 return "draw", move
@@ -65,6 +80,17 @@ class Gomoku():
         finally:
             signal.alarm(0)  # disable the alarm
 
+    def solve_from_tablebase(self, board, value):
+        self.last_stats = SearchStats()
+        self.last_stats.tablebase_hit = True
+        if value == LOSS:
+            winner = GoBoardUtil.opponent(board.current_player)
+            return color_to_string(winner), None
+        move = self.tablebase.best_move(board)
+        if value == WIN:
+            return color_to_string(board.current_player), move
+        return "draw", move
+
 
 def run():
     """
@@ -64,7 +64,8 @@ class GtpConnection:
             "gogui-rules_side_to_move": self.gogui_rules_side_to_move_cmd,
             "gogui-rules_board": self.gogui_rules_board_cmd,
             "gogui-rules_final_result": self.gogui_rules_final_result_cmd,
-            "gogui-analyze_commands": self.gogui_analyze_cmd
+            "gogui-analyze_commands": self.gogui_analyze_cmd,
+            "search_stats": self.search_stats_cmd
         }
 
         # used for argument checking
@@ -365,8 +366,19 @@ class GtpConnection:
                      "pstring/Board Size/gogui-rules_board_size\n"
                      "pstring/Rules GameID/gogui-rules_game_id\n"
                      "pstring/Show Board/gogui-rules_board\n"
+                     "string/Search Statistics/search_stats\n"
                      )
 
+    def search_stats_cmd(self, args):
+        """
+        Report the statistics of the last genmove/solve search.
+        """
+        stats = getattr(self.go_engine, "last_stats", None)
+        if stats is None:
+            self.respond("no search")
+        else:
+            self.respond(str(stats))
+
 
 
 def point_to_coord(point, boardsize):
@@ -0,0 +1,409 @@
+"""
+tablebase.py
+
+Retrograde endgame tablebase for small Gomoku boards (5x5 and 6x6).
+
+Every position reachable from a seed position is enumerated ply by ply,
+reduced to a canonical key under the 8 symmetries of the board, and then
+solved backwards starting from the terminal positions. A table is stored as
+- keys: sorted canonical keys of all positions (the index)
+- values: packed 2-bit results for the side to move (WIN, LOSS, DRAW)
+- distances: number of plies to the end of the game under optimal play
+
+A canonical key is the board read as a base-3 number (EMPTY=0, BLACK=1,
+WHITE=2, one digit per point in row-major order) times 2, plus 1 if WHITE
+is to move. For boards up to 6x6 this is exact and fits in 64 bits.
+
+The seed positions of the tables in tablebases/ are the solve positions of
+tablebase-seeds.gtp; a seed may have at most --max-empty empty points.
+
+Usage:
+    python3 tablebase.py --gtp tablebase-seeds.gtp [--max-empty N] [--out DIR]
+    python3 tablebase.py --size 5 --moves "b c3 w d4 ..." [--max-empty N]
+"""
+
+import argparse
+import os
+import numpy as np
+from board_util import BLACK, WHITE, EMPTY, PASS, coord_to_point
+from board import GoBoard
+
+# result for the side to move, 2 bits each. 0 means "not in the table"
+UNKNOWN = 0
+WIN = 1
+LOSS = 2
+DRAW = 3
+
+MIN_TABLE_SIZE = 5
+MAX_TABLE_SIZE = 6
+DEFAULT_MAX_EMPTY = 14
+TABLEBASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tablebases")
+
+
+def _symmetries(size):
+    """
+    Return an (8, size*size) array. Row s maps every point index (row-major,
+    unpadded) to its image under the s-th symmetry of the square.
+    """
+    n = size - 1
+    maps = [
+        lambda r, c: (r, c),
+        lambda r, c: (c, n - r),
+        lambda r, c: (n - r, n - c),
+        lambda r, c: (n - c, r),
+        lambda r, c: (r, n - c),
+        lambda r, c: (n - r, c),
+        lambda r, c: (c, r),
+        lambda r, c: (n - c, n - r),
+    ]
+    perms = np.zeros((8, size * size), dtype=np.int64)
+    for s, f in enumerate(maps):
+        for p in range(size * size):
+            r, c = f(p // size, p % size)
+            perms[s, p] = r * size + c
+    return perms
+
+
+def _lines_through(size):
+    """
+    For every point index, the lines of five (as lists of point indices)
+    that contain it, without the point itself.
+    """
+    lines = [[] for _ in range(size * size)]
+    for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        for r in range(size):
+            for c in range(size):
+                end_r = r + 4 * dr
+                end_c = c + 4 * dc
+                if not (0 <= end_r < size and 0 <= end_c < size):
+                    continue
+                line = [(r + i * dr) * size + (c + i * dc) for i in range(5)]
+                for p in line:
+                    lines[p].append([q for q in line if q != p])
+    return lines
+
+
+def pack_values(values):
+    """ Pack an array of 2-bit values, four per byte """
+    padded = np.zeros(-(-len(values) // 4) * 4, dtype=np.uint8)
+    padded[:len(values)] = values
+    padded = padded.reshape(-1, 4)
+    return padded[:, 0] | (padded[:, 1] << 2) | (padded[:, 2] << 4) | (padded[:, 3] << 6)
+
+
+def unpack_values(packed, count):
+    """ Inverse of pack_values """
+    shifts = np.array([0, 2, 4, 6], dtype=np.uint8)
+    values = (packed[:, None] >> shifts[None, :]) & 3
+    return values.reshape(-1)[:count]
+
+
+class Geometry(object):
+    """
+    Precomputed symmetry and line tables for one board size.
+    """
+    def __init__(self, size):
+        assert MIN_TABLE_SIZE <= size <= MAX_TABLE_SIZE
+        self.size = size
+        self.points = size * size
+        self.pow3 = 3 ** np.arange(self.points, dtype=np.int64)
+        # sym_pow[s, p]: weight of point p in the key of the s-th image
+        self.sym_pow = self.pow3[_symmetries(size)]
+        self.lines = _lines_through(size)
+
+    def cells(self, board):
+        """ The unpadded row-major contents of a GoBoard """
+        cells = np.zeros(self.points, dtype=np.int64)
+        for row in range(self.size):
+            start = board.row_start(row + 1)
+            cells[row * self.size:(row + 1) * self.size] = board.board[start:start + self.size]
+        return cells
+
+    def key(self, cells, to_move):
+        """ Canonical key of a single position """
+        base = int((self.sym_pow @ cells).min())
+        return base * 2 + (1 if to_move == WHITE else 0)
+
+    def decode(self, keys):
+        """ Cells (N, points) and color to move (N,) of an array of keys """
+        base = keys // 2
+        cells = (base[:, None] // self.pow3[None, :]) % 3
+        to_move = np.where(keys % 2 == 1, WHITE, BLACK)
+        return cells, to_move
+
+    def children(self, keys):
+        """
+        Generate all moves from every position in keys.
+        Yields (parent_index, child_key, wins) per point, where wins
+        is True if the move makes five in a row.
+        """
+        cells, to_move = self.decode(keys)
+        sym_keys = cells @ self.sym_pow.T
+        side_flip = np.where(to_move == WHITE, 0, 1)
+        for p in range(self.points):
+            parents = np.nonzero(cells[:, p] == EMPTY)[0]
+            if len(parents) == 0:
+                continue
+            color = to_move[parents]
+            child_sym = sym_keys[parents] + color[:, None] * self.sym_pow[None, :, p]
+            child_keys = child_sym.min(axis=1) * 2 + side_flip[parents]
+            wins = np.zeros(len(parents), dtype=bool)
+            sub = cells[parents]
+            for others in self.lines[p]:
+                wins |= np.all(sub[:, others] == color[:, None], axis=1)
+            yield parents, child_keys, wins
+
+
+class Table(object):
+    """
+    A solved set of positions for one board size.
+    """
+    def __init__(self, size, keys, values, distances):
+        self.size = size
+        self.keys = keys
+        self.values = values
+        self.distances = distances
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, key):
+        i = int(np.searchsorted(self.keys, key))
+        if i == len(self.keys) or self.keys[i] != key:
+            return None
+        value = (int(self.values[i >> 2]) >> ((i & 3) * 2)) & 3
+        return value, int(self.distances[i])
+
+    def save(self, path):
+        np.savez_compressed(path, size=self.size, keys=self.keys,
+                            values=self.values, distances=self.distances)
+
+    @staticmethod
+    def load(path):
+        data = np.load(path)
+        return Table(int(data["size"]), data["keys"], data["values"], data["distances"])
+
+    @staticmethod
+    def merge(a, b):
+        assert a.size == b.size
+        keys = np.concatenate([a.keys, b.keys])
+        values = np.concatenate([unpack_values(a.values, len(a)),
+                                 unpack_values(b.values, len(b))])
+        distances = np.concatenate([a.distances, b.distances])
+        keys, index = np.unique(keys, return_index=True)
+        return Table(a.size, keys, pack_values(values[index]), distances[index])
+
+
+def build(board, max_empty=DEFAULT_MAX_EMPTY):
+    """
+    Enumerate and solve every position reachable from board.
+    Returns a Table.
+    """
+    geometry = Geometry(board.size)
+    cells = geometry.cells(board)
+    empty = int(np.count_nonzero(cells == EMPTY))
+    if empty > max_empty:
+        raise ValueError("position has {} empty points, limit is {}".format(empty, max_empty))
+
+    # forward pass: one array of unique keys per ply, plus terminal flags
+    root = np.array([geometry.key(cells, board.current_player)], dtype=np.int64)
+    root_five = board.detect_five_in_a_row() != EMPTY
+    layers = [root]
+    fives = [np.array([root_five])]
+    terminal = [np.array([root_five or empty == 0])]
+    while not terminal[-1].all():
+        live = layers[-1][~terminal[-1]]
+        child_keys = []
+        child_wins = []
+        for _, keys, wins in geometry.children(live):
+            child_keys.append(keys)
+            child_wins.append(wins)
+        keys = np.concatenate(child_keys)
+        wins = np.concatenate(child_wins)
+        order = np.argsort(keys, kind="stable")
+        keys, first = np.unique(keys[order], return_index=True)
+        wins = np.maximum.reduceat(wins[order], first)
+        full = (empty - len(layers)) == 0
+        layers.append(keys)
+        fives.append(wins)
+        terminal.append(wins | full)
+
+    # backward pass, from the last ply to the root
+    values = [None] * len(layers)
+    distances = [None] * len(layers)
+    for ply in range(len(layers) - 1, -1, -1):
+        keys = layers[ply]
+        n = len(keys)
+        value = np.full(n, DRAW, dtype=np.uint8)
+        distance = np.zeros(n, dtype=np.int64)
+        done = terminal[ply]
+        # a terminal position was reached by a move that either made
+        # five (side to move lost) or filled the board (draw)
+        value[fives[ply]] = LOSS
+
+        live = np.nonzero(~done)[0]
+        if len(live) > 0:
+            win_dist = np.full(len(live), np.iinfo(np.int64).max)
+            draw_dist = np.full(len(live), np.iinfo(np.int64).max)
+            loss_dist = np.zeros(len(live), dtype=np.int64)
+            next_keys = layers[ply + 1]
+            for parents, child_keys, _ in geometry.children(keys[live]):
+                i = np.searchsorted(next_keys, child_keys)
+                child_value = values[ply + 1][i]
+                child_dist = distances[ply + 1][i] + 1
+                is_loss = child_value == LOSS
+                np.minimum.at(win_dist, parents[is_loss], child_dist[is_loss])
+                is_draw = child_value == DRAW
+                np.minimum.at(draw_dist, parents[is_draw], child_dist[is_draw])
+                is_win = child_value == WIN
+                np.maximum.at(loss_dist, parents[is_win], child_dist[is_win])
+            can_win = win_dist < np.iinfo(np.int64).max
+            can_draw = ~can_win & (draw_dist < np.iinfo(np.int64).max)
+            value[live] = np.where(can_win, WIN, np.where(can_draw, DRAW, LOSS))
+            distance[live] = np.where(can_win, win_dist, np.where(can_draw, draw_dist, loss_dist))
+        values[ply] = value
+        distances[ply] = distance
+
+    # plies never share a position (each move adds a stone),
+    # so the keys stay unique after concatenation
+    keys = np.concatenate(layers)
+    order = np.argsort(keys)
+    values = np.concatenate(values)[order]
+    distances = np.minimum(np.concatenate(distances)[order], 255).astype(np.uint8)
+    return Table(board.size, keys[order], pack_values(values), distances)
+
+
+class TableBase(object):
+    """
+    All tables available to the player, one per board size.
+    """
+    def __init__(self):
+        self.tables = {}
+        self.geometry = {}
+
+    @staticmethod
+    def load(directory=TABLEBASE_DIR):
+        tablebase = TableBase()
+        if not os.path.isdir(directory):
+            return tablebase
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".npz"):
+                tablebase.add(Table.load(os.path.join(directory, name)))
+        return tablebase
+
+    def add(self, table):
+        if table.size in self.tables:
+            table = Table.merge(self.tables[table.size], table)
+        self.tables[table.size] = table
+
+    def _geometry(self, size):
+        if size not in self.geometry:
+            self.geometry[size] = Geometry(size)
+        return self.geometry[size]
+
+    def probe(self, board):
+        """
+        Look up the current position.
+        Returns (value, distance) for the side to move, or None.
+        """
+        table = self.tables.get(board.size)
+        if table is None:
+            return None
+        geometry = self._geometry(board.size)
+        key = geometry.key(geometry.cells(board), board.current_player)
+        return table.lookup(key)
+
+    def best_move(self, board):
+        """
+        The best move in a tabled position: the fastest win, else a draw,
+        else the slowest loss. Returns None if the position is not tabled.
+        """
+        if self.probe(board) is None:
+            return None
+        color = board.current_player
+        best, best_rank = None, None
+        for move in board.get_empty_points():
+            board.play_move(move, color)
+            entry = self.probe(board)
+            board.undo_move(move)
+            if entry is None:
+                continue
+            value, distance = entry
+            if value == LOSS:
+                rank = (0, distance)
+            elif value == DRAW:
+                rank = (1, distance)
+            else:
+                rank = (2, -distance)
+            if best_rank is None or rank < best_rank:
+                best, best_rank = move, rank
+        return best
+
+
+def _positions_from_gtp(filename):
+    """
+    Replay a .gtp regression file and yield the board before
+    every solve or genmove command.
+    """
+    from gtp_connection import move_to_coord, color_to_int
+    board = GoBoard(7)
+    with open(filename) as f:
+        for line in f:
+            elements = line.split("#")[0].split()
+            if elements and elements[0].isdigit():
+                elements = elements[1:]
+            if not elements:
+                continue
+            command, args = elements[0], elements[1:]
+            if command == "boardsize":
+                board = GoBoard(int(args[0]))
+            elif command == "clear_board":
+                board.reset(board.size)
+            elif command == "play":
+                coord = move_to_coord(args[1], board.size)
+                move = PASS if coord == PASS else coord_to_point(coord[0], coord[1], board.size)
+                board.play_move(move, color_to_int(args[0].lower()))
+            elif command in ("solve", "genmove"):
+                yield board.copy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build Gomoku endgame tablebases.")
+    parser.add_argument("--gtp", help="build tables for the positions in a .gtp test file")
+    parser.add_argument("--size", type=int, default=5)
+    parser.add_argument("--moves", default="", help='moves from the empty board, e.g. "b c3 w d4"')
+    parser.add_argument("--max-empty", type=int, default=DEFAULT_MAX_EMPTY)
+    parser.add_argument("--out", default=TABLEBASE_DIR)
+    args = parser.parse_args()
+
+    if args.gtp:
+        seeds = list(_positions_from_gtp(args.gtp))
+    else:
+        from gtp_connection import move_to_coord, color_to_int
+        board = GoBoard(args.size)
+        tokens = args.moves.split()
+        for color, point in zip(tokens[::2], tokens[1::2]):
+            row, col = move_to_coord(point, board.size)
+            board.play_move(coord_to_point(row, col, board.size), color_to_int(color.lower()))
+        seeds = [board]
+
+    tablebase = TableBase.load(args.out)
+    for board in seeds:
+        if not MIN_TABLE_SIZE <= board.size <= MAX_TABLE_SIZE:
+            continue
+        empty = len(board.get_empty_points())
+        if empty > args.max_empty:
+            print("skipping {}x{} position with {} empty points".format(board.size, board.size, empty))
+            continue
+        table = build(board, args.max_empty)
+        print("{}x{}: {} positions".format(board.size, board.size, len(table)))
+        tablebase.add(table)
+
+    if not os.path.isdir(args.out):
+        os.makedirs(args.out)
+    for size, table in tablebase.tables.items():
+        table.save(os.path.join(args.out, "tablebase{}.npz".format(size)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/local/bin/python3
+# /usr/bin/python3
+# Set the path to your python3 above
+
+import os
+import random
+import unittest
+import numpy as np
+from board_util import BLACK, WHITE, EMPTY
+from board import GoBoard
+from alphabeta import call_alphabeta, SearchStats
+from transpositiontable import TranspositionTable, ZobristHasher
+import tablebase
+from tablebase import TableBase, WIN, LOSS, DRAW
+from Gomoku import Gomoku
+
+SEEDS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tablebase-seeds.gtp")
+
+
+class TableBaseTestCase(unittest.TestCase):
+    """Tests for tablebase.py, using alphabeta as ground truth"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.board = GoBoard(5)
+        for row, col in [(3, 2), (2, 2), (3, 3), (2, 3), (3, 4), (4, 4),
+                         (1, 1), (5, 5), (2, 4), (1, 5), (4, 2), (5, 2),
+                         (4, 3)]:
+            cls.board.play_move(cls.board.pt(row, col), cls.board.current_player)
+        cls.table = tablebase.build(cls.board)
+        cls.tablebase = TableBase()
+        cls.tablebase.add(cls.table)
+
+    def test_pack_values(self):
+        values = np.array([WIN, LOSS, DRAW, 0, DRAW, WIN], dtype=np.uint8)
+        packed = tablebase.pack_values(values)
+        self.assertEqual(len(packed), 2)
+        self.assertTrue(np.array_equal(tablebase.unpack_values(packed, 6), values))
+
+    def test_table_has_decisive_results(self):
+        values = tablebase.unpack_values(self.table.values, len(self.table))
+        counts = np.bincount(values, minlength=4)
+        self.assertEqual(counts[0], 0)
+        self.assertGreater(counts[WIN], 0)
+        self.assertGreater(counts[LOSS], 0)
+
+    def test_symmetric_positions_share_entry(self):
+        mirror = GoBoard(5)
+        for row in range(1, 6):
+            for col in range(1, 6):
+                color = self.board.get_color(self.board.pt(row, col))
+                if color != EMPTY:
+                    mirror.board[mirror.pt(row, 6 - col)] = color
+        mirror.current_player = self.board.current_player
+        self.assertEqual(self.tablebase.probe(mirror), self.tablebase.probe(self.board))
+
+    def test_matches_alphabeta(self):
+        rng = random.Random(455)
+        for _ in range(25):
+            board = self.board.copy()
+            moves = list(board.get_empty_points())
+            rng.shuffle(moves)
+            for move in moves[:rng.randint(2, 6)]:
+                if board.end_of_game():
+                    break
+                board.play_move(move, board.current_player)
+            value, _ = self.tablebase.probe(board)
+            if board.end_of_game():
+                continue
+            score, _ = call_alphabeta(board, TranspositionTable(), ZobristHasher(5))
+            expected = DRAW if score == 0 else (WIN if score > 0 else LOSS)
+            self.assertEqual(value, expected)
+
+    def test_best_move_wins(self):
+        rng = random.Random(7)
+        while True:
+            board = self.board.copy()
+            moves = list(board.get_empty_points())
+            rng.shuffle(moves)
+            for move in moves[:rng.randint(1, 4)]:
+                if board.end_of_game():
+                    break
+                board.play_move(move, board.current_player)
+            value, distance = self.tablebase.probe(board)
+            if value == WIN:
+                break
+        move = self.tablebase.best_move(board)
+        board.play_move(move, board.current_player)
+        self.assertEqual(self.tablebase.probe(board), (LOSS, distance - 1))
+
+    def test_solve_reports_tablebase_hit(self):
+        engine = Gomoku()
+        engine.tablebase = self.tablebase
+        engine.last_stats = SearchStats()
+        engine.last_stats.nodes = 1000
+        engine.solve(self.board, 1, TranspositionTable(), ZobristHasher(5))
+        self.assertTrue(engine.last_stats.tablebase_hit)
+        self.assertEqual(engine.last_stats.nodes, 0)
+        self.assertIn("tablebase_hit 1", str(engine.last_stats))
+
+    def test_solve_from_built_table(self):
+        engine = Gomoku()
+        self.assertEqual(sorted(engine.tablebase.tables), [5, 6])
+        # the 5x5 table is built from the position of these tests
+        board = next(b for b in tablebase._positions_from_gtp(SEEDS) if b.size == 5)
+        self.assertTrue(np.array_equal(board.board, self.board.board))
+        self.assertTrue(np.array_equal(engine.tablebase.tables[5].keys, self.table.keys))
+        outcome, move = engine.solve(board, 1, TranspositionTable(), ZobristHasher(5))
+        self.assertTrue(engine.last_stats.tablebase_hit)
+        self.assertEqual(outcome, "draw")
+        self.assertEqual(move, board.pt(1, 2))
+
+
+"""Main"""
+if __name__ == "__main__":
+    unittest.main()
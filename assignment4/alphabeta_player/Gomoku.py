@@ -2,19 +2,11 @@
 # /usr/bin/python3
 # Set the path to your python3 above
 
-import signal
 from gtp_connection import GtpConnection, color_to_string, format_point, point_to_coord
 from board_util import GoBoardUtil
 from board import GoBoard
-from alphabeta import call_alphabeta
-
-def handler(signum, frame):
-    raise TimeoutException
-
-class TimeoutException(Exception):
-    pass
-
-signal.signal(signal.SIGALRM, handler)
+from alphabeta import call_alphabeta, SearchStats
+from time_manager import TimeManager, TimeUp
 
 
 class Gomoku():
@@ -32,6 +24,8 @@ class Gomoku():
         """
         self.name = "GomokuAssignment2"
         self.version = 2.0
+        # statistics of the last search, see search_stats
+        self.last_stats = None
 
     def get_move(self, board, color, timelimit, tTable, hasher):
         outcome, move = self.solve(board, timelimit, tTable, hasher)
@@ -44,9 +38,10 @@ class Gomoku():
     def solve(self, board, timelimit, tTable, hasher):
         # print(tTable.returnTable())
         board_copy = board.copy()
-        signal.alarm(timelimit)  # sets an alarm for the given time_limit
+        self.last_stats = SearchStats()
+        time_manager = TimeManager(timelimit)
         try:
-            score, move = call_alphabeta(board, tTable, hasher)
+            score, move = call_alphabeta(board, tTable, hasher, self.last_stats, time_manager)
 
             if score == 0:
                 return "draw", move
@@ -59,11 +54,9 @@ class Gomoku():
                     # We only display the move if the current player wins
                     return color_to_string(winner), None
 
-        except TimeoutException:
+        except TimeUp:
             board.load(board_copy)
             return "unknown", None
-        finally:
-            signal.alarm(0)  # disable the alarm
 
 
 def run():
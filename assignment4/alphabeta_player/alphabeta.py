@@ -1,13 +1,56 @@
-
+import time
 from board_util import GoBoardUtil
 INFINITY = 100000
 
 
-def alphabeta(state, alpha, beta, tt, hasher):
+class SearchStats:
+    """
+    Counters of one search, reported by the search_stats GTP command.
+    """
+    def __init__(self):
+        self.nodes = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.max_depth = 0
+        # cutoffs[i]: number of beta cutoffs caused by the i-th move tried
+        self.cutoffs = []
+        self.seconds = 0.0
+
+    def branching_factor(self):
+        """ Effective branching factor b with b ** max_depth = nodes """
+        if self.max_depth == 0:
+            return 0.0
+        return self.nodes ** (1 / self.max_depth)
+
+    def __str__(self):
+        total = sum(self.cutoffs)
+        cutoffs = " ".join("{}:{}".format(i + 1, n) for i, n in enumerate(self.cutoffs) if n)
+        first = self.cutoffs[0] / total if total else 0
+        lines = [
+            "nodes {}".format(self.nodes),
+            "nodes_per_second {:.0f}".format(self.nodes / self.seconds if self.seconds > 0 else 0),
+            "tt_probes {}".format(self.tt_probes),
+            "tt_hits {}".format(self.tt_hits),
+            "max_depth {}".format(self.max_depth),
+            "cutoffs {} (first move {:.0%})".format(total, first),
+            "cutoffs_by_move {}".format(cutoffs),
+            "branching_factor {:.2f}".format(self.branching_factor()),
+        ]
+        return "\n".join(lines)
+
+
+def alphabeta(state, alpha, beta, tt, hasher, stats, time_manager=None, depth=0):
+    stats.nodes += 1
+    if time_manager is not None:
+        time_manager.check(stats.nodes)
+    if depth > stats.max_depth:
+        stats.max_depth = depth
     hashCode = hasher.hash(GoBoardUtil.get_oneD_board(state))
+    stats.tt_probes += 1
     result = tt.lookup(hashCode)
 
     if result is not None:
+        stats.tt_hits += 1
         return result
 
     if state.end_of_game():
@@ -18,15 +61,19 @@ def alphabeta(state, alpha, beta, tt, hasher):
     moves = state.get_best_moves()
     best_move = moves[0]
 
-    for m in moves:
+    for i, m in enumerate(moves):
         state.play_move(m, state.current_player)
-        value, _ = alphabeta(state, -beta, -alpha, tt, hasher)
+        value, _ = alphabeta(state, -beta, -alpha, tt, hasher, stats, time_manager, depth + 1)
         value = -value
         if value > alpha:
             alpha = value
             best_move = m
         state.undo_move(m)
         if value >= beta:
+            cutoffs = stats.cutoffs
+            if i >= len(cutoffs):
+                cutoffs.extend([0] * (i + 1 - len(cutoffs)))
+            cutoffs[i] += 1
             result = beta, m
             storeResult(tt, hashCode, result)
             return result
@@ -37,8 +84,15 @@ def alphabeta(state, alpha, beta, tt, hasher):
 
 
 # initial call with full window
-def call_alphabeta(rootState, tt, hasher):
-    return alphabeta(rootState, -INFINITY, INFINITY, tt, hasher)
+# time_manager raises TimeUp when the time is up
+def call_alphabeta(rootState, tt, hasher, stats=None, time_manager=None):
+    if stats is None:
+        stats = SearchStats()
+    start = time.perf_counter()
+    try:
+        return alphabeta(rootState, -INFINITY, INFINITY, tt, hasher, stats, time_manager)
+    finally:
+        stats.seconds += time.perf_counter() - start
 
 
 def storeResult(tt, code, result):
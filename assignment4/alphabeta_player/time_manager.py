@@ -0,0 +1,90 @@
+"""
+time_manager.py
+
+Time management for the searches, replacing the SIGALRM deadline.
+
+The search asks the manager whether to stop every iteration (or node);
+the manager only reads the monotonic clock every check_every iterations,
+so the searches always stop between two iterations and never leave a node
+half updated. Time limits can be fractions of a second.
+
+For searches that build up visit counts (MCTS, flat Monte Carlo) the
+manager works with a soft and a hard deadline:
+- it stops early when the leading move cannot be overtaken by the second
+  one in the iterations left until the soft deadline (checked once half of
+  the soft budget is used, visit counts are too noisy before that)
+- at the soft deadline it stops, unless the two leading moves are close,
+  then it extends the soft deadline, never beyond the hard deadline
+Searches without visit counts (alphabeta) run until the hard deadline.
+
+This module is shared by the players: gomoku4 (MCTS), flat_mc_player
+(flat Monte Carlo), alphabeta_player and go_player (MCTS for Go) have
+identical copies.
+"""
+
+import time
+
+DEFAULT_CHECK_EVERY = 16
+# the normal budget, as a fraction of the time limit
+SOFT_FRACTION = 0.6
+# leave some of the time limit to answer the command
+HARD_FRACTION = 0.95
+# visit counts are too noisy to stop early before this fraction of the
+# soft deadline
+EARLY_STOP_FRACTION = 0.5
+# the top two moves are close when second >= CLOSE_RATIO * best
+CLOSE_RATIO = 0.9
+# every extension adds this fraction of the time limit
+EXTENSION = 0.15
+
+
+class TimeUp(Exception):
+    pass
+
+
+class TimeManager:
+    def __init__(self, timelimit, check_every=DEFAULT_CHECK_EVERY):
+        """
+        timelimit: seconds for this search, may be a fraction of a second
+        check_every: read the clock every check_every iterations
+        """
+        self.timelimit = timelimit
+        self.check_every = check_every
+        self.start_time = time.monotonic()
+        self.soft_deadline = timelimit * SOFT_FRACTION
+        self.hard_deadline = timelimit * HARD_FRACTION
+        self.extensions = 0
+
+    def elapsed(self):
+        return time.monotonic() - self.start_time
+
+    def should_stop(self, iterations, best=None, second=None):
+        """
+        Whether the search should stop after the given number of iterations.
+        best and second are the visit counts of the two leading moves,
+        measured in iterations: the second needs best - second more
+        iterations to catch up. Without them only the hard deadline counts.
+        """
+        if iterations % self.check_every != 0:
+            return False
+        elapsed = self.elapsed()
+        if elapsed >= self.hard_deadline:
+            return True
+        if best is None:
+            return False
+        if elapsed >= self.soft_deadline:
+            if second >= CLOSE_RATIO * best:
+                self.soft_deadline = min(self.hard_deadline,
+                                         self.soft_deadline + EXTENSION * self.timelimit)
+                self.extensions += 1
+                return False
+            return True
+        if elapsed >= EARLY_STOP_FRACTION * self.soft_deadline:
+            remaining = iterations / elapsed * (self.soft_deadline - elapsed)
+            return best - second > remaining
+        return False
+
+    def check(self, iterations):
+        """ For recursive searches: raise TimeUp at the hard deadline """
+        if self.should_stop(iterations):
+            raise TimeUp
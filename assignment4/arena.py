@@ -0,0 +1,446 @@
+"""
+arena.py
+
+In-process self-play arena for the Gomoku players in this directory.
+
+Each player directory (gomoku4, flat_mc_player, random_player, ...) is a
+standalone program whose modules import each other by bare name. The arena
+imports the engine class of a player directly, keeps one board per engine,
+and adjudicates every game itself with a local five-in-a-row check on the
+last move, so no GTP subprocesses are involved. Games run concurrently in a
+ProcessPoolExecutor and every finished game is written as one JSON line to
+the match log.
+
+Usage:
+    python3 arena.py gomoku4 random_player -n 1000 -j 8 --log match.jsonl
+"""
+
+import argparse
+import importlib
+import json
+import os
+import random
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+ARENA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+EMPTY = 0
+BLACK = 1
+WHITE = 2
+BORDER = 3
+
+# time granted on top of the time limit before a move counts as a timeout,
+# same as the pexpect timeout used by play.py
+GRACE_PERIOD = 1
+
+COLUMN_LETTERS = "ABCDEFGHJKLMNOPQRSTUVWXYZ"
+
+
+class EngineSpec(object):
+    """
+    Where to find a player and how to drive it.
+
+    directory:   player directory, relative to this file
+    module:      main module of the player (the GTP program)
+    engine:      name of the engine class in module
+    board_module, board_class: board used by the engine
+    play_method: board method that plays a gomoku move
+    self_timed:  the engine keeps its own time in get_move (with a time
+                 manager, or with its own SIGALRM handler)
+    """
+    def __init__(self, directory, module, engine, board_module, board_class,
+                 play_method="play_move", self_timed=False):
+        self.directory = directory
+        self.module = module
+        self.engine = engine
+        self.board_module = board_module
+        self.board_class = board_class
+        self.play_method = play_method
+        self.self_timed = self_timed
+
+
+ENGINES = {
+    "gomoku4": EngineSpec("gomoku4", "Gomoku4", "Gomoku", "board", "GoBoard",
+                          self_timed=True),
+    "sweet_mangos": EngineSpec("sweet_mangos", "Gomoku4", "Gomoku", "board", "GoBoard",
+                               self_timed=True),
+    "flat_mc_player": EngineSpec("flat_mc_player", "Gomoku3", "GomokuSimulationPlayer",
+                                 "simple_board", "SimpleGoBoard", "play_move_gomoku",
+                                 self_timed=True),
+    # not timed, a move takes about 15 seconds on 7x7: use --timelimit 20
+    "flat_bad_player": EngineSpec("flat_bad_player", "Gomoku4", "Gomoku", "board", "GoBoard"),
+    "random_player": EngineSpec("random_player", "Gomoku2", "Gomoku",
+                                "simple_board", "SimpleGoBoard", "play_move_gomoku"),
+}
+
+
+def engine_spec(name):
+    """
+    Accept a registry name, a player directory or a play.py style
+    path such as 'gomoku4/Gomoku4.py'.
+    """
+    if name in ENGINES:
+        return ENGINES[name]
+    directory = os.path.normpath(name)
+    if directory.endswith(".py"):
+        directory = os.path.dirname(directory)
+    directory = os.path.basename(directory)
+    if directory in ENGINES:
+        return ENGINES[directory]
+    raise KeyError("unknown player: {}".format(name))
+
+
+_loaded = {}
+
+
+def load_modules(directory, names):
+    """
+    Import modules by name from a player directory (relative to this file).
+    The modules of every directory are imported in isolation: sibling
+    modules cached from another directory are set aside during the import
+    and the directory's own modules are removed from sys.modules afterwards,
+    so two players with a board.py each can live in one process. Modules
+    loaded earlier from the same directory are reused.
+    Returns the list of modules.
+    """
+    directory = os.path.normpath(os.path.join(ARENA_DIR, directory))
+    loaded = _loaded.setdefault(directory, {})
+    siblings = [f[:-3] for f in os.listdir(directory) if f.endswith(".py")]
+    saved_modules = {name: sys.modules.pop(name) for name in siblings if name in sys.modules}
+    saved_path = list(sys.path)
+    sys.modules.update(loaded)
+    sys.path.insert(0, directory)
+    try:
+        modules = [importlib.import_module(name) for name in names]
+    finally:
+        for name in siblings:
+            module = sys.modules.pop(name, None)
+            if module is not None:
+                loaded[name] = module
+        sys.modules.update(saved_modules)
+        sys.path[:] = saved_path
+    return modules
+
+
+def load_engine_modules(spec):
+    """ Import the main module and board module of a player """
+    return load_modules(spec.directory, [spec.module, spec.board_module])
+
+
+class ArenaTimeout(Exception):
+    pass
+
+
+def _arena_alarm(signum, frame):
+    raise ArenaTimeout
+
+
+class Player(object):
+    """
+    One engine instance with its own board.
+    """
+    def __init__(self, name, boardsize, timelimit):
+        self.name = name
+        self.spec = engine_spec(name)
+        self.module, board_module = load_engine_modules(self.spec)
+        self.engine = getattr(self.module, self.spec.engine)()
+        self.board = getattr(board_module, self.spec.board_class)(boardsize)
+        self.timelimit = timelimit
+        if hasattr(self.engine, "set_timeout"):
+            self.engine.set_timeout(timelimit)
+
+    def play(self, move, color):
+        getattr(self.board, self.spec.play_method)(move, color)
+
+    def genmove(self, color):
+        """
+        Ask the engine for a move.
+        Returns the move, or None if the engine ran out of time.
+        """
+        previous = signal.getsignal(signal.SIGALRM)
+        if self.spec.self_timed:
+            if hasattr(self.module, "handler"):
+                signal.signal(signal.SIGALRM, self.module.handler)
+            try:
+                return self.engine.get_move(self.board, color)
+            finally:
+                signal.signal(signal.SIGALRM, previous)
+
+        # same protocol as the players' genmove_cmd: search on the real
+        # board, restore it from a copy when the alarm interrupts the search
+        board_copy = self.board.copy()
+        signal.signal(signal.SIGALRM, _arena_alarm)
+        signal.setitimer(signal.ITIMER_REAL, self.timelimit)
+        try:
+            return self.engine.get_move(self.board, color)
+        except ArenaTimeout:
+            self.board = board_copy
+            return getattr(self.engine, "best_move", None)
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+
+class Referee(object):
+    """
+    Minimal gomoku board used to adjudicate games.
+    Uses the same padded point encoding as the players' boards.
+    """
+    def __init__(self, size):
+        self.size = size
+        self.NS = size + 1
+        self.board = [BORDER] * (size * size + 3 * (size + 1))
+        for row in range(1, size + 1):
+            start = row * self.NS + 1
+            self.board[start:start + size] = [EMPTY] * size
+        self.moves = 0
+
+    def is_legal(self, move):
+        return move is not None and 0 <= move < len(self.board) and self.board[move] == EMPTY
+
+    def play(self, move, color):
+        self.board[move] = color
+        self.moves += 1
+
+    def is_full(self):
+        return self.moves == self.size * self.size
+
+    def check_win(self, move):
+        """ True if the stone on move is part of five in a row """
+        color = self.board[move]
+        for shift in (1, self.NS, self.NS + 1, self.NS - 1):
+            count = 1
+            for d in (shift, -shift):
+                p = move + d
+                while self.board[p] == color:
+                    count += 1
+                    p += d
+            if count >= 5:
+                return True
+        return False
+
+    def format_move(self, move):
+        row, col = divmod(move, self.NS)
+        return COLUMN_LETTERS[col - 1] + str(row)
+
+    def parse_move(self, move_str):
+        col = COLUMN_LETTERS.index(move_str[0].upper()) + 1
+        return int(move_str[1:]) * self.NS + col
+
+    def __str__(self):
+        symbols = {EMPTY: ".", BLACK: "0", WHITE: "1"}
+        rows = []
+        for row in range(self.size, 0, -1):
+            start = row * self.NS + 1
+            rows.append("[" + " ".join(symbols[c] for c in self.board[start:start + self.size]) + "]")
+        return "\n".join(rows)
+
+
+def play_game(job):
+    """
+    Play one game. job is a dict with the keys game, player1, player2,
+    alternative, boardsize, timelimit, seed and opening; player1 plays black
+    unless alternative is set. The game starts after the (color, move) plays
+    of the opening, which may be empty. Runs inside a worker process.
+    """
+    random.seed(job["seed"])
+    np.random.seed(job["seed"] % (2 ** 32))
+    names = (job["player1"], job["player2"])
+    if job["alternative"]:
+        names = names[::-1]
+    players = {BLACK: Player(names[0], job["boardsize"], job["timelimit"]),
+               WHITE: Player(names[1], job["boardsize"], job["timelimit"])}
+    referee = Referee(job["boardsize"])
+    color = BLACK
+    for color_str, move_str in job["opening"]:
+        move = referee.parse_move(move_str)
+        color = BLACK if color_str == "b" else WHITE
+        referee.play(move, color)
+        for p in players.values():
+            p.play(move, color)
+        color = 3 - color
+    moves = []
+    winner, reason = None, None
+    start = time.time()
+    while winner is None:
+        player = players[color]
+        move_start = time.monotonic()
+        move = player.genmove(color)
+        elapsed = time.monotonic() - move_start
+        if move is None or elapsed > job["timelimit"] + GRACE_PERIOD:
+            winner, reason = 3 - color, "timeout"
+            break
+        if not referee.is_legal(move):
+            winner, reason = 3 - color, "illegal"
+            break
+        referee.play(move, color)
+        for p in players.values():
+            p.play(move, color)
+        moves.append(referee.format_move(move))
+        if referee.check_win(move):
+            winner, reason = color, "five"
+        elif referee.is_full():
+            winner, reason = EMPTY, "full"
+        color = 3 - color
+
+    result = {BLACK: "black", WHITE: "white", EMPTY: "draw"}[winner]
+    return {
+        "game": job["game"],
+        "black": names[0],
+        "white": names[1],
+        "alternative": job["alternative"],
+        "boardsize": job["boardsize"],
+        "opening": job["opening_index"],
+        "result": result,
+        "winner": names[0] if winner == BLACK else names[1] if winner == WHITE else None,
+        "reason": reason,
+        "moves": moves,
+        "seconds": round(time.time() - start, 3),
+    }
+
+
+class MatchResult(object):
+    """
+    Running win/loss/draw counts from the point of view of player1.
+    """
+    def __init__(self, player1, player2):
+        self.player1 = player1
+        self.player2 = player2
+        self.win1 = 0
+        self.win2 = 0
+        self.draw = 0
+        self.timeouts = 0
+        self.games = 0
+
+    def add(self, game):
+        self.games += 1
+        if game["reason"] == "timeout":
+            self.timeouts += 1
+        winner_is_p1 = (game["result"] == "black") != game["alternative"]
+        if game["result"] == "draw":
+            self.draw += 1
+        elif winner_is_p1:
+            self.win1 += 1
+        else:
+            self.win2 += 1
+
+    def __str__(self):
+        return "player1 win {} player2 win {} draw {} (timeouts {})".format(
+            self.win1, self.win2, self.draw, self.timeouts)
+
+
+class Arena(object):
+    """
+    Plays matches between two players.
+
+    Games are played in pairs with the colors swapped, so game 2k has
+    player1 as black and game 2k+1 (the alternative game) player1 as white.
+    Both games of pair k start from opening k, cycling through the opening
+    suite, or from the empty board if there are no openings.
+    With workers=0 the games are played in this process.
+    """
+    def __init__(self, player1, player2, boardsize=7, timelimit=2,
+                 workers=None, log=None, seed=None, openings=None):
+        engine_spec(player1)
+        engine_spec(player2)
+        self.player1 = player1
+        self.player2 = player2
+        self.boardsize = boardsize
+        self.timelimit = timelimit
+        self.workers = workers
+        self.log = log
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.openings = openings or []
+
+    def job(self, game):
+        opening_index = None
+        opening = []
+        if self.openings:
+            opening_index = (game // 2) % len(self.openings)
+            opening = self.openings[opening_index]
+        return {
+            "game": game,
+            "player1": self.player1,
+            "player2": self.player2,
+            "alternative": game % 2 == 1,
+            "boardsize": self.boardsize,
+            "timelimit": self.timelimit,
+            "seed": self.seed + game,
+            "opening": opening,
+            "opening_index": opening_index,
+        }
+
+    def games(self, num_games):
+        """
+        Generator over finished games, in completion order.
+        Closing the generator cancels the games that have not started yet.
+        """
+        log = open(self.log, "a") if self.log else None
+        try:
+            if self.workers == 0:
+                for game in range(num_games):
+                    yield self._logged(log, play_game(self.job(game)))
+                return
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                futures = [pool.submit(play_game, self.job(game)) for game in range(num_games)]
+                try:
+                    for future in as_completed(futures):
+                        yield self._logged(log, future.result())
+                finally:
+                    for future in futures:
+                        future.cancel()
+        finally:
+            if log:
+                log.close()
+
+    def _logged(self, log, game):
+        if log:
+            log.write(json.dumps(game) + "\n")
+            log.flush()
+        return game
+
+    def play(self, num_games):
+        """ Play num_games games and return the MatchResult """
+        result = MatchResult(self.player1, self.player2)
+        for game in self.games(num_games):
+            result.add(game)
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a match between two Gomoku players.")
+    parser.add_argument("player1", choices=sorted(ENGINES))
+    parser.add_argument("player2", choices=sorted(ENGINES))
+    parser.add_argument("-n", "--games", type=int, default=10)
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU, 0: play in this process)")
+    parser.add_argument("--boardsize", type=int, default=7)
+    parser.add_argument("--timelimit", type=float, default=2)
+    parser.add_argument("--log", default="match.jsonl")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--openings", help="opening suite file, see openings.py")
+    args = parser.parse_args()
+
+    openings = None
+    if args.openings:
+        from openings import load_openings
+        openings = load_openings(args.openings)
+    arena = Arena(args.player1, args.player2, args.boardsize, args.timelimit,
+                  args.workers, args.log, args.seed, openings)
+    result = MatchResult(args.player1, args.player2)
+    for game in arena.games(args.games):
+        result.add(game)
+        print("game {} {}: {} ({})".format(game["game"] + 1, game["result"],
+                                           game["winner"], game["reason"]))
+    print("player1:", args.player1)
+    print("player2:", args.player2)
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,456 @@
+"""
+benchmark.py
+
+Speed benchmarks for the Gomoku engines, to tell whether a change to a
+board, mcts.py or alphabeta.py makes things faster.
+
+For every engine and board size the benchmark starts from the fixed
+position of that size in benchmark_positions.gtp and measures
+- gomoku4: random and rule-based playouts, MCTS iterations (on a fresh
+  tree every run), the throughput of check_win, get_counts and evaluate,
+  and solver.py nodes/sec and time to solve
+- flat_mc_player: random and rule-based playouts, the throughput of the
+  five-in-a-row checks, and alphabeta nodes/sec and time to solve
+- assignment2: alphabeta (with transposition table) nodes/sec and time to
+  solve, and the throughput of evaluate
+For every engine it also measures the time from launching the program to
+its first response, to "name" and to "boardsize n" for every size.
+The solver benchmarks use the positions of the solve tests in the .gtp test
+files instead, since solving is only feasible close to the end of a game;
+the seed positions of the assignment2 tablebases take thousands of nodes,
+the others are forced in a few moves.
+
+Every measurement runs a warmup call, then calls the function for at least
+--seconds per run, --repeats times, and reports the median rate.
+The results are written as JSON, and --compare prints the speedup against
+an earlier JSON file.
+
+Usage:
+    python3 benchmark.py [--engines gomoku4,flat_mc_player,assignment2]
+                         [--sizes 5-25] [--seconds 1] [--repeats 3]
+                         [-o benchmark.json] [--compare old.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import signal
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from arena import ARENA_DIR, load_modules
+from gtp_tests import parse_test_file
+from regress import GtpEngine
+
+POSITIONS_FILE = os.path.join(ARENA_DIR, "benchmark_positions.gtp")
+SOLVE_FILES = [
+    os.path.join(ARENA_DIR, "..", "assignment2", "tests-easy.gtp"),
+    os.path.join(ARENA_DIR, "..", "assignment2", "tests-medium.gtp"),
+    os.path.join(ARENA_DIR, "..", "assignment2", "tablebase-seeds.gtp"),
+]
+ENGINE_NAMES = ["gomoku4", "flat_mc_player", "assignment2"]
+
+BLACK = 1
+WHITE = 2
+
+# rule-based playouts scan the whole board every ply,
+# they take minutes per playout on the largest boards
+DEFAULT_MAX_RULE_SIZE = 13
+DEFAULT_SOLVE_TIMEOUT = 10
+
+
+def parse_sizes(text):
+    sizes = []
+    for part in text.split(","):
+        if "-" in part:
+            low, high = part.split("-")
+            sizes.extend(range(int(low), int(high) + 1))
+        else:
+            sizes.append(int(part))
+    return sizes
+
+
+def load_positions(filename=POSITIONS_FILE):
+    """ Map board size to the list of (color, move) of its fixture position """
+    return {case.boardsize(): case.moves() for case in parse_test_file(filename)}
+
+
+def load_solve_cases(filenames=SOLVE_FILES):
+    cases = []
+    for filename in filenames:
+        for case in parse_test_file(filename):
+            if case.command == "solve" and case.expected not in (None, "unknown"):
+                cases.append(case)
+    return cases
+
+
+def setup_board(board, moves, play_method="play_move"):
+    play = getattr(board, play_method)
+    for color, move in moves:
+        col = "abcdefghjklmnopqrstuvwxyz".index(move[0]) + 1
+        play(int(move[1:]) * board.NS + col, BLACK if color == "b" else WHITE)
+    return board
+
+
+def measure(func, seconds, repeats, units=1, warmup=1, setup=None):
+    """
+    Rate of func in units per second, where one call of func processes
+    the given number of units (e.g. points checked). setup, if given, is
+    called untimed before the warmup and before every run.
+    """
+    if setup:
+        setup()
+    for _ in range(warmup):
+        func()
+    rates = []
+    calls = 0
+    for _ in range(repeats):
+        if setup:
+            setup()
+        count = 0
+        start = time.perf_counter()
+        while True:
+            func()
+            count += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= seconds:
+                break
+        calls += count
+        rates.append(count * units / elapsed)
+    return {"per_second": statistics.median(rates), "runs": rates, "calls": calls}
+
+
+def first_response(program, commands=("name",), timeout=30):
+    """
+    Seconds from starting program until it has answered commands, the time
+    a game waits for a freshly launched engine.
+    """
+    start = time.perf_counter()
+    engine = GtpEngine(program)
+    try:
+        for command in commands:
+            ok, response = engine.send(command, timeout)
+            if not ok:
+                raise RuntimeError("{}: {} failed: {}".format(program, command, response))
+        return time.perf_counter() - start
+    finally:
+        engine.close()
+
+
+def startup_times(program, sizes, repeats):
+    """
+    Median time to first response: to "name", and to "boardsize n" for
+    every size in sizes.
+    """
+    results = {"name": statistics.median(first_response(program) for _ in range(repeats))}
+    for size in sizes:
+        commands = ("boardsize {}".format(size),)
+        results["boardsize {}".format(size)] = statistics.median(
+            first_response(program, commands) for _ in range(repeats))
+    return results
+
+
+class SolveTimeout(Exception):
+    pass
+
+
+def _solve_alarm(signum, frame):
+    raise SolveTimeout
+
+
+def time_solve(solve, timeout):
+    """
+    Run solve() under a SIGALRM deadline.
+    Returns (seconds, result), result is None on timeout.
+    """
+    previous = signal.signal(signal.SIGALRM, _solve_alarm)
+    signal.alarm(timeout)
+    start = time.perf_counter()
+    try:
+        result = solve()
+    except SolveTimeout:
+        result = None
+    finally:
+        signal.alarm(0)
+        signal.signal(signal.SIGALRM, previous)
+    return time.perf_counter() - start, result
+
+
+class Gomoku4Bench(object):
+    name = "gomoku4"
+    program = os.path.join(ARENA_DIR, "gomoku4", "Gomoku4.py")
+
+    def __init__(self):
+        (self.gomoku, self.board_module, self.board_util,
+         self.mcts, self.evaluation, self.solver) = load_modules(
+            "gomoku4", ["Gomoku4", "board", "board_util", "mcts", "evaluation", "solver"])
+
+    def board(self, size, moves):
+        return setup_board(self.board_module.GoBoard(size), moves)
+
+    def random_playout(self, board):
+        util = self.board_util.GoBoardUtil
+        moves = []
+        winner = self.board_util.EMPTY
+        while winner == self.board_util.EMPTY and len(board.get_empty_points()) > 0:
+            move = util.generate_random_move(board, board.current_player)
+            board.play_move(move, board.current_player)
+            moves.append(move)
+            winner = board.check_win(move)
+        for move in reversed(moves):
+            board.undo_move(move)
+
+    def rule_playout(self, board):
+        policy = self.gomoku.RulePolicy()
+        moves = []
+        winner = self.board_util.EMPTY
+        while winner == self.board_util.EMPTY and len(board.get_empty_points()) > 0:
+            scored = policy.best_moves(board, board.current_player)
+            best = [move for move, score in scored if score == scored[0][1]]
+            move = random.choice(best)
+            board.play_move(move, board.current_player)
+            moves.append(move)
+            winner = board.check_win(move)
+        for move in reversed(moves):
+            board.undo_move(move)
+
+    def run(self, size, moves, args):
+        results = {}
+        board = self.board(size, moves)
+        results["random_playouts"] = measure(lambda: self.random_playout(board),
+                                             args.seconds, args.repeats)
+        if size <= args.max_rule_size:
+            results["rule_playouts"] = measure(lambda: self.rule_playout(board),
+                                               args.seconds, args.repeats)
+        trees = []
+
+        def new_tree():
+            trees[:] = [self.mcts.MctsTree(board.copy(), board.current_player,
+                                           self.gomoku.CombinedPolicy())]
+
+        def mcts_step():
+            tree = trees[0]
+            playouts = tree.stats.playouts
+            self.mcts.mcts_step(tree)
+            # once the root is solved, or the search only reaches decided
+            # positions, the iterations run no playouts: start over
+            if tree.root.winner != self.board_util.EMPTY or tree.stats.playouts == playouts:
+                new_tree()
+
+        results["mcts_iterations"] = measure(mcts_step, args.seconds, args.repeats,
+                                             setup=new_tree)
+
+        stones = [p for p in range(board.maxpoint) if board.board[p] in (BLACK, WHITE)]
+        points = stones or list(board.get_empty_points()[:1])
+        lines = [line for point_lines in board.boardLines5 for line in point_lines]
+
+        def check_win():
+            for p in points:
+                board.check_win(p)
+
+        def get_counts():
+            for line in lines:
+                board.get_counts(line)
+
+        results["check_win"] = measure(check_win, args.seconds, args.repeats, len(points))
+        results["get_counts"] = measure(get_counts, args.seconds, args.repeats, len(lines))
+        results["evaluate"] = measure(lambda: self.evaluation.evaluate(board, board.current_player),
+                                      args.seconds, args.repeats)
+        return results
+
+    def solve(self, case, args):
+        board = self.board(case.boardsize(), case.moves())
+        solver = self.solver.Solver(args.solve_timeout)
+        start = time.perf_counter()
+        winner, _ = solver.solve(board)
+        return time.perf_counter() - start, solver.nodes, winner
+
+
+class FlatMcBench(object):
+    name = "flat_mc_player"
+    program = os.path.join(ARENA_DIR, "flat_mc_player", "Gomoku3.py")
+
+    def __init__(self):
+        self.player_module, self.board_module, self.alphabeta = load_modules(
+            "flat_mc_player", ["Gomoku3", "simple_board", "alphabeta"])
+
+    def board(self, size, moves):
+        return setup_board(self.board_module.SimpleGoBoard(size), moves, "play_move_gomoku")
+
+    def run(self, size, moves, args):
+        results = {}
+        board = self.board(size, moves)
+        color = board.current_player
+        player = self.player_module.GomokuSimulationPlayer(playout_policy="random")
+        results["random_playouts"] = measure(lambda: player._do_playout(board, color),
+                                             args.seconds, args.repeats)
+        if size <= args.max_rule_size:
+            rule_player = self.player_module.GomokuSimulationPlayer(playout_policy="rule_based")
+            results["rule_playouts"] = measure(lambda: rule_player._do_playout(board, color),
+                                               args.seconds, args.repeats)
+        stones = [p for p in range(board.maxpoint) if board.board[p] in (BLACK, WHITE)]
+
+        def point_check():
+            for p in stones:
+                board.point_check_game_end_gomoku(p)
+
+        if stones:
+            results["point_check_game_end"] = measure(point_check, args.seconds, args.repeats,
+                                                      len(stones))
+        results["check_game_end"] = measure(board.check_game_end_gomoku,
+                                            args.seconds, args.repeats)
+        return results
+
+    def solve(self, case, args):
+        board = self.board(case.boardsize(), case.moves())
+        stats = self.alphabeta.SearchStats()
+        seconds, result = time_solve(lambda: self.alphabeta.solve(board, stats),
+                                     args.solve_timeout)
+        return seconds, stats.nodes, result
+
+
+class Assignment2Bench(object):
+    name = "assignment2"
+    program = os.path.join(ARENA_DIR, "..", "assignment2", "Gomoku.py")
+
+    def __init__(self):
+        self.board_module, self.alphabeta, self.tt, self.evaluation = load_modules(
+            os.path.join("..", "assignment2"),
+            ["board", "alphabeta", "transpositiontable", "evaluation"])
+
+    def board(self, size, moves):
+        return setup_board(self.board_module.GoBoard(size), moves)
+
+    def run(self, size, moves, args):
+        board = self.board(size, moves)
+        return {
+            "evaluate": measure(lambda: self.evaluation.evaluate(board, board.current_player),
+                                args.seconds, args.repeats),
+        }
+
+    def solve(self, case, args):
+        board = self.board(case.boardsize(), case.moves())
+        table = self.tt.TranspositionTable()
+        hasher = self.tt.ZobristHasher(board.size)
+        stats = self.alphabeta.SearchStats()
+        seconds, result = time_solve(
+            lambda: self.alphabeta.call_alphabeta(board, table, hasher, stats),
+            args.solve_timeout)
+        return seconds, stats.nodes, result
+
+
+BENCHES = {
+    "gomoku4": Gomoku4Bench,
+    "flat_mc_player": FlatMcBench,
+    "assignment2": Assignment2Bench,
+}
+
+
+def run_benchmarks(args):
+    positions = load_positions()
+    solve_cases = load_solve_cases()
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seconds": args.seconds,
+            "repeats": args.repeats,
+        },
+        "results": [],
+        "solve": [],
+        "startup": [],
+    }
+    for name in args.engines:
+        bench = BENCHES[name]()
+        for commands, seconds in startup_times(bench.program, args.sizes, args.repeats).items():
+            report["startup"].append({"engine": name, "commands": commands, "seconds": seconds})
+            log("{:15} first response to {:15} {:8.3f}s".format(name, commands, seconds))
+        for size in args.sizes:
+            random.seed(size)
+            np.random.seed(size)
+            for metric, result in bench.run(size, positions[size], args).items():
+                entry = dict(engine=name, size=size, metric=metric, **result)
+                report["results"].append(entry)
+                log("{:15} {:2}x{:<2} {:22} {:12.1f}/s".format(
+                    name, size, size, metric, result["per_second"]))
+        for case in solve_cases:
+            solved = bench.solve(case, args)
+            if solved is None:
+                continue
+            seconds, nodes, result = solved
+            entry = {
+                "engine": name,
+                "case": os.path.basename(case.filename) + ":" + case.number,
+                "size": case.boardsize(),
+                "seconds": seconds,
+                "nodes": nodes,
+                "nodes_per_second": nodes / seconds if seconds > 0 else 0,
+                "timeout": result is None,
+            }
+            report["solve"].append(entry)
+            log("{:15} {:22} {:8.3f}s {:10} nodes{}".format(
+                name, entry["case"], seconds, nodes, " (timeout)" if result is None else ""))
+    return report
+
+
+def compare(report, baseline):
+    """ Print the speedup of every measurement that is in both reports """
+    def key(entry):
+        return entry["engine"], entry["size"], entry["metric"]
+
+    old = {key(entry): entry for entry in baseline["results"]}
+    for entry in report["results"]:
+        if key(entry) in old:
+            ratio = entry["per_second"] / old[key(entry)]["per_second"]
+            log("{:15} {:2}x{:<2} {:22} x{:.2f}".format(
+                entry["engine"], entry["size"], entry["size"], entry["metric"], ratio))
+    old_startup = {(e["engine"], e["commands"]): e for e in baseline.get("startup", [])}
+    for entry in report["startup"]:
+        previous = old_startup.get((entry["engine"], entry["commands"]))
+        if previous:
+            log("{:15} first response to {:15} x{:.2f}".format(
+                entry["engine"], entry["commands"], previous["seconds"] / entry["seconds"]))
+    old_solve = {(e["engine"], e["case"]): e for e in baseline["solve"]}
+    for entry in report["solve"]:
+        previous = old_solve.get((entry["engine"], entry["case"]))
+        if previous and entry["seconds"] > 0:
+            log("{:15} {:22} x{:.2f}".format(entry["engine"], entry["case"],
+                                              previous["seconds"] / entry["seconds"]))
+
+
+def log(msg):
+    sys.stderr.write(msg + "\n")
+    sys.stderr.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Gomoku engines.")
+    parser.add_argument("--engines", default=",".join(ENGINE_NAMES))
+    parser.add_argument("--sizes", default="5-25", help='e.g. "5-25" or "5,7,9"')
+    parser.add_argument("--seconds", type=float, default=1.0, help="minimum time per run")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--max-rule-size", type=int, default=DEFAULT_MAX_RULE_SIZE)
+    parser.add_argument("--solve-timeout", type=int, default=DEFAULT_SOLVE_TIMEOUT)
+    parser.add_argument("-o", "--output", default="benchmark.json")
+    parser.add_argument("--compare", help="earlier benchmark JSON to compare against")
+    args = parser.parse_args()
+    args.engines = args.engines.split(",")
+    args.sizes = parse_sizes(args.sizes)
+
+    report = run_benchmarks(args)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
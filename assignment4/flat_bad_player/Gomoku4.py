@@ -38,7 +38,7 @@ class Gomoku():
         emptyPoints = board.get_empty_points()
 
         # no more moves to pick from, so will pass
-        if emptyPoints == []:
+        if len(emptyPoints) == 0:
             return None
 
         # number of times the move has won
@@ -75,7 +75,7 @@ class Gomoku():
         winningColor = EMPTY
 
         # simulate entire game to completion
-        while boardCopy.get_empty_points() != []:
+        while len(boardCopy.get_empty_points()) > 0:
             color = boardCopy.current_player
             bestMoves = self.rule_based_moves(boardCopy, color)
 
@@ -8,18 +8,28 @@ from simple_board import SimpleGoBoard
 
 import random
 import numpy as np
+from time_manager import TimeManager
+
+# playouts between two reads of the clock
+PLAYOUT_CHECK_EVERY = 8
 
 def undo(board,move):
-    board.board[move]=EMPTY
-    board.current_player=GoBoardUtil.opponent(board.current_player)
+    board.undo_move_gomoku(move)
 
 def play_move(board, move, color):
     board.play_move_gomoku(move, color)
 
-def game_result(board):
-    game_end, winner = board.check_game_end_gomoku()
-    moves = board.get_empty_points()
-    board_full = (len(moves) == 0)
+def game_result(board, last_move=None):
+    """
+    The winner, 'draw', or None if the game goes on.
+    With last_move only the lines through it are checked.
+    """
+    if last_move is None:
+        game_end, winner = board.check_game_end_gomoku()
+    else:
+        game_end = board.point_check_game_end_gomoku(last_move)
+        winner = board.get_color(last_move)
+    board_full = board.num_empty == 0
     if game_end:
         #return 1 if winner == board.current_player else -1
         return winner
@@ -45,6 +55,10 @@ class GomokuSimulationPlayer(object):
         self.name="Gomoku3"
         self.version = 3.0
         self.best_move=None
+        self.timelimit=2
+
+    def set_timeout(self, limit):
+        self.timelimit=limit
     
     def set_playout_policy(self, playout_policy='random'):
         assert(playout_policy in ['random', 'rule_based'])
@@ -65,15 +79,15 @@ class GomokuSimulationPlayer(object):
             movetype_id, moves=ret
             return self.pattern_list[movetype_id], moves
     
-    def _do_playout(self, board, color_to_play):
-        res=game_result(board)
+    def _do_playout(self, board, color_to_play, last_move=None):
+        res=game_result(board, last_move)
         simulation_moves=[]
         while(res is None):
             _ , candidate_moves = self.policy_moves(board, board.current_player)
             playout_move=random.choice(candidate_moves)
             play_move(board, playout_move, board.current_player)
             simulation_moves.append(playout_move)
-            res=game_result(board)
+            res=game_result(board, playout_move)
         for m in simulation_moves[::-1]:
             undo(board, m)
         if res == color_to_play:
@@ -94,16 +108,18 @@ class GomokuSimulationPlayer(object):
         best_move=moves[0]
         wins = np.zeros(len(moves))
         visits = np.zeros(len(moves))
+        time_manager = TimeManager(self.timelimit, PLAYOUT_CHECK_EVERY)
+        playouts = 0
         while True:
             for i, move in enumerate(moves):
                 play_move(board, move, toplay)
-                res=game_result(board)
+                res=game_result(board, move)
                 if res == toplay:
                     undo(board, move)
                     #This move is a immediate win
                     self.best_move=move
                     return move
-                ret=self._do_playout(board, toplay)
+                ret=self._do_playout(board, toplay, move)
                 wins[i] += ret
                 visits[i] += 1
                 win_rate = wins[i] / visits[i]
@@ -112,8 +128,14 @@ class GomokuSimulationPlayer(object):
                     best_move=move
                     self.best_move=best_move
                 undo(board, move)
-        assert(best_move is not None)
-        return best_move
+                playouts += 1
+                # the moves get playouts in turn, so the runner-up needs
+                # len(moves) playouts for every win it catches up
+                if playouts % PLAYOUT_CHECK_EVERY == 0:
+                    points = np.sort(wins + visits) / 2
+                    best, second = points[-1], points[-2] if len(moves) > 1 else 0
+                    if time_manager.should_stop(playouts, best * len(moves), second * len(moves)):
+                        return best_move
 
 def run():
     """
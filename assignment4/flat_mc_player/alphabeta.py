@@ -1,30 +1,46 @@
 from board_util import GoBoardUtil, BLACK, WHITE, EMPTY, BORDER
 #from profilehooks import profile
 
+class SearchStats:
+    """
+    Counters of one solve, for the benchmarks.
+    """
+    def __init__(self):
+        self.nodes = 0
+
 def undo(board,move):
-    board.board[move]=EMPTY
-    board.current_player=GoBoardUtil.opponent(board.current_player)
+    board.undo_move_gomoku(move)
 
-def game_end(board):
-    game_end, winner = board.check_game_end_gomoku()
-    moves = board.get_empty_points()
-    board_full = (len(moves) == 0)
+def game_end(board, last_move=None):
+    """
+    1 if the side to move has won, -1 if it has lost, 0 for a draw,
+    None if the game goes on.
+    With last_move only the lines through it are checked: the positions
+    before it were checked when their moves were played.
+    """
+    if last_move is None:
+        game_end, winner = board.check_game_end_gomoku()
+    else:
+        game_end = board.point_check_game_end_gomoku(last_move)
+        winner = board.get_color(last_move)
     if game_end:
         return 1 if winner == board.current_player else -1
-    if board_full:
+    if board.num_empty == 0:
         return 0
     return None
 
-def alphabeta(board,alpha,beta):
+def alphabeta(board,alpha,beta,last_move=None,stats=None):
     #print(GoBoardUtil.get_twoD_board(board),alpha,beta)
-    result=game_end(board)
+    if stats is not None:
+        stats.nodes += 1
+    result=game_end(board,last_move)
     if (result!=None):
         return result
     solvePoint=board.list_solve_point()
     if solvePoint:
         #print(solvePoint[0])
         board.play_move_gomoku(solvePoint[0],board.current_player)
-        result=-alphabeta(board,-beta,-alpha)
+        result=-alphabeta(board,-beta,-alpha,solvePoint[0],stats)
         if(result>alpha):
             alpha=result
         undo(board,solvePoint[0])
@@ -33,7 +49,7 @@ def alphabeta(board,alpha,beta):
     else:
         for m in GoBoardUtil.generate_legal_moves_gomoku(board):
             board.play_move_gomoku(m,board.current_player)
-            result=-alphabeta(board,-beta,-alpha)
+            result=-alphabeta(board,-beta,-alpha,m,stats)
             if(result>alpha):
                 alpha=result
             undo(board,m)
@@ -43,37 +59,39 @@ def alphabeta(board,alpha,beta):
 
 #@profile
 """
-if have winning move, return _,winning_move
-else return have_draw,"NoMove"
+if have winning move, return _,winning_move,None
+else return have_draw,"NoMove",drawing_move
 """
-def solve(board):
+def solve(board,stats=None):
+    if stats is not None:
+        stats.nodes += 1
     result=game_end(board)
     if (result!=None):
-        return result,"First"
+        return result,"First",None
     alpha,beta=-1,1
-    haveDraw=False
+    drawMove=None
     solvePoint=board.list_solve_point()
     if solvePoint:
         #print(solvePoint[0])
         board.play_move_gomoku(solvePoint[0],board.current_player)
-        result=-alphabeta(board,-beta,-alpha)
+        result=-alphabeta(board,-beta,-alpha,solvePoint[0],stats)
         undo(board,solvePoint[0])
         if(result==1):
-            return True,solvePoint[0]
+            return True,solvePoint[0],None
         elif(result==0):
-            haveDraw=True
+            drawMove=solvePoint[0]
     else: 
         for m in GoBoardUtil.generate_legal_moves_gomoku(board):
             board.play_move_gomoku(m,board.current_player)
-            result=-alphabeta(board,-beta,-alpha)
+            result=-alphabeta(board,-beta,-alpha,m,stats)
             #print(GoBoardUtil.get_twoD_board(board))
             #print(result)
             undo(board,m)
             if(result==1):
-                return True,m
-            elif(result==0):
-                haveDraw=True
-    return haveDraw,"NoMove"
+                return True,m,None
+            elif(result==0 and drawMove is None):
+                drawMove=m
+    return drawMove is not None,"NoMove",drawMove
 
 
     """
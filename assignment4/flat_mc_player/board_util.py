@@ -133,8 +133,7 @@ class GoBoardUtil(object):
         moves = board.get_empty_points()
         if len(moves) == 0:
             return PASS
-        np.random.shuffle(moves)
-        return moves[0]
+        return moves[np.random.randint(len(moves))]
 
     @staticmethod       
     def generate_random_move(board, color, use_eye_filter):
@@ -149,9 +148,9 @@ class GoBoardUtil(object):
         color : BLACK, WHITE
             the color to generate the move for.
         """
-        moves = board.get_empty_points()
+        moves = board.get_empty_points().copy()
         np.random.shuffle(moves)
-        for move in moves:
+        for move in moves.tolist():
             legal = not (use_eye_filter and board.is_eye(move, color)) \
                     and board.is_legal(move, color)
             if legal:
@@ -281,7 +281,8 @@ class GtpConnection():
             self.respond('{}'.format(str(e)))
 
     def timelimit_cmd(self, args):
-        self.timelimit = args[0]
+        self.timelimit = float(args[0])
+        self.go_engine.set_timeout(self.timelimit)
         self.respond('')
 
     def handler(self, signum, fram):
@@ -291,7 +292,7 @@ class GtpConnection():
     def solve_cmd(self, args):
         try:
             self.sboard = self.board.copy()
-            signal.alarm(int(self.timelimit)-1)
+            signal.alarm(max(1, int(self.timelimit)-1))
             winner,move = self.board.solve()
             self.board = self.sboard
             signal.alarm(0)
@@ -325,12 +326,11 @@ class GtpConnection():
             return
         move=None
         try:
-            signal.alarm(int(self.timelimit))
             self.sboard = self.board.copy()
             move = self.go_engine.get_move(self.board, color)
             self.board=self.sboard
-            signal.alarm(0)
         except Exception as e:
+            self.board=self.sboard
             move=self.go_engine.best_move
 
         if move == PASS:
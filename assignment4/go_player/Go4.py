@@ -0,0 +1,214 @@
+#!/usr/local/bin/python3
+# /usr/bin/python3
+# Set the path to your python3 above
+
+"""
+Go4: UCT player for Go on small boards (7x7 to 9x9), see mcts.py.
+
+With -j N the search is root parallel: N processes search the same
+position independently and the visit counts of their root children are
+added up. Every process keeps its own tree for the next move. The worker
+processes are started and warmed up when the player is built, so the
+first genmove does not pay for them.
+
+Usage:
+    python3 Go4.py [-j 4]
+"""
+
+import argparse
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from gtp_connection import GtpConnection
+from board_util import PASS, NULLPOINT
+from simple_board import SimpleGoBoard
+from mcts import MctsTree, SearchStats, best_move, merge_stats
+from time_manager import TimeManager
+
+# iterations between two reads of the clock
+MCTS_CHECK_EVERY = 16
+DEFAULT_KOMI = 6.5
+
+# seconds of the time limit kept for sending the searches of the root
+# parallel search to the workers and merging their results
+PARALLEL_MARGIN = 0.1
+# seconds the workers wait for each other during the warmup
+WARMUP_TIMEOUT = 30
+
+# the engine of a worker process of the root parallel search
+_worker_engine = None
+# shared by all workers of the pool, see _warmup
+_worker_barrier = None
+
+
+def _init_worker(barrier):
+    """ Forked workers inherit the random state, every worker needs its own """
+    global _worker_barrier
+    random.seed()
+    np.random.seed()
+    _worker_barrier = barrier
+
+
+def _worker():
+    global _worker_engine
+    if _worker_engine is None:
+        _worker_engine = Go4()
+    return _worker_engine
+
+
+def _warmup():
+    """
+    Build the engine of a worker process. The warmup tasks wait for each
+    other, so every worker of the pool runs one.
+    """
+    _worker()
+    _worker_barrier.wait(WARMUP_TIMEOUT)
+
+
+def _search(board, color, komi, timelimit):
+    """ Run one search in a worker process, return its root statistics """
+    engine = _worker()
+    engine.komi = komi
+    engine.set_timeout(timelimit)
+    engine.search(board, color)
+    return engine.tree.root_stats(), engine.last_stats
+
+
+def same_position(board, other):
+    return board.current_player == other.current_player \
+        and board.ko_recapture == other.ko_recapture \
+        and board.passes == other.passes \
+        and np.array_equal(board.board, other.board)
+
+
+def played_move(before, after):
+    """
+    The move of before.current_player that leads from before to after,
+    if there is one: the only new stone of that color, or PASS.
+    NULLPOINT, which is never a move, if no single move of that color
+    explains the difference.
+    """
+    color = before.current_player
+    new_stones = np.nonzero((after.board == color) & (before.board != color))[0]
+    if len(new_stones) == 0:
+        return PASS
+    if len(new_stones) == 1:
+        return int(new_stones[0])
+    return NULLPOINT
+
+
+class Go4:
+    def __init__(self, workers=1):
+        """
+        Go player that selects moves with UCT search.
+
+        Parameters
+        ----------
+        workers : int
+            processes of the root parallel search, 1 searches in this process
+        """
+        self.name = "Go4"
+        self.version = 1.0
+        self.timelimit = 59
+        self.komi = DEFAULT_KOMI
+        self.workers = workers
+        self.pool = self._start_pool() if workers > 1 else None
+        # statistics of the last search, see search_stats
+        self.last_stats = None
+        # the tree of the last search, reused by the next one
+        self.tree = None
+
+    def set_timeout(self, limit):
+        self.timelimit = limit
+
+    def get_move(self, board, color):
+        if self.workers > 1:
+            return self._parallel_move(board, color)
+        self.search(board, color)
+        return self.tree.best_move()
+
+    def search(self, board, color):
+        """ Search the position on board until the time manager stops it """
+        start = time.perf_counter()
+        time_manager = TimeManager(self.timelimit, MCTS_CHECK_EVERY)
+        tree = self._reuse_tree(board, color)
+        if tree is None:
+            tree = MctsTree(board.copy(), color, self.komi)
+        tree.stats = SearchStats()
+        self.tree = tree
+        self.last_stats = tree.stats
+        iterations = 0
+        while True:
+            tree.step()
+            iterations += 1
+            best, second = tree.top_two()
+            if time_manager.should_stop(iterations, best, second):
+                break
+        tree.stats.seconds = time.perf_counter() - start
+
+    def _start_pool(self):
+        """ Start the worker processes and build their engines """
+        barrier = multiprocessing.Barrier(self.workers)
+        pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                   initargs=(barrier,))
+        for future in [pool.submit(_warmup) for _ in range(self.workers)]:
+            future.result()
+        return pool
+
+    def _parallel_move(self, board, color):
+        start = time.perf_counter()
+        # one search per worker: all workers are idle, and a search keeps
+        # its worker busy until the others have started
+        futures = []
+        for _ in range(self.workers):
+            remaining = self.timelimit - (time.perf_counter() - start) - PARALLEL_MARGIN
+            futures.append(self.pool.submit(_search, board, color, self.komi, remaining))
+        results = [future.result() for future in futures]
+        stats = SearchStats()
+        for _, worker_stats in results:
+            stats.iterations += worker_stats.iterations
+            stats.nodes += worker_stats.nodes - 1
+            stats.max_depth = max(stats.max_depth, worker_stats.max_depth)
+            stats.playout_moves += worker_stats.playout_moves
+        stats.seconds = time.perf_counter() - start
+        self.last_stats = stats
+        return best_move(merge_stats(root_stats for root_stats, _ in results))
+
+    def _reuse_tree(self, board, color):
+        """
+        The last search tree, advanced to the position on board,
+        or None if board is not the position of the tree plus the moves
+        played since (our move and the opponent's answer).
+        """
+        tree = self.tree
+        self.tree = None
+        if tree is None or tree.board.size != board.size or tree.komi != self.komi:
+            return None
+        for _ in range(2):
+            if same_position(tree.board, board):
+                break
+            move = played_move(tree.board, board)
+            if not tree.advance(move):
+                return None
+        if not same_position(tree.board, board) or tree.color != color:
+            return None
+        return tree
+
+
+def run():
+    """
+    start the gtp connection and wait for commands.
+    """
+    parser = argparse.ArgumentParser(description="UCT Go player.")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="processes of the root parallel search")
+    args = parser.parse_args()
+    board = SimpleGoBoard(7)
+    con = GtpConnection(Go4(args.workers), board)
+    con.start_connection()
+
+
+if __name__ == "__main__":
+    run()
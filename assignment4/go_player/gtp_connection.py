@@ -0,0 +1,416 @@
+"""
+gtp_connection.py
+Module for playing games of Go using GoTextProtocol
+
+Parts of this code were originally based on the gtp module 
+in the Deep-Go project by Isaac Henrion and Amos Storkey 
+at the University of Edinburgh.
+"""
+import traceback
+from sys import stdin, stdout, stderr
+from board_util import GoBoardUtil, BLACK, WHITE, EMPTY, BORDER, PASS, \
+                       MAXSIZE, coord_to_point
+import numpy as np
+import re
+
+class GtpConnection():
+
+    def __init__(self, go_engine, board, debug_mode = False):
+        """
+        Manage a GTP connection for a Go-playing engine
+
+        Parameters
+        ----------
+        go_engine:
+            a program that can reply to a set of GTP commandsbelow
+        board: 
+            Represents the current board state.
+        """
+        self._debug_mode = debug_mode
+        self.go_engine = go_engine
+        self.board = board
+        self.commands = {
+            "protocol_version": self.protocol_version_cmd,
+            "quit": self.quit_cmd,
+            "name": self.name_cmd,
+            "boardsize": self.boardsize_cmd,
+            "showboard": self.showboard_cmd,
+            "clear_board": self.clear_board_cmd,
+            "komi": self.komi_cmd,
+            "version": self.version_cmd,
+            "known_command": self.known_command_cmd,
+            "genmove": self.genmove_cmd,
+            "list_commands": self.list_commands_cmd,
+            "play": self.play_cmd,
+            "legal_moves": self.legal_moves_cmd,
+            "final_score": self.final_score_cmd,
+            "gogui-rules_game_id": self.gogui_rules_game_id_cmd,
+            "gogui-rules_board_size": self.gogui_rules_board_size_cmd,
+            "gogui-rules_legal_moves": self.gogui_rules_legal_moves_cmd,
+            "gogui-rules_side_to_move": self.gogui_rules_side_to_move_cmd,
+            "gogui-rules_board": self.gogui_rules_board_cmd,
+            "gogui-rules_final_result": self.gogui_rules_final_result_cmd,
+            "gogui-analyze_commands": self.gogui_analyze_cmd,
+            "timelimit": self.timelimit_cmd,
+            "search_stats": self.search_stats_cmd
+        }
+
+        # used for argument checking
+        # values: (required number of arguments, 
+        #          error message on argnum failure)
+        self.argmap = {
+            "boardsize": (1, 'Usage: boardsize INT'),
+            "komi": (1, 'Usage: komi FLOAT'),
+            "known_command": (1, 'Usage: known_command CMD_NAME'),
+            "genmove": (1, 'Usage: genmove {w,b}'),
+            "play": (2, 'Usage: play {b,w} MOVE'),
+            "legal_moves": (1, 'Usage: legal_moves {w,b}'),
+            "timelimit": (1, 'Usage: timelimit SECONDS')
+        }
+
+    def write(self, data):
+        stdout.write(data) 
+
+    def flush(self):
+        stdout.flush()
+
+    def start_connection(self):
+        """
+        Start a GTP connection. 
+        This function continuously monitors standard input for commands.
+        """
+        line = stdin.readline()
+        while line:
+            self.get_cmd(line)
+            line = stdin.readline()
+
+    def get_cmd(self, command):
+        """
+        Parse command string and execute it
+        """
+        if len(command.strip(' \r\t')) == 0:
+            return
+        if command[0] == '#':
+            return
+        # Strip leading numbers from regression tests
+        if command[0].isdigit():
+            command = re.sub(r"^\d+", "", command).lstrip()
+
+        elements = command.split()
+        if not elements:
+            return
+        command_name = elements[0]; args = elements[1:]
+        if self.has_arg_error(command_name, len(args)):
+            return
+        if command_name in self.commands:
+            try:
+                self.commands[command_name](args)
+            except Exception as e:
+                self.debug_msg("Error executing command {}\n".format(str(e)))
+                self.debug_msg("Stack Trace:\n{}\n".
+                               format(traceback.format_exc()))
+                raise e
+        else:
+            self.debug_msg("Unknown command: {}\n".format(command_name))
+            self.error('Unknown command')
+            stdout.flush()
+
+    def has_arg_error(self, cmd, argnum):
+        """
+        Verify the number of arguments of cmd.
+        argnum is the number of parsed arguments
+        """
+        if cmd in self.argmap and self.argmap[cmd][0] != argnum:
+            self.error(self.argmap[cmd][1])
+            return True
+        return False
+
+    def debug_msg(self, msg):
+        """ Write msg to the debug stream """
+        if self._debug_mode:
+            stderr.write(msg)
+            stderr.flush()
+
+    def error(self, error_msg):
+        """ Send error msg to stdout """
+        stdout.write('? {}\n\n'.format(error_msg))
+        stdout.flush()
+
+    def respond(self, response=''):
+        """ Send response to stdout """
+        stdout.write('= {}\n\n'.format(response))
+        stdout.flush()
+
+    def reset(self, size):
+        """
+        Reset the board to empty board of given size
+        """
+        self.board.reset(size)
+
+    def board2d(self):
+        return str(GoBoardUtil.get_twoD_board(self.board))
+        
+    def protocol_version_cmd(self, args):
+        """ Return the GTP protocol version being used (always 2) """
+        self.respond('2')
+
+    def quit_cmd(self, args):
+        """ Quit game and exit the GTP interface """
+        self.respond()
+        exit()
+
+    def name_cmd(self, args):
+        """ Return the name of the Go engine """
+        self.respond(self.go_engine.name)
+
+    def version_cmd(self, args):
+        """ Return the version of the  Go engine """
+        self.respond(self.go_engine.version)
+
+    def clear_board_cmd(self, args):
+        """ clear the board """
+        self.reset(self.board.size)
+        self.respond()
+
+    def boardsize_cmd(self, args):
+        """
+        Reset the game with new boardsize args[0]
+        """
+        self.reset(int(args[0]))
+        self.respond()
+
+    def showboard_cmd(self, args):
+        self.respond('\n' + self.board2d())
+
+    def komi_cmd(self, args):
+        """
+        Set the engine's komi to args[0]
+        """
+        self.go_engine.komi = float(args[0])
+        self.respond()
+
+    def known_command_cmd(self, args):
+        """
+        Check if command args[0] is known to the GTP interface
+        """
+        if args[0] in self.commands:
+            self.respond("true")
+        else:
+            self.respond("false")
+
+    def list_commands_cmd(self, args):
+        """ list all supported GTP commands """
+        self.respond(' '.join(list(self.commands.keys())))
+
+    def legal_moves_cmd(self, args):
+        """
+        List legal moves for color args[0] in {'b','w'}
+        """
+        board_color = args[0].lower()
+        color = color_to_int(board_color)
+        moves = GoBoardUtil.generate_legal_moves(self.board, color)
+        gtp_moves = []
+        for move in moves:
+            coords = point_to_coord(move, self.board.size)
+            gtp_moves.append(format_point(coords))
+        sorted_moves = ' '.join(sorted(gtp_moves))
+        self.respond(sorted_moves)
+
+    def play_cmd(self, args):
+        """
+        play a move args[1] for given color args[0] in {'b','w'}
+        """
+        try:
+            board_color = args[0].lower()
+            board_move = args[1]
+            if board_color != "b" and board_color !="w":
+                self.respond("illegal move: \"{}\" wrong color".format(board_color))
+                return
+            color = color_to_int(board_color)
+            coord = move_to_coord(args[1], self.board.size)
+            if coord == PASS:
+                move = PASS
+            else:
+                move = coord_to_point(coord[0], coord[1], self.board.size)
+            if not self.board.play_move(move, color):
+                self.respond("illegal move: \"{}\" {}".format(
+                    board_move, illegal_reason(self.board, move)))
+                return
+            self.debug_msg("Move: {}\nBoard:\n{}\n".
+                            format(board_move, self.board2d()))
+            self.respond()
+        except Exception as e:
+            self.respond('{}'.format(str(e)))
+
+    def timelimit_cmd(self, args):
+        self.go_engine.set_timeout(float(args[0]))
+        self.respond('')
+
+    def genmove_cmd(self, args):
+        """
+        Generate a move for the color args[0] in {'b', 'w'}, for the game of Go.
+        """
+        board_color = args[0].lower()
+        color = color_to_int(board_color)
+        if self.board.passes >= 2:
+            self.respond("pass")
+            return
+        move = self.go_engine.get_move(self.board, color)
+        if move == PASS:
+            self.board.play_move(PASS, color)
+            self.respond("pass")
+            return
+        move_as_string = format_point(point_to_coord(move, self.board.size))
+        if self.board.play_move(move, color):
+            self.respond(move_as_string)
+        else:
+            self.respond("illegal move: {}".format(move_as_string))
+
+    def final_score_cmd(self, args):
+        """ Area score of the position with the engine's komi, e.g. B+3.5 """
+        score = self.board.score(self.go_engine.komi)
+        if score > 0:
+            self.respond("B+{}".format(score))
+        elif score < 0:
+            self.respond("W+{}".format(-score))
+        else:
+            self.respond("0")
+
+    def search_stats_cmd(self, args):
+        """
+        Report the statistics of the last genmove search.
+        """
+        stats = getattr(self.go_engine, "last_stats", None)
+        if stats is None:
+            self.respond("no search")
+        else:
+            self.respond(str(stats))
+
+    def gogui_rules_game_id_cmd(self, args):
+        self.respond("Go")
+    
+    def gogui_rules_board_size_cmd(self, args):
+        self.respond(str(self.board.size))
+
+    def gogui_rules_legal_moves_cmd(self, args):
+        if self.board.passes >= 2:
+            self.respond()
+            return
+        moves = GoBoardUtil.generate_legal_moves(self.board, self.board.current_player)
+        gtp_moves = []
+        for move in moves:
+            coords = point_to_coord(move, self.board.size)
+            gtp_moves.append(format_point(coords))
+        sorted_moves = ' '.join(sorted(gtp_moves))
+        self.respond(sorted_moves)
+    
+    def gogui_rules_side_to_move_cmd(self, args):
+        color = "black" if self.board.current_player == BLACK else "white"
+        self.respond(color)
+    
+    def gogui_rules_board_cmd(self, args):
+        size = self.board.size
+        str = ''
+        for row in range(size-1, -1, -1):
+            start = self.board.row_start(row + 1)
+            for i in range(size):
+                point = self.board.board[start + i]
+                if point == BLACK:
+                    str += 'X'
+                elif point == WHITE:
+                    str += 'O'
+                elif point == EMPTY:
+                    str += '.'
+                else:
+                    assert False
+            str += '\n'
+        self.respond(str)
+    
+    def gogui_rules_final_result_cmd(self, args):
+        if self.board.passes < 2:
+            self.respond("unknown")
+            return
+        score = self.board.score(self.go_engine.komi)
+        if score > 0:
+            self.respond("black")
+        elif score < 0:
+            self.respond("white")
+        else:
+            self.respond("draw")
+
+    def gogui_analyze_cmd(self, args):
+        self.respond("pstring/Legal Moves For ToPlay/gogui-rules_legal_moves\n"
+                     "pstring/Side to Play/gogui-rules_side_to_move\n"
+                     "pstring/Final Result/gogui-rules_final_result\n"
+                     "pstring/Board Size/gogui-rules_board_size\n"
+                     "pstring/Rules GameID/gogui-rules_game_id\n"
+                     "pstring/Show Board/gogui-rules_board\n"
+                     "string/Final Score/final_score\n"
+                     "string/Search Statistics/search_stats\n"
+                     )
+
+def illegal_reason(board, move):
+    """ Why color may not play move on board """
+    if board.board[move] != EMPTY:
+        return "occupied"
+    if move == board.ko_recapture:
+        return "ko"
+    return "suicide"
+
+def point_to_coord(point, boardsize):
+    """
+    Transform point given as board array index 
+    to (row, col) coordinate representation.
+    Special case: PASS is not transformed
+    """
+    if point == PASS:
+        return PASS
+    else:
+        NS = boardsize + 1
+        return divmod(point, NS)
+
+def format_point(move):
+    """
+    Return move coordinates as a string such as 'a1', or 'pass'.
+    """
+    column_letters = "ABCDEFGHJKLMNOPQRSTUVWXYZ"
+    #column_letters = "abcdefghjklmnopqrstuvwxyz"
+    if move == PASS:
+        return "pass"
+    row, col = move
+    if not 0 <= row < MAXSIZE or not 0 <= col < MAXSIZE:
+        raise ValueError
+    return column_letters[col - 1]+ str(row) 
+    
+def move_to_coord(point_str, board_size):
+    """
+    Convert a string point_str representing a point, as specified by GTP,
+    to a pair of coordinates (row, col) in range 1 .. board_size.
+    Raises ValueError if point_str is invalid
+    """
+    if not 2 <= board_size <= MAXSIZE:
+        raise ValueError("board_size out of range")
+    s = point_str.lower()
+    if s == "pass":
+        return PASS
+    try:
+        col_c = s[0]
+        if (not "a" <= col_c <= "z") or col_c == "i":
+            raise ValueError
+        col = ord(col_c) - ord("a")
+        if col_c < "i":
+            col += 1
+        row = int(s[1:])
+        if row < 1:
+            raise ValueError
+    except (IndexError, ValueError):
+        raise ValueError("illegal move: \"{}\" wrong coordinate".format(s))
+    if not (col <= board_size and row <= board_size):
+        raise ValueError("illegal move: \"{}\" wrong coordinate".format(s))
+    return row, col
+
+def color_to_int(c):
+    """convert character to the appropriate integer code"""
+    color_to_int = {"b": BLACK , "w": WHITE, "e": EMPTY, 
+                    "BORDER": BORDER}
+    return color_to_int[c] 
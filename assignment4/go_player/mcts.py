@@ -0,0 +1,213 @@
+"""
+mcts.py
+
+UCT search for Go on SimpleGoBoard.
+
+Every iteration walks down the tree from the root with UCT, adds one child
+for an untried move, and runs one light playout from there: random legal
+moves that do not fill the player's own simple eyes, until both players
+pass. The finished playout is scored with area scoring and komi, and every
+node on the path counts the result for the color that played its move.
+"""
+
+import math
+import random
+from board_util import GoBoardUtil, BLACK, WHITE, EMPTY, PASS
+
+# UCT exploration constant, for win rates in [0, 1]
+C = 0.7
+# playouts end after this many moves times the number of points, even if
+# the players never pass (long ko fights)
+PLAYOUT_LENGTH_FACTOR = 3
+
+
+class SearchStats:
+    """
+    Counters of one search, reported by the search_stats GTP command.
+    """
+    def __init__(self):
+        self.iterations = 0
+        self.nodes = 1  # the root
+        self.max_depth = 0
+        self.playout_moves = 0
+        self.seconds = 0.0
+
+    def __str__(self):
+        rate = self.iterations / self.seconds if self.seconds > 0 else 0
+        return "\n".join([
+            "iterations {}".format(self.iterations),
+            "nodes {}".format(self.nodes),
+            "max_depth {}".format(self.max_depth),
+            "playout_moves {}".format(self.playout_moves),
+            "seconds {:.3f}".format(self.seconds),
+            "playouts_per_second {:.0f}".format(rate),
+        ])
+
+
+def playout_move(board, color):
+    """
+    A random legal move for color that does not fill one of its own eyes,
+    PASS if there is none. Scans the empty points from a random start, the
+    light policy of the playouts.
+    """
+    moves = board.get_empty_points().tolist()
+    if not moves:
+        return PASS
+    start = random.randrange(len(moves))
+    for move in moves[start:] + moves[:start]:
+        if not board.is_eye(move, color) and board.is_legal(move, color):
+            return move
+    return PASS
+
+
+def playout(board, komi):
+    """
+    Play random moves on board until both players pass. Returns the winner,
+    BLACK or WHITE, EMPTY for a draw, and the number of moves played.
+    """
+    max_moves = PLAYOUT_LENGTH_FACTOR * board.size * board.size
+    moves = 0
+    while board.passes < 2 and moves < max_moves:
+        color = board.current_player
+        board.play_move(playout_move(board, color), color)
+        moves += 1
+    return winner(board, komi), moves
+
+
+def winner(board, komi):
+    """ The winner of the game on board by area scoring, EMPTY for a draw """
+    score = board.score(komi)
+    if score > 0:
+        return BLACK
+    if score < 0:
+        return WHITE
+    return EMPTY
+
+
+def candidate_moves(board):
+    """
+    The moves a node tries: legal moves that do not fill an own eye, and
+    PASS. The tree follows positional superko, the playouts only the ko rule.
+    """
+    color = board.current_player
+    moves = [move for move in board.get_empty_points().tolist()
+             if not board.is_eye(move, color) and board.is_legal(move, color, superko=True)]
+    random.shuffle(moves)
+    moves.append(PASS)
+    return moves
+
+
+class MctsNode:
+    def __init__(self, parent, move, color):
+        self.parent = parent
+        self.move = move
+        self.color = color  # color that just played
+        self.children = []
+        # moves without a child yet, None until the node is expanded
+        self.untried = None
+        self.wins = 0.0
+        self.visits = 0
+
+    def uct_child(self):
+        log_visits = math.log(self.visits)
+        best, best_value = None, -1.0
+        for child in self.children:
+            value = child.wins / child.visits + C * math.sqrt(log_visits / child.visits)
+            if value > best_value:
+                best, best_value = child, value
+        return best
+
+
+class MctsTree:
+    def __init__(self, board, color, komi):
+        """
+        Search tree for color to play on board, which the tree owns.
+        """
+        self.board = board
+        self.color = color
+        self.komi = komi
+        self.root = MctsNode(None, None, GoBoardUtil.opponent(color))
+        self.stats = SearchStats()
+
+    def step(self):
+        """ One iteration: select, expand, simulate and back propagate """
+        node = self.root
+        board = self.board.copy()
+        depth = 0
+        # select
+        while node.untried == [] and node.children and board.passes < 2:
+            node = node.uct_child()
+            board.play_move(node.move, board.current_player)
+            depth += 1
+        # expand
+        if board.passes < 2:
+            if node.untried is None:
+                node.untried = candidate_moves(board)
+            move = node.untried.pop()
+            color = board.current_player
+            board.play_move(move, color)
+            child = MctsNode(node, move, color)
+            node.children.append(child)
+            node = child
+            depth += 1
+            self.stats.nodes += 1
+            self.stats.max_depth = max(self.stats.max_depth, depth)
+        # simulate
+        result, moves = playout(board, self.komi)
+        self.stats.playout_moves += moves
+        self.stats.iterations += 1
+        # back propagate
+        while node is not None:
+            node.visits += 1
+            if result == node.color:
+                node.wins += 1
+            elif result == EMPTY:
+                node.wins += 0.5
+            node = node.parent
+
+    def advance(self, move):
+        """
+        Play move at the root and keep the subtree below it as the new tree.
+        Returns False, leaving the tree unchanged, if move was never expanded.
+        """
+        for child in self.root.children:
+            if child.move == move:
+                break
+        else:
+            return False
+        child.parent = None
+        self.root = child
+        self.board.play_move(move, self.board.current_player)
+        self.color = GoBoardUtil.opponent(self.color)
+        return True
+
+    def root_stats(self):
+        """ {move: (wins, visits)} of the children of the root """
+        return {child.move: (child.wins, child.visits) for child in self.root.children}
+
+    def top_two(self):
+        """ Visits of the two most visited children of the root """
+        visits = sorted((child.visits for child in self.root.children), reverse=True)
+        visits += [0, 0]
+        return visits[0], visits[1]
+
+    def best_move(self):
+        """ The most visited move at the root """
+        return best_move(self.root_stats())
+
+
+def best_move(stats):
+    """ The most visited move of {move: (wins, visits)}, PASS if empty """
+    if not stats:
+        return PASS
+    return max(stats, key=lambda move: stats[move][1])
+
+
+def merge_stats(all_stats):
+    """ Sum the root statistics of several searches of the same position """
+    merged = {}
+    for stats in all_stats:
+        for move, (wins, visits) in stats.items():
+            total_wins, total_visits = merged.get(move, (0.0, 0))
+            merged[move] = (total_wins + wins, total_visits + visits)
+    return merged
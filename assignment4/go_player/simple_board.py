@@ -0,0 +1,613 @@
+"""
+simple_board.py
+
+Implements a basic Go board with functions to:
+- initialize to a given board size
+- check if a move is legal
+- play a move
+- score a finished game with area scoring
+
+The board uses a 1-dimensional representation with padding
+"""
+
+import random
+import numpy as np
+from board_util import GoBoardUtil, BLACK, WHITE, EMPTY, BORDER, \
+                       PASS, is_black_white, coord_to_point, where1d, \
+                       MAXSIZE, NULLPOINT
+
+# 3x3 patterns: the pattern of a point encodes the colors of its 8
+# neighbors with 2 bits each, in the order of _pattern_directions.
+# play_move keeps the patterns of all points up to date,
+# so the tables below answer local questions about a point with one lookup.
+def _pattern_directions(NS):
+    """ Offsets of the 4 direct neighbors, then the 4 diagonal neighbors """
+    return [-NS, NS, -1, 1, -NS - 1, -NS + 1, NS - 1, NS + 1]
+
+def _pattern_tables():
+    codes = np.arange(4 ** 8)
+    colors = [(codes >> (2 * i)) & 3 for i in range(8)]
+    direct, diagonal = colors[:4], colors[4:]
+    has_liberty = np.any([c == EMPTY for c in direct], axis = 0)
+    at_edge = np.any([c == BORDER for c in diagonal], axis = 0)
+    surrounded = [None, None, None]
+    eye = [None, None, None]
+    for color in (BLACK, WHITE):
+        opp_color = GoBoardUtil.opponent(color)
+        is_surrounded = np.all([(c == color) | (c == BORDER) for c in direct], axis = 0)
+        false_count = np.sum([c == opp_color for c in diagonal], axis = 0)
+        surrounded[color] = is_surrounded.tolist()
+        # 0 opponent diagonals at the edge, 1 in the center, see is_eye
+        eye[color] = (is_surrounded & (false_count <= 1 - at_edge)).tolist()
+    return has_liberty.tolist(), surrounded, eye
+
+# LIBERTY_PATTERN[pattern]: the point has an empty direct neighbor
+# SURROUNDED_PATTERN[color][pattern]: all direct neighbors are color or border
+# EYE_PATTERN[color][pattern]: the point is a simple eye of color
+LIBERTY_PATTERN, SURROUNDED_PATTERN, EYE_PATTERN = _pattern_tables()
+
+# size -> (neighbors, empty board patterns), shared by all boards of a size
+_size_tables = {}
+
+def _zobrist_keys():
+    maxpoint = MAXSIZE * MAXSIZE + 3 * (MAXSIZE + 1)
+    keys = random.Random(MAXSIZE)
+    return [[0] * maxpoint] + [[keys.getrandbits(64) for _ in range(maxpoint)]
+                               for color in (BLACK, WHITE)]
+
+# ZOBRIST[color][point]: the hash of a position is the xor of the keys of
+# its stones
+ZOBRIST = _zobrist_keys()
+
+class SimpleGoBoard(object):
+
+    def get_color(self, point):
+        return self.board[point]
+
+    def pt(self, row, col):
+        return coord_to_point(row, col, self.size)
+
+    def is_legal(self, point, color, superko=False):
+        """
+        Check whether it is legal for color to play on point.
+        With superko, moves that repeat an earlier position of the game
+        are illegal too (positional superko).
+        """
+        assert is_black_white(color)
+        # Special cases
+        if point == PASS:
+            return True
+        elif self.board[point] != EMPTY:
+            return False
+        if point == self.ko_recapture:
+            return False
+        if not LIBERTY_PATTERN[self.pattern[point]] and self._is_suicide(point, color):
+            return False
+        return not (superko and self._next_hash(point, color) in self.history)
+
+    def _is_suicide(self, point, color):
+        """
+        Would a stone of color on the empty point have no liberty, after
+        removing the stones it captures? Uses the liberty sets of the
+        neighboring blocks only.
+        """
+        pattern = self.pattern[point]
+        for offset, shift in self.direct_neighbors:
+            nb_color = (pattern >> shift) & 3
+            if nb_color == EMPTY:
+                return False
+            if nb_color == BORDER:
+                continue
+            liberties = self.liberties[self.block[point + offset]]
+            if nb_color == color:
+                if len(liberties) > 1:
+                    return False
+            elif len(liberties) == 1:
+                # point is the last liberty, the block is captured
+                return False
+        return True
+
+    def _next_hash(self, point, color):
+        """
+        The hash of the position after color plays on point, with the
+        stones it captures, without playing the move.
+        """
+        code = self.hash ^ ZOBRIST[color][point]
+        opp_color = GoBoardUtil.opponent(color)
+        captured = []
+        pattern = self.pattern[point]
+        for offset, shift in self.direct_neighbors:
+            if (pattern >> shift) & 3 == opp_color:
+                block_id = self.block[point + offset]
+                # the only liberty of the block is point
+                if len(self.liberties[block_id]) == 1 and block_id not in captured:
+                    captured.append(block_id)
+                    for stone in self.block_stones(block_id):
+                        code ^= ZOBRIST[opp_color][stone]
+        return code
+
+    def get_empty_points(self):
+        """
+        Return:
+            The empty points on the board, in no particular order.
+            A view of the board's own array: valid until the next move,
+            do not modify. Moves that are undone in reverse order restore
+            the order of the points.
+        """
+        return self.empty[:self.num_empty]
+
+    def update_empty_points(self):
+        """
+        Rebuild the list of empty points from self.board, after writing
+        stones into self.board directly.
+        empty[:num_empty] are the empty points, empty_index[p] is the
+        position of p in empty. Stones swap-remove their point with the
+        last empty point.
+        """
+        points = where1d(self.board == EMPTY)
+        self.empty = np.zeros(self.size * self.size, dtype = np.int64)
+        self.empty[:len(points)] = points
+        self.num_empty = len(points)
+        index = np.zeros(self.maxpoint, dtype = np.int64)
+        index[points] = np.arange(len(points))
+        self.empty_index = index.tolist()
+
+    def _remove_empty(self, point):
+        i = self.empty_index[point]
+        self.num_empty -= 1
+        last = int(self.empty[self.num_empty])
+        self.empty[i] = last
+        self.empty_index[last] = i
+        # point keeps its old position, for _add_empty
+        self.empty_index[point] = i
+
+    def _add_empty(self, point):
+        i = self.empty_index[point]
+        n = self.num_empty
+        self.num_empty += 1
+        if i < n:
+            # undo of the last removal: move back to the old position
+            moved = int(self.empty[i])
+            self.empty[n] = moved
+            self.empty_index[moved] = n
+        else:
+            i = n
+        self.empty[i] = point
+        self.empty_index[point] = i
+
+    def __init__(self, size):
+        """
+        Creates a Go board of given size
+        """
+        assert 2 <= size <= MAXSIZE
+        self.reset(size)
+
+    def reset(self, size):
+        """
+        Creates a start state, an empty board with the given size
+        The board is stored as a one-dimensional array
+        See GoBoardUtil.coord_to_point for explanations of the array encoding
+        """
+        self.size = size
+        self.NS = size + 1
+        self.WE = 1
+        self.ko_recapture = None
+        self.current_player = BLACK
+        # consecutive passes, the game ends after two
+        self.passes = 0
+        self.maxpoint = size * size + 3 * (size + 1)
+        self.board = np.full(self.maxpoint, BORDER, dtype = np.int32)
+        self._initialize_empty_points(self.board)
+        self.update_empty_points()
+        self._initialize_neighbors()
+        directions = _pattern_directions(self.NS)
+        # (offset, shift): the neighbor at point + offset has its color in
+        # bits shift and shift + 1 of the pattern of point, in the order of
+        # _neighbors
+        shifts = {offset: 2 * d for d, offset in enumerate(directions)}
+        self.direct_neighbors = [(nb - self.NS, shifts[nb - self.NS])
+                                 for nb in self._neighbors(self.NS)]
+        self.pattern_updates = [(-offset, 2 * d) for d, offset in enumerate(directions)]
+        # Go blocks, maintained by play_move: block[p] is the id of the
+        # block of stone p (one of its stones), NULLPOINT for no stone.
+        # next_stone links the stones of a block into a ring.
+        # liberties and block_size map a block id to its set of liberties
+        # and its number of stones.
+        self.block = [NULLPOINT] * self.maxpoint
+        self.next_stone = [NULLPOINT] * self.maxpoint
+        self.liberties = {}
+        self.block_size = {}
+        # Zobrist hash of the position, and the hashes of all positions of
+        # the game, for superko
+        self.hash = 0
+        self.history = {self.hash}
+        # one record per play_move, for undo_move
+        self.undo_stack = []
+
+    def copy(self):
+        """
+        A copy of the board. The copy starts with an empty undo stack, it
+        cannot take back the moves played before.
+        """
+        b = SimpleGoBoard(self.size)
+        assert b.NS == self.NS
+        assert b.WE == self.WE
+        b.ko_recapture = self.ko_recapture
+        b.current_player = self.current_player
+        b.passes = self.passes
+        assert b.maxpoint == self.maxpoint
+        b.board = np.copy(self.board)
+        b.empty = self.empty.copy()
+        b.empty_index = list(self.empty_index)
+        b.num_empty = self.num_empty
+        b.block = list(self.block)
+        b.next_stone = list(self.next_stone)
+        b.liberties = {id: set(libs) for id, libs in self.liberties.items()}
+        b.block_size = dict(self.block_size)
+        b.pattern = list(self.pattern)
+        b.hash = self.hash
+        b.history = set(self.history)
+        return b
+
+    def row_start(self, row):
+        assert row >= 1
+        assert row <= self.size
+        return row * self.NS + 1
+        
+    def _initialize_empty_points(self, board):
+        """
+        Fills points on the board with EMPTY
+        Argument
+        ---------
+        board: numpy array, filled with BORDER
+        """
+        for row in range(1, self.size + 1):
+            start = self.row_start(row)
+            board[start : start + self.size] = EMPTY
+
+    def _on_board_neighbors(self, point):
+        nbs = []
+        for nb in self._neighbors(point):
+            if self.board[nb] != BORDER:
+                nbs.append(nb)
+        return nbs
+            
+    def _initialize_neighbors(self):
+        """
+        precompute neighbor array and the 3x3 patterns of the empty board.
+        For each point on the board, store its list of on-the-board neighbors.
+        Computed once per board size.
+        """
+        tables = _size_tables.get(self.size)
+        if tables is None:
+            neighbors = []
+            for point in range(self.maxpoint):
+                if self.board[point] == BORDER:
+                    neighbors.append([])
+                else:
+                    neighbors.append(self._on_board_neighbors(point))
+            tables = neighbors, self._compute_patterns()
+            _size_tables[self.size] = tables
+        self.neighbors = tables[0]
+        self.pattern = list(tables[1])
+
+    def _compute_patterns(self):
+        """ The 3x3 pattern of every point of the board, 0 off the board """
+        pattern = [0] * self.maxpoint
+        directions = _pattern_directions(self.NS)
+        for point in where1d(self.board != BORDER).tolist():
+            for d, offset in enumerate(directions):
+                pattern[point] |= int(self.board[point + offset]) << (2 * d)
+        return pattern
+
+    def _update_patterns(self, point, delta):
+        """
+        The color of point changed by delta (new color - old color):
+        update the patterns of its 8 neighbors.
+        """
+        pattern = self.pattern
+        for offset, shift in self.pattern_updates:
+            pattern[point + offset] += delta << shift
+
+    def is_eye(self, point, color):
+        """
+        Check if point is a simple eye for color: surrounded by color, with
+        at most one opponent stone on the diagonals in the center, none at
+        the edge.
+        """
+        return EYE_PATTERN[color][self.pattern[point]]
+
+    def _is_surrounded(self, point, color):
+        """
+        check whether empty point is surrounded by stones of color.
+        """
+        return SURROUNDED_PATTERN[color][self.pattern[point]]
+
+    def block_stones(self, stone):
+        """ List of the stones in the block of stone """
+        stones = [stone]
+        p = self.next_stone[stone]
+        while p != stone:
+            stones.append(p)
+            p = self.next_stone[p]
+        return stones
+
+    def block_liberties(self, stone):
+        """ The set of liberties of the block of stone, do not modify """
+        return self.liberties[self.block[stone]]
+
+    def _add_stone(self, point, color):
+        """
+        Add a stone of color on point to the blocks: it takes a liberty from
+        every neighboring block and joins the blocks of its color.
+        Returns the list of merges, for _take_back_stone.
+        """
+        block = self.block
+        block[point] = point
+        self.next_stone[point] = point
+        self.block_size[point] = 1
+        liberties = self.liberties[point] = set()
+        for nb in self.neighbors[point]:
+            if block[nb] == NULLPOINT:
+                liberties.add(nb)
+            else:
+                self.liberties[block[nb]].discard(point)
+        merges = []
+        pattern = self.pattern[point]
+        for offset, shift in self.direct_neighbors:
+            nb = point + offset
+            if (pattern >> shift) & 3 == color and block[nb] != block[point]:
+                merges.append(self._merge_blocks(block[point], block[nb]))
+        return merges
+
+    def _take_back_stone(self, point, merges):
+        """ Take back _add_stone: split the merged blocks, remove the stone """
+        for merge in reversed(merges):
+            self._split_blocks(*merge)
+        block = self.block
+        del self.liberties[point]
+        del self.block_size[point]
+        block[point] = NULLPOINT
+        for nb in self.neighbors[point]:
+            if block[nb] != NULLPOINT:
+                self.liberties[block[nb]].add(point)
+
+    def _merge_blocks(self, a, b):
+        """
+        Join blocks a and b, relabeling the stones of the smaller one.
+        Returns the arguments of _split_blocks that take the merge back.
+        """
+        if self.block_size[a] < self.block_size[b]:
+            a, b = b, a
+        block = self.block
+        stone = b
+        while True:
+            block[stone] = a
+            stone = self.next_stone[stone]
+            if stone == b:
+                break
+        # splice the two rings
+        next_stone = self.next_stone
+        next_stone[a], next_stone[b] = next_stone[b], next_stone[a]
+        liberties_b = self.liberties.pop(b)
+        added = liberties_b - self.liberties[a]
+        self.liberties[a] |= added
+        self.block_size[a] += self.block_size.pop(b)
+        return a, b, added, liberties_b
+
+    def _split_blocks(self, a, b, added, liberties_b):
+        """ Take back _merge_blocks(a, b), see there """
+        # swapping the successors of a and b again splits the ring
+        next_stone = self.next_stone
+        next_stone[a], next_stone[b] = next_stone[b], next_stone[a]
+        block = self.block
+        stone = b
+        size = 0
+        while True:
+            block[stone] = b
+            size += 1
+            stone = next_stone[stone]
+            if stone == b:
+                break
+        self.liberties[a] -= added
+        self.liberties[b] = liberties_b
+        self.block_size[a] -= size
+        self.block_size[b] = size
+
+    def _remove_block(self, block_id):
+        """
+        Capture the block: its stones become liberties of the neighboring
+        blocks. Returns the list of captured stones and the positions they
+        kept in the empty points, for _restore_block.
+        """
+        stones = self.block_stones(block_id)
+        positions = [self.empty_index[stone] for stone in stones]
+        block = self.block
+        color = int(self.board[block_id])
+        for stone in stones:
+            self.board[stone] = EMPTY
+            self._add_empty(stone)
+            self._update_patterns(stone, -color)
+            self.hash ^= ZOBRIST[color][stone]
+            block[stone] = NULLPOINT
+        for stone in stones:
+            for nb in self.neighbors[stone]:
+                if block[nb] != NULLPOINT:
+                    self.liberties[block[nb]].add(stone)
+        del self.liberties[block_id]
+        del self.block_size[block_id]
+        return stones, positions
+
+    def _restore_block(self, block_id, stones, positions, color, liberty):
+        """
+        Take back _remove_block: put the captured stones back, with their
+        only liberty, the point of the capturing stone.
+        """
+        block = self.block
+        for stone, position in zip(reversed(stones), reversed(positions)):
+            self.board[stone] = color
+            self._remove_empty(stone)
+            self.empty_index[stone] = position
+            self._update_patterns(stone, color)
+            self.hash ^= ZOBRIST[color][stone]
+            block[stone] = block_id
+        for i, stone in enumerate(stones):
+            self.next_stone[stone] = stones[i + 1 - len(stones)]
+            for nb in self.neighbors[stone]:
+                if block[nb] != NULLPOINT and block[nb] != block_id:
+                    self.liberties[block[nb]].discard(stone)
+        self.liberties[block_id] = {liberty}
+        self.block_size[block_id] = len(stones)
+
+    def play_move(self, point, color, superko=False):
+        """
+        Play a move of color on point
+        Returns boolean: whether move was legal, see is_legal for superko
+        """
+        assert is_black_white(color)
+        # Special cases
+        if point == PASS:
+            self.undo_stack.append((point, color, self.ko_recapture,
+                                    self.current_player, self.passes, None, None, False))
+            self.ko_recapture = None
+            self.current_player = GoBoardUtil.opponent(color)
+            self.passes += 1
+            return True
+        elif self.board[point] != EMPTY:
+            return False
+        if point == self.ko_recapture:
+            return False
+        if self._is_suicide(point, color):
+            return False
+        if superko and self._next_hash(point, color) in self.history:
+            return False
+
+        # General case: deal with captures and next ko point
+        opp_color = GoBoardUtil.opponent(color)
+        in_enemy_eye = self._is_surrounded(point, opp_color)
+        self.board[point] = color
+        self._remove_empty(point)
+        self._update_patterns(point, color)
+        self.hash ^= ZOBRIST[color][point]
+        merges = self._add_stone(point, color)
+        captures = []
+        single_captures = []
+        for offset, shift in self.direct_neighbors:
+            nb = point + offset
+            # captures change the pattern, read it for every neighbor
+            if (self.pattern[point] >> shift) & 3 == opp_color \
+                    and not self.liberties[self.block[nb]]:
+                block_id = self.block[nb]
+                stones, positions = self._remove_block(block_id)
+                captures.append((block_id, stones, positions))
+                if len(stones) == 1:
+                    single_captures.append(nb)
+        new_position = self.hash not in self.history
+        if new_position:
+            self.history.add(self.hash)
+        self.undo_stack.append((point, color, self.ko_recapture, self.current_player,
+                                self.passes, merges, captures, new_position))
+        self.ko_recapture = None
+        if in_enemy_eye and len(single_captures) == 1:
+            self.ko_recapture = single_captures[0]
+        self.current_player = GoBoardUtil.opponent(color)
+        self.passes = 0
+        return True
+
+    def undo_move(self):
+        """
+        Take back the last move of play_move. Restores the position exactly:
+        the captured stones, the blocks and their liberties, the ko point,
+        the hash and history and the order of the empty points.
+        """
+        point, color, self.ko_recapture, self.current_player, self.passes, \
+            merges, captures, new_position = self.undo_stack.pop()
+        if point == PASS:
+            return
+        if new_position:
+            self.history.remove(self.hash)
+        opp_color = GoBoardUtil.opponent(color)
+        for block_id, stones, positions in reversed(captures):
+            self._restore_block(block_id, stones, positions, opp_color, point)
+        self._take_back_stone(point, merges)
+        self._update_patterns(point, -color)
+        self.hash ^= ZOBRIST[color][point]
+        self._add_empty(point)
+        self.board[point] = EMPTY
+
+    def score(self, komi):
+        """
+        Area score for black: black stones and the empty regions that
+        reach only black stones, minus the same for white, minus komi.
+        Positive if black wins.
+        """
+        area = [0, 0, 0, 0]
+        area[BLACK] = int(np.count_nonzero(self.board == BLACK))
+        area[WHITE] = int(np.count_nonzero(self.board == WHITE))
+        seen = set()
+        for point in self.get_empty_points().tolist():
+            if point in seen:
+                continue
+            seen.add(point)
+            # reached: bit mask of the colors next to the region,
+            # BLACK | WHITE if it touches both
+            stack, size, reached = [point], 0, 0
+            while stack:
+                p = stack.pop()
+                size += 1
+                pattern = self.pattern[p]
+                for offset, shift in self.direct_neighbors:
+                    nb_color = (pattern >> shift) & 3
+                    if nb_color == EMPTY:
+                        if p + offset not in seen:
+                            seen.add(p + offset)
+                            stack.append(p + offset)
+                    elif nb_color != BORDER:
+                        reached |= nb_color
+            area[reached] += size
+        return area[BLACK] - area[WHITE] - komi
+
+    def neighbors_of_color(self, point, color):
+        """ List of neighbors of point of given color """
+        nbc = []
+        for nb in self.neighbors[point]:
+            if self.get_color(nb) == color:
+                nbc.append(nb)
+        return nbc
+        
+    def find_neighbor_of_color(self, point, color):
+        """ Return one neighbor of point of given color, or None """
+        for nb in self.neighbors[point]:
+            if self.get_color(nb) == color:
+                return nb
+        return None
+        
+    def _neighbors(self, point):
+        """ List of all four neighbors of the point """
+        return [point - 1, point + 1, point - self.NS, point + self.NS]
+
+    def _diag_neighbors(self, point):
+        """ List of all four diagonal neighbors of point """
+        return [point - self.NS - 1, 
+                point - self.NS + 1, 
+                point + self.NS - 1, 
+                point + self.NS + 1]
+    
+    def _point_to_coord(self, point):
+        """
+        Transform point index to row, col.
+        
+        Arguments
+        ---------
+        point
+        
+        Returns
+        -------
+        x , y : int
+        coordination of the board  1<= x <=size, 1<= y <=size .
+        """
+        if point is None:
+            return 'pass'
+        row, col = divmod(point, self.NS)
+        return row, col
+
@@ -1,12 +1,12 @@
 import sys
-import signal
+import threading
+import numpy as np
 from gtp_connection import GtpConnection
 from board_util import GoBoardUtil, PASS, EMPTY, BLACK, WHITE
 from board import GoBoard
 from evaluation import evaluate
-from mcts import MctsTree, mcts_step
-
-import cProfile
+from mcts import MctsTree, SearchStats, mcts_step
+from time_manager import TimeManager
 
 WIN = 4
 BLOCK_WIN = 3
@@ -14,22 +14,15 @@ OPEN_FOUR = 2
 BLOCK_OPEN_FOUR = 1
 RANDOM = 0
 
-
-class TimeoutException(Exception):
-    pass
-
-
-def handler(signum, frame):
-    raise TimeoutException
-
-
-signal.signal(signal.SIGALRM, handler)
+# an MCTS iteration runs NUM_SIMS playouts, read the clock after every one
+MCTS_CHECK_EVERY = 1
 
 
 class HeuristicPolicy:
 
-    def best_moves(self, board, color):
-        moves = board.get_empty_points()
+    def best_moves(self, board, color, moves=None):
+        if moves is None:
+            moves = board.get_empty_points()
         moveResults = list(map(lambda m: (m, self._move_score(board, color, m)), moves))
         return sorted(moveResults, key=lambda r: r[1], reverse=True)
 
@@ -42,10 +35,15 @@ class HeuristicPolicy:
 
 class RulePolicy:
 
-    def best_moves(self, board, color):
+    def best_moves(self, board, color, moves=None):
+        """
+        (move, score) of moves, all empty points if None, best first
+        """
+        if moves is None:
+            moves = board.get_empty_points()
         moveResults = []
 
-        for move in board.get_empty_points():
+        for move in moves:
             moveScore = self.check_move(board, color, move)
             moveResults.append((move, moveScore))
 
@@ -127,8 +125,8 @@ class CombinedPolicy:
         self.rule_policy = RulePolicy()
         self.h_policy = HeuristicPolicy()
 
-    def best_moves(self, board, color):
-        rule_best_moves = self.rule_policy.best_moves(board, color)
+    def best_moves(self, board, color, moves=None):
+        rule_best_moves = self.rule_policy.best_moves(board, color, moves)
 
         # get best moves
         best_moves = []
@@ -143,7 +141,7 @@ class CombinedPolicy:
         if len(best_moves) > 0:
             return best_moves
 
-        return self.h_policy.best_moves(board, color)
+        return self.h_policy.best_moves(board, color, moves)
 
 
 class Gomoku:
@@ -162,33 +160,100 @@ class Gomoku:
         self.name = "GomokuAssignment4"
         self.version = 1.0
         self.timelimit = 59
+        # statistics of the last search, see search_stats
+        self.last_stats = None
+        # the tree of the last search, reused by the next one
+        self.tree = None
+        self._ponder_thread = None
+        self._ponder_stop = None
+        # set to end the search early, see async_gtp.py
+        self.interrupt = threading.Event()
 
     def set_timeout(self, limit):
         self.timelimit = limit
 
-    def get_move(self, board, color):
-        signal.alarm(self.timelimit)  # sets an alarm for the given time_limit
-
-        try:
-            mcts_tree = MctsTree(board, color, CombinedPolicy())
-            while True:
-                # print(mcts_tree)
-                mcts_step(mcts_tree)
-
-        except TimeoutException:
-            # print(mcts_tree)
-            return mcts_tree.best_move()
-        except Exception:
-            return mcts_tree.best_move()
-        finally:
-            signal.alarm(0)  # disable the alarm
+    def rule_based_moves(self, board, color):
+        """
+        The moves of the rule based policy as (score, move) pairs,
+        best first, for policy_moves.
+        """
+        return [(score, move) for move, score in RulePolicy().best_moves(board, color)]
 
+    def get_move(self, board, color):
+        self.stop_pondering()
+        time_manager = TimeManager(self.timelimit, MCTS_CHECK_EVERY)
+        mcts_tree = self._reuse_tree(board, color)
+        if mcts_tree is None:
+            mcts_tree = MctsTree(board.copy(), color, CombinedPolicy())
+        mcts_tree.stats = SearchStats()
+        self.tree = mcts_tree
+        self.last_stats = mcts_tree.stats
+        iterations = 0
+        while True:
+            mcts_step(mcts_tree)
+            iterations += 1
+            best, second = mcts_tree.top_two()
+            if self.interrupt.is_set() or time_manager.should_stop(iterations, best, second):
+                return mcts_tree.best_move()
+
+    def _reuse_tree(self, board, color):
+        """
+        The last search tree, advanced to the position on board,
+        or None if board is not the position of the tree plus the moves
+        played since (our move and the opponent's answer).
+        """
+        tree = self.tree
+        self.tree = None
+        if tree is None or tree.board.size != board.size:
+            return None
+        changed = np.nonzero(tree.board.board != board.board)[0]
+        if len(changed) > 2 or np.any(tree.board.board[changed] != EMPTY):
+            return None
+        # the side to move in the tree played first
+        moves = sorted(changed, key=lambda p: board.board[p] != tree.board.current_player)
+        for move in moves:
+            if board.board[move] != tree.board.current_player or not tree.advance(move):
+                return None
+        if tree.color != color:
+            return None
+        return tree
+
+    def start_pondering(self, board):
+        """
+        Keep searching the last tree in a background thread while the
+        opponent thinks about its answer to our move on board.
+        """
+        self.stop_pondering()
+        tree = self._reuse_tree(board, board.current_player)
+        if tree is None or board.detect_five_in_a_row() != EMPTY \
+                or len(board.get_empty_points()) == 0:
+            return
+        self.tree = tree
+        self._ponder_stop = threading.Event()
+        self._ponder_thread = threading.Thread(target=self._ponder,
+                                               args=(tree, self._ponder_stop), daemon=True)
+        self._ponder_thread.start()
+
+    def _ponder(self, tree, stop):
+        while not stop.is_set() and tree.root.winner == EMPTY:
+            mcts_step(tree)
+
+    def stop_pondering(self):
+        """ Stop pondering, the search stops after its current iteration """
+        if self._ponder_thread is not None:
+            self._ponder_stop.set()
+            self._ponder_thread.join()
+            self._ponder_thread = None
 
 def run():
     """
     start the gtp connection and wait for commands.
     """
     board = GoBoard(7)
+    if "--async" in sys.argv:
+        from async_gtp import AsyncGtpConnection
+        AsyncGtpConnection(Gomoku(), board).start_connection(sys.stdin)
+        return
     con = GtpConnection(Gomoku(), board)
 
     if len(sys.argv) >= 4 and sys.argv[1] == '--pycharm':
@@ -201,4 +266,4 @@ def run():
 
 if __name__ == "__main__":
     run()
-    # cProfile.run('run()')
+    # import cProfile; cProfile.run('run()')
@@ -0,0 +1,134 @@
+"""
+async_gtp.py
+
+Non-blocking GTP front-end, started with Gomoku4.py --async.
+
+AsyncGtpConnection reads stdin with an asyncio stream reader and runs
+genmove in a worker thread, so the connection keeps reading commands
+while the engine searches:
+- cheap read-only commands (showboard, gogui-rules_*, ...) are answered
+  right away, while the search runs
+- "stop", or the GoGui interrupt line "# interrupt", ends the search,
+  genmove then answers with the best move found so far
+- any other command (play, timelimit, quit, ...) first ends the search the
+  same way, then runs
+
+Since cheap commands can be answered before the genmove they follow,
+responses carry the id of their command ("=12 D4") when it has one.
+
+The SIGPROF profiler of profile_start samples the main thread only, so
+profile in the default synchronous mode.
+"""
+
+import asyncio
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from gtp_connection import GtpConnection
+
+# commands that only read the state and may run during a search;
+# policy_moves is not one, the rule based policy plays and undoes moves on
+# the board that the search copies
+CHEAP_COMMANDS = {
+    "protocol_version", "name", "version", "known_command", "list_commands",
+    "showboard", "legal_moves", "search_stats",
+    "gogui-rules_game_id", "gogui-rules_board_size", "gogui-rules_legal_moves",
+    "gogui-rules_side_to_move", "gogui-rules_board", "gogui-rules_final_result",
+    "gogui-analyze_commands",
+}
+SEARCH_COMMANDS = {"genmove"}
+INTERRUPT_LINE = "# interrupt"
+
+
+class AsyncGtpConnection(GtpConnection):
+    def __init__(self, go_engine, board, debug_mode=False):
+        super().__init__(go_engine, board, debug_mode)
+        self.commands["stop"] = self.stop_cmd
+        self.commands["gogui-interrupt"] = self.stop_cmd
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.search = None
+        # id of the command being answered, per thread
+        self.local = threading.local()
+
+    def write_response(self, status, response):
+        command_id = getattr(self.local, "command_id", None)
+        status += command_id if command_id is not None else ""
+        sys.stdout.write("{} {}\n\n".format(status, response))
+        sys.stdout.flush()
+
+    def respond(self, response=""):
+        self.write_response("=", response)
+
+    def error(self, error_msg):
+        self.write_response("?", error_msg)
+
+    def start_connection(self, instream):
+        asyncio.run(self.serve(instream))
+
+    async def serve(self, instream):
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), instream)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                await self.handle(line.decode())
+        finally:
+            await self.stop_search()
+            self.executor.shutdown()
+
+    def parse(self, line):
+        """ Returns (id, name, args), id is None for commands without one """
+        match = re.match(r"\s*(\d+)?\s*(.*)", line)
+        elements = match.group(2).split()
+        if not elements:
+            return match.group(1), None, []
+        return match.group(1), elements[0], elements[1:]
+
+    async def handle(self, line):
+        if line.strip() == INTERRUPT_LINE:
+            self.interrupt()
+            return
+        if line.lstrip().startswith("#"):
+            return
+        command_id, name, args = self.parse(line)
+        if name is None:
+            return
+        if name in CHEAP_COMMANDS and name in self.commands:
+            self.local.command_id = command_id
+            if not self.has_arg_error(name, len(args)):
+                self.commands[name](args)
+            return
+        await self.stop_search()
+        if name in SEARCH_COMMANDS:
+            self.go_engine.interrupt.clear()
+            loop = asyncio.get_running_loop()
+            self.search = loop.run_in_executor(self.executor, self.run_command,
+                                               command_id, line)
+        else:
+            self.run_command(command_id, line)
+
+    def run_command(self, command_id, line):
+        self.local.command_id = command_id
+        self.get_cmd(line)
+
+    def interrupt(self):
+        """ End the running search, it answers with its best move so far """
+        if self.search is not None:
+            self.go_engine.interrupt.set()
+
+    async def stop_search(self):
+        if self.search is not None:
+            self.interrupt()
+            await self.search
+            self.search = None
+
+    def stop_cmd(self, args):
+        """
+        The search, if any, has been stopped before this command runs.
+        """
+        self.respond()
@@ -0,0 +1,219 @@
+"""
+batch.py
+
+Batch analysis of many positions, for building and checking test suites.
+
+Reads a file of positions and writes one JSON line per position with the
+results of the analyses: the solve result, the policy_moves answer and the
+static evaluation for the side to move, e.g.
+    {"index": 0, "size": 7, "to_play": "b", "solve": "b C5",
+     "policy_moves": "Win C5", "evaluation": 3, "seconds": 0.01}
+The lines come in the order of the positions and are written as soon as
+they are known.
+
+Positions are separated by blank lines, lines starting with # are comments.
+A position is one of
+- a board, one row per line from the top, X black, O white, . empty;
+  black moves next when both have as many stones, else white
+- an SGF game: (;SZ[7];B[cc];W[dd])
+- a list of moves: "b c3 w d4" or "play b c3" lines, the boardsize
+  command or a "size 9" line sets the size
+Moves are played in order, after the last one the opponent moves.
+
+The positions are analyzed on a pool of worker processes, each keeping one
+board that it resets for every position.
+
+Usage:
+    python3 batch.py positions.txt [-o results.jsonl] [-j 4] [--timelimit 1]
+        [--policy rule_based] [--analyses solve,policy_moves,evaluation]
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from board_util import BLACK, WHITE, coord_to_point
+from board import GoBoard
+from evaluation import evaluate
+from gtp_connection import move_to_coord, policy_moves_string, solve_string
+from Gomoku4 import Gomoku
+from solver import solve
+
+ANALYSES = ("solve", "policy_moves", "evaluation")
+DEFAULT_SIZE = 7
+DEFAULT_TIMELIMIT = 1
+
+# per worker process: the board and the engine
+_worker_board = None
+_worker_engine = None
+
+
+def parse_positions(text, size=DEFAULT_SIZE):
+    """
+    The positions in text as (size, stones, to_play) tuples,
+    stones is a list of (color, row, col) with rows and columns from 1.
+    """
+    positions = []
+    for record in re.split(r"\n\s*\n", text):
+        lines = [line.strip() for line in record.splitlines()
+                 if line.strip() and not line.strip().startswith("#")]
+        if lines:
+            positions.append(parse_position(lines, size))
+    return positions
+
+
+def parse_position(lines, size=DEFAULT_SIZE):
+    if lines[0].startswith("("):
+        return parse_sgf(" ".join(lines), size)
+    if all(re.fullmatch(r"[XOxo.]+", line) for line in lines):
+        return parse_board(lines)
+    return parse_moves(lines, size)
+
+
+def parse_board(rows):
+    size = len(rows)
+    stones = []
+    for i, line in enumerate(rows):
+        if len(line) != size:
+            raise ValueError("board row {} is not {} points long".format(i + 1, size))
+        for col, char in enumerate(line.upper(), 1):
+            if char != ".":
+                stones.append((BLACK if char == "X" else WHITE, size - i, col))
+    black = sum(1 for color, _, _ in stones if color == BLACK)
+    to_play = BLACK if black == len(stones) - black else WHITE
+    return size, stones, to_play
+
+
+def parse_sgf(text, size=DEFAULT_SIZE):
+    stones = []
+    to_play = BLACK
+    for prop, value in re.findall(r"(SZ|B|W)\[([^\]]*)\]", text):
+        if prop == "SZ":
+            size = int(value)
+        elif value:
+            # SGF counts rows from the top
+            col = ord(value[0].lower()) - ord("a") + 1
+            row = size - (ord(value[1].lower()) - ord("a"))
+            color = BLACK if prop == "B" else WHITE
+            stones.append((color, row, col))
+            to_play = WHITE if color == BLACK else BLACK
+    return size, stones, to_play
+
+
+def parse_moves(lines, size=DEFAULT_SIZE):
+    tokens = " ".join(lines).lower().split()
+    stones = []
+    to_play = BLACK
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token == "play":
+            i += 1
+        elif token in ("boardsize", "size"):
+            size = int(tokens[i + 1])
+            i += 2
+        elif token in ("b", "w"):
+            color = BLACK if token == "b" else WHITE
+            coord = move_to_coord(tokens[i + 1], size)
+            if coord is not None:
+                stones.append((color, coord[0], coord[1]))
+            to_play = WHITE if color == BLACK else BLACK
+            i += 2
+        else:
+            raise ValueError("unexpected '{}' in move list".format(token))
+    return size, stones, to_play
+
+
+def _init_worker():
+    global _worker_board, _worker_engine
+    _worker_board = GoBoard(DEFAULT_SIZE)
+    _worker_engine = Gomoku()
+
+
+def analyze(job):
+    """ Analyze one position in a worker process """
+    if _worker_board is None:
+        _init_worker()
+    index, (size, stones, to_play), analyses, policy, timelimit = job
+    start = time.process_time()
+    board = _worker_board
+    board.reset(size)
+    for color, row, col in stones:
+        if not board.play_move(coord_to_point(row, col, size), color):
+            raise ValueError("position {}: point {},{} is occupied".format(index, row, col))
+    board.current_player = to_play
+    result = {"index": index, "size": size, "to_play": "b" if to_play == BLACK else "w"}
+    if "solve" in analyses:
+        winner, move = solve(board.copy(), timelimit)
+        result["solve"] = solve_string(winner, move, size)
+    if "policy_moves" in analyses:
+        result["policy_moves"] = policy_moves_string(board, policy, _worker_engine)
+    if "evaluation" in analyses:
+        result["evaluation"] = int(evaluate(board, to_play))
+    result["seconds"] = round(time.process_time() - start, 3)
+    return result
+
+
+def analyze_positions(positions, analyses=ANALYSES, policy="rule_based",
+                      timelimit=DEFAULT_TIMELIMIT, workers=None):
+    """
+    Yields the analysis of every position, in order.
+    workers == 0 analyzes in this process.
+    """
+    jobs = [(i, position, analyses, policy, timelimit)
+            for i, position in enumerate(positions)]
+    if workers == 0:
+        yield from map(analyze, jobs)
+        return
+    with ProcessPoolExecutor(workers, initializer=_init_worker) as pool:
+        yield from pool.map(analyze, jobs)
+
+
+def analyze_file(infile, outfile, analyses=ANALYSES, policy="rule_based",
+                 timelimit=DEFAULT_TIMELIMIT, workers=None, size=DEFAULT_SIZE):
+    """
+    Analyze the positions of infile into JSON lines in outfile ("-" for
+    stdout). Returns the number of positions.
+    """
+    with open(infile) as f:
+        positions = parse_positions(f.read(), size)
+    out = sys.stdout if outfile == "-" else open(outfile, "w")
+    try:
+        for result in analyze_positions(positions, analyses, policy, timelimit, workers):
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return len(positions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a file of Gomoku positions.")
+    parser.add_argument("positions", help="file of positions")
+    parser.add_argument("-o", "--output", default="-", help="JSON lines file, default stdout")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes, default one per CPU, 0 for none")
+    parser.add_argument("--timelimit", type=float, default=DEFAULT_TIMELIMIT,
+                        help="seconds to solve each position")
+    parser.add_argument("--policy", choices=("random", "rule_based"), default="rule_based")
+    parser.add_argument("--analyses", default=",".join(ANALYSES),
+                        help="comma separated, from " + ", ".join(ANALYSES))
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE,
+                        help="board size of move lists without one")
+    args = parser.parse_args()
+
+    analyses = tuple(args.analyses.split(","))
+    for name in analyses:
+        if name not in ANALYSES:
+            parser.error("unknown analysis: " + name)
+    count = analyze_file(args.positions, args.output, analyses, args.policy,
+                         args.timelimit, args.workers, args.size)
+    print("{} positions analyzed".format(count), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,9 @@ Implements a basic Go board with functions to:
 The board uses a 1-dimensional representation with padding
 """
 
+import os
+import pickle
+import random
 import numpy as np
 from board_util import (
     GoBoardUtil,
@@ -25,6 +28,64 @@ from board_util import (
     GO_POINT
 )
 
+# size -> (rows, cols, diags, boardLines5, boardLines6), computed once per
+# size and shared, read-only, by all boards of that size
+_geometry = {}
+
+# the geometry of a size is also kept on disk, loading it is several times
+# faster than computing it; bump the version when the line layout changes
+GEOMETRY_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__pycache__")
+GEOMETRY_VERSION = 1
+
+
+def _geometry_file(size):
+    return os.path.join(GEOMETRY_CACHE_DIR,
+                        "geometry-{}-v{}.pickle".format(size, GEOMETRY_VERSION))
+
+
+def _load_geometry(size):
+    """ The geometry of size from the disk cache, None if not there """
+    try:
+        with open(_geometry_file(size), "rb") as f:
+            geometry = pickle.load(f)
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+        return None
+    if len(geometry) != 5 or len(geometry[3]) != size * size:
+        return None
+    return geometry
+
+
+def _save_geometry(size, geometry):
+    """ Write the geometry of size to the disk cache, if it is writable """
+    path = _geometry_file(size)
+    temp = "{}.{}".format(path, os.getpid())
+    try:
+        os.makedirs(GEOMETRY_CACHE_DIR, exist_ok=True)
+        with open(temp, "wb") as f:
+            pickle.dump(geometry, f, pickle.HIGHEST_PROTOCOL)
+        # atomic, engines started together may write the same size
+        os.replace(temp, path)
+    except OSError:
+        pass
+
+
+def precompute_geometry(sizes=range(5, MAXSIZE + 1)):
+    """ Fill the disk cache for all board sizes """
+    for size in sizes:
+        if _load_geometry(size) is None:
+            GoBoard(size)
+
+
+def _zobrist_keys():
+    maxpoint = MAXSIZE * MAXSIZE + 3 * (MAXSIZE + 1)
+    keys = random.Random(MAXSIZE)
+    return [[0] * maxpoint] + [[keys.getrandbits(64) for _ in range(maxpoint)]
+                               for color in (BLACK, WHITE)]
+
+# ZOBRIST[color][point]: the hash of a position is the xor of the keys of
+# its stones; in Gomoku the stones also tell whose turn it is
+ZOBRIST = _zobrist_keys()
+
 """
 The GoBoard class implements a board and basic functions to play
 moves, check the end of the game, and count the acore at the end.
@@ -123,9 +184,20 @@ class GoBoard(object):
         self.maxpoint = size * size + 3 * (size + 1)
         self.board = np.full(self.maxpoint, BORDER, dtype=GO_POINT)
         self._initialize_empty_points(self.board)
-        self.calculate_rows_cols_diags()
-        self.boardLines5 = self.generate_lines(5)
-        self.boardLines6 = self.generate_lines(6)
+        self.update_empty_points()
+        self._set_geometry()
+
+    def _set_geometry(self):
+        geometry = _geometry.get(self.size)
+        if geometry is None:
+            geometry = _load_geometry(self.size)
+        if geometry is None:
+            self.calculate_rows_cols_diags()
+            geometry = (self.rows, self.cols, self.diags,
+                        self.generate_lines(5), self.generate_lines(6))
+            _save_geometry(self.size, geometry)
+        _geometry[self.size] = geometry
+        self.rows, self.cols, self.diags, self.boardLines5, self.boardLines6 = geometry
 
 
     def copy(self):
@@ -140,6 +212,10 @@ class GoBoard(object):
         b.boardLines6 = self.boardLines6
         assert b.maxpoint == self.maxpoint
         b.board = np.copy(self.board)
+        b.hash = self.hash
+        b.empty = self.empty.copy()
+        b.empty_index = list(self.empty_index)
+        b.num_empty = self.num_empty
         return b
 
     def get_color(self, point):
@@ -161,9 +237,72 @@ class GoBoard(object):
     def get_empty_points(self):
         """
         Return:
-            The empty points on the board
+            The empty points on the board, in no particular order.
+            A view of the board's own array: valid until the next move,
+            do not modify. Moves that are undone in reverse order restore
+            the order of the points.
+        """
+        return self.empty[:self.num_empty]
+
+    def update_empty_points(self):
+        """
+        Rebuild the list of empty points and the hash from self.board,
+        after writing stones into self.board directly.
+        empty[:num_empty] are the empty points, empty_index[p] is the
+        position of p in empty. play_move swap-removes its point with
+        the last empty point, undo_move reverses that.
+        """
+        points = where1d(self.board == EMPTY)
+        self.empty = np.zeros(self.size * self.size, dtype=np.int64)
+        self.empty[:len(points)] = points
+        self.num_empty = len(points)
+        index = np.zeros(self.maxpoint, dtype=np.int64)
+        index[points] = np.arange(len(points))
+        self.empty_index = index.tolist()
+        self.hash = 0
+        for color in (BLACK, WHITE):
+            for point in where1d(self.board == color):
+                self.hash ^= ZOBRIST[color][point]
+
+    def _remove_empty(self, point):
+        i = self.empty_index[point]
+        self.num_empty -= 1
+        last = int(self.empty[self.num_empty])
+        self.empty[i] = last
+        self.empty_index[last] = i
+        # point keeps its old position, for _add_empty
+        self.empty_index[point] = i
+
+    def _add_empty(self, point):
+        i = self.empty_index[point]
+        n = self.num_empty
+        self.num_empty += 1
+        if i < n:
+            # undo of the last removal: move back to the old position
+            moved = int(self.empty[i])
+            self.empty[n] = moved
+            self.empty_index[moved] = n
+        else:
+            i = n
+        self.empty[i] = point
+        self.empty_index[point] = i
+
+    def get_nearby_points(self, distance):
+        """
+        Return:
+            The empty points at most distance rows and columns away
+            from a stone, in increasing order. Empty on a board without stones.
         """
-        return where1d(self.board == EMPTY)
+        grid = self.board[: (self.size + 2) * self.NS].reshape(self.size + 2, self.NS)
+        stones = (grid == BLACK) | (grid == WHITE)
+        padded = np.pad(stones, distance)
+        rows, cols = grid.shape
+        near = np.zeros_like(stones)
+        for dr in range(2 * distance + 1):
+            for dc in range(2 * distance + 1):
+                near |= padded[dr : dr + rows, dc : dc + cols]
+        rows, cols = np.nonzero(near & (grid == EMPTY))
+        return (rows * self.NS + cols).tolist()
 
     def get_color_points(self, color):
         """
@@ -204,13 +343,17 @@ class GoBoard(object):
         elif self.board[point] != EMPTY:
             return False
         self.board[point] = color
+        self.hash ^= ZOBRIST[color][point]
+        self._remove_empty(point)
         self.current_player = GoBoardUtil.opponent(color)
         self.last2_move = self.last_move
         self.last_move = point
         return True
 
     def undo_move(self, move):
+        self.hash ^= ZOBRIST[self.board[move]][move]
         self.board[move] = EMPTY
+        self._add_empty(move)
         self.current_player = GoBoardUtil.opponent(self.current_player)
 
     def last_board_moves(self):
@@ -144,8 +144,7 @@ class GoBoardUtil(object):
         moves = board.get_empty_points()
         if len(moves) == 0:
             return PASS
-        np.random.shuffle(moves)
-        return moves[0]
+        return moves[np.random.randint(len(moves))]
 
     @staticmethod
     def generate_random_moves(board, use_eye_filter):
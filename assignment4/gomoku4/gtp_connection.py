@@ -14,6 +14,7 @@ from board_util import (
     WHITE,
     EMPTY,
     BORDER,
+    DRAW,
     PASS,
     MAXSIZE,
     coord_to_point,
@@ -27,6 +28,9 @@ OPEN_FOUR = 2
 BLOCK_OPEN_FOUR = 1
 RANDOM = 0
 
+# commands that run under the profiler between profile_start and profile_stop
+PROFILED_COMMANDS = ("genmove", "solve")
+
 class GtpConnection:
     def __init__(self, go_engine, board, debug_mode=False):
         """
@@ -43,6 +47,8 @@ class GtpConnection:
         self.go_engine = go_engine
         self.policy = "random"
         self.board = board
+        self.profiler = None
+        self.ponder = False
         self.commands = {
             "protocol_version": self.protocol_version_cmd,
             "quit": self.quit_cmd,
@@ -66,7 +72,13 @@ class GtpConnection:
             "gogui-rules_side_to_move": self.gogui_rules_side_to_move_cmd,
             "gogui-rules_board": self.gogui_rules_board_cmd,
             "gogui-rules_final_result": self.gogui_rules_final_result_cmd,
-            "gogui-analyze_commands": self.gogui_analyze_cmd
+            "gogui-analyze_commands": self.gogui_analyze_cmd,
+            "search_stats": self.search_stats_cmd,
+            "profile_start": self.profile_start_cmd,
+            "profile_stop": self.profile_stop_cmd,
+            "ponder": self.ponder_cmd,
+            "solve": self.solve_cmd,
+            "analyze_batch": self.analyze_batch_cmd
         }
 
         # used for argument checking
@@ -79,6 +91,9 @@ class GtpConnection:
             "genmove": (1, "Usage: genmove {w,b}"),
             "play": (2, "Usage: play {b,w} MOVE"),
             "legal_moves": (1, "Usage: legal_moves {w,b}"),
+            "profile_stop": (1, "Usage: profile_stop FILE"),
+            "ponder": (1, "Usage: ponder {on,off}"),
+            "analyze_batch": (2, "Usage: analyze_batch INFILE OUTFILE"),
         }
 
     def write(self, data):
@@ -117,8 +132,14 @@ class GtpConnection:
         if self.has_arg_error(command_name, len(args)):
             return
         if command_name in self.commands:
+            # every command sees the engine idle
+            self.go_engine.stop_pondering()
             try:
-                self.commands[command_name](args)
+                if self.profiler is not None and command_name in PROFILED_COMMANDS:
+                    with self.profiler:
+                        self.commands[command_name](args)
+                else:
+                    self.commands[command_name](args)
             except Exception as e:
                 self.debug_msg("Error executing command {}\n".format(str(e)))
                 self.debug_msg("Stack Trace:\n{}\n".format(traceback.format_exc()))
@@ -232,8 +253,8 @@ class GtpConnection:
         self.respond(sorted_moves)
 
     def time_limit_cmd(self, args):
-        assert 1 <= int(args[0]) <= 10000
-        limit = int(args[0])
+        limit = float(args[0])
+        assert 0 < limit <= 10000
         self.go_engine.set_timeout(limit)
         self.respond()
 
@@ -287,9 +308,21 @@ class GtpConnection:
         if self.board.is_legal(move, color):
             self.board.play_move(move, color)
             self.respond(move_as_string)
+            if self.ponder:
+                self.go_engine.start_pondering(self.board)
         else:
             self.respond("Illegal move: {}".format(move_as_string))
 
+    def ponder_cmd(self, args):
+        """
+        ponder on: keep searching while the opponent thinks, after genmove
+        """
+        if args[0] not in ("on", "off"):
+            self.error("Usage: ponder {on,off}")
+            return
+        self.ponder = args[0] == "on"
+        self.respond()
+
     def policy_cmd(self, args):
         if args[0] != "random" and args[0] != "rule_based":
             self.respond("invalid policy! Please use valid policytype: random or rule_based")
@@ -298,50 +331,28 @@ class GtpConnection:
             self.respond("policy set to " + self.policy)
 
     def policy_moves_cmd(self, args):
-        # checks for game over
-        if self.board.detect_five_in_a_row() != EMPTY:
-            self.respond("")
-            return
-        # set for Random as defualt
-        move_list = list(map(lambda move: (RANDOM, move), self.board.get_empty_points()))
-        if len(move_list) == 0:
-            self.respond("")
-            return
-        # change moves to rule_based if policy type is rule_based 
-        if self.policy == "rule_based":
-            move_list = self.go_engine.rule_based_moves(self.board, self.board.current_player)
-        
-        # get best moves
-        output = []
-        bestMoveScore = RANDOM
-        for move in move_list:
-            if move[0] > bestMoveScore:
-                bestMoveScore = move[0]
-            if move[0] < bestMoveScore:
-                break
-            moveCoord = point_to_coord(move[1], self.board.size)
-            output.append(format_point(moveCoord))
-
-        if bestMoveScore == WIN:
-            output_str = "Win"
-        elif bestMoveScore == BLOCK_WIN:
-            output_str = "BlockWin"
-        elif bestMoveScore == OPEN_FOUR:
-            output_str = "OpenFour"
-        elif bestMoveScore == BLOCK_OPEN_FOUR:
-            output_str = "BlockOpenFour"
-        else: 
-            output_str = "Random"
+        self.respond(policy_moves_string(self.board, self.policy, self.go_engine))
 
-        output.sort()
+    def solve_cmd(self, args):
+        """
+        Solve the position for the side to move within the time limit:
+        "b C5" or "w D4" if the winner can play the given move, "b" or "w"
+        if the side to move loses, "draw C5", or "unknown" on timeout.
+        """
+        from solver import solve
+        winner, move = solve(self.board.copy(), self.go_engine.timelimit)
+        self.respond(solve_string(winner, move, self.board.size))
 
-        for moveString in output:
-            output_str += " " + moveString
-        
-        self.respond(output_str)
+    def analyze_batch_cmd(self, args):
+        """
+        Analyze the positions of file args[0] on worker processes and
+        write one JSON line per position to file args[1], see batch.py.
+        """
+        from batch import analyze_file
+        count = analyze_file(args[0], args[1], policy=self.policy,
+                             timelimit=self.go_engine.timelimit)
+        self.respond("{} positions analyzed".format(count))
 
-        return    
-           
     def gogui_rules_game_id_cmd(self, args):
         self.respond("Gomoku")
 
@@ -406,8 +417,101 @@ class GtpConnection:
                      "pstring/Board Size/gogui-rules_board_size\n"
                      "pstring/Rules GameID/gogui-rules_game_id\n"
                      "pstring/Show Board/gogui-rules_board\n"
+                     "string/Search Statistics/search_stats\n"
                      )
 
+    def search_stats_cmd(self, args):
+        """
+        Report the statistics of the last genmove search.
+        """
+        stats = getattr(self.go_engine, "last_stats", None)
+        if stats is None:
+            self.respond("no search")
+        else:
+            self.respond(str(stats))
+
+    def profile_start_cmd(self, args):
+        """
+        Profile the following genmove commands with a sampling profiler,
+        args[0] is the optional sampling interval in milliseconds.
+        """
+        # imported on use, most games are never profiled
+        from sampling_profiler import SamplingProfiler
+        if args:
+            self.profiler = SamplingProfiler(float(args[0]) / 1000)
+        else:
+            self.profiler = SamplingProfiler()
+        self.respond()
+
+    def profile_stop_cmd(self, args):
+        """
+        Stop profiling and write the samples as collapsed stacks to args[0].
+        """
+        if self.profiler is None:
+            self.error("profiler not running")
+            return
+        self.profiler.write(args[0])
+        self.respond("{} samples written to {}".format(self.profiler.samples, args[0]))
+        self.profiler = None
+
+
+def policy_moves_string(board, policy, go_engine):
+    """
+    The best moves of policy for the side to move on board, as
+    policy_moves answers them: "OpenFour C3 D4", empty if the game is over.
+    """
+    # checks for game over
+    if board.detect_five_in_a_row() != EMPTY:
+        return ""
+    # set for Random as defualt
+    move_list = list(map(lambda move: (RANDOM, move), board.get_empty_points()))
+    if len(move_list) == 0:
+        return ""
+    # change moves to rule_based if policy type is rule_based
+    if policy == "rule_based":
+        move_list = go_engine.rule_based_moves(board, board.current_player)
+
+    # get best moves
+    output = []
+    bestMoveScore = RANDOM
+    for move in move_list:
+        if move[0] > bestMoveScore:
+            bestMoveScore = move[0]
+        if move[0] < bestMoveScore:
+            break
+        moveCoord = point_to_coord(move[1], board.size)
+        output.append(format_point(moveCoord))
+
+    if bestMoveScore == WIN:
+        output_str = "Win"
+    elif bestMoveScore == BLOCK_WIN:
+        output_str = "BlockWin"
+    elif bestMoveScore == OPEN_FOUR:
+        output_str = "OpenFour"
+    elif bestMoveScore == BLOCK_OPEN_FOUR:
+        output_str = "BlockOpenFour"
+    else:
+        output_str = "Random"
+
+    output.sort()
+
+    for moveString in output:
+        output_str += " " + moveString
+    return output_str
+
+
+def solve_string(winner, move, boardsize):
+    """
+    The answer of the solve command for the result of solver.solve
+    """
+    if winner is None:
+        return "unknown"
+    result = "draw" if winner == DRAW else "b" if winner == BLACK else "w"
+    if move is None:
+        return result
+    return "{} {}".format(result, format_point(point_to_coord(move, boardsize)))
+
+
 def point_to_coord(point, boardsize):
     """
     Transform point given as board array index
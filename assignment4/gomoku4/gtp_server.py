@@ -0,0 +1,211 @@
+"""
+gtp_server.py
+
+Multi-game GTP server: one process hosts many independent games.
+
+Every client connection over TCP (or a Unix socket) is one game with its
+own GoBoard and engine settings, speaking plain GTP, e.g.
+    nc localhost 5000
+Boards of the same size share their precomputed lines (see board.py), and
+the interpreter, NumPy and the line tables are loaded once for all games.
+
+Commands of one game run in order. The searches of genmove, solve and
+policy_moves are scheduled on a process pool shared by all games, so
+searches of different games run in parallel and never hold up the cheap
+commands of the other games; every worker process keeps one engine and one
+board per size, which it loads with the position of the game it searches
+for. analyze_batch starts its own worker processes and is waited for on a
+thread.
+
+Usage:
+    python3 gtp_server.py [--host 127.0.0.1] [--port 5000] [--unix PATH] [-j 4]
+"""
+
+import argparse
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from board import GoBoard
+from gtp_connection import GtpConnection, policy_moves_string, solve_string
+from Gomoku4 import Gomoku
+
+DEFAULT_PORT = 5000
+# commands that do not run on the event loop, so other games go on
+SEARCH_COMMANDS = {"genmove", "solve", "policy_moves", "analyze_batch"}
+
+# per worker process: the engine, and a board per size
+_worker_engine = None
+_worker_boards = {}
+
+
+def _load(size, cells, current_player):
+    """ The engine and the board of a worker process, loaded with a position """
+    global _worker_engine
+    if _worker_engine is None:
+        _worker_engine = Gomoku()
+    board = _worker_boards.get(size)
+    if board is None:
+        board = _worker_boards[size] = GoBoard(size)
+    board.board[:] = cells
+    board.update_empty_points()
+    board.current_player = current_player
+    return _worker_engine, board
+
+
+def _search(size, cells, current_player, color, timelimit):
+    """
+    Run one genmove search in a worker process, return the move and the
+    statistics of the search
+    """
+    engine, board = _load(size, cells, current_player)
+    engine.set_timeout(timelimit)
+    move = engine.get_move(board, color)
+    return move, engine.last_stats
+
+
+def _solve(size, cells, current_player, timelimit):
+    """ Solve a position in a worker process, return (winner, move) """
+    from solver import solve
+    _, board = _load(size, cells, current_player)
+    return solve(board, timelimit)
+
+
+def _policy_moves(size, cells, current_player, policy):
+    """ The policy_moves answer for a position, in a worker process """
+    engine, board = _load(size, cells, current_player)
+    return policy_moves_string(board, policy, engine)
+
+
+class PoolEngine:
+    """
+    Engine of one game: keeps the game's settings and runs its searches
+    on the shared process pool.
+    """
+    def __init__(self, pool):
+        self.name = "GomokuAssignment4"
+        self.version = 1.0
+        self.pool = pool
+        self.timelimit = 59
+        # statistics of the last search, see search_stats
+        self.last_stats = None
+
+    def set_timeout(self, limit):
+        self.timelimit = limit
+
+    def run(self, function, board, *args):
+        """ Run function on the position of board in a worker, wait for its result """
+        future = self.pool.submit(function, board.size, board.board.copy(),
+                                  board.current_player, *args)
+        return future.result()
+
+    def get_move(self, board, color):
+        move, self.last_stats = self.run(_search, board, color, self.timelimit)
+        return move
+
+    def start_pondering(self, board):
+        pass
+
+    def stop_pondering(self):
+        pass
+
+
+class GameConnection(GtpConnection):
+    """
+    The GTP connection of one game, writing its responses to the client.
+    """
+    def __init__(self, pool, loop, writer):
+        super().__init__(PoolEngine(pool), GoBoard(7))
+        self.loop = loop
+        self.writer = writer
+        self.closed = False
+
+    def write_response(self, text):
+        try:
+            on_loop = asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self.writer.write(text.encode())
+        else:
+            # the search commands respond from a thread of the server
+            self.loop.call_soon_threadsafe(self.writer.write, text.encode())
+
+    def respond(self, response=""):
+        self.write_response("= {}\n\n".format(response))
+
+    def error(self, error_msg):
+        self.write_response("? {}\n\n".format(error_msg))
+
+    def policy_moves_cmd(self, args):
+        self.respond(self.go_engine.run(_policy_moves, self.board, self.policy))
+
+    def solve_cmd(self, args):
+        winner, move = self.go_engine.run(_solve, self.board, self.go_engine.timelimit)
+        self.respond(solve_string(winner, move, self.board.size))
+
+    def quit_cmd(self, args):
+        """ Close this game, the server keeps running """
+        self.respond()
+        self.closed = True
+
+
+class GtpServer:
+    def __init__(self, workers=None):
+        self.pool = ProcessPoolExecutor(workers)
+        # threads waiting for the search results of the games
+        self.threads = ThreadPoolExecutor((workers or os.cpu_count() or 1) * 4)
+
+    async def handle_client(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        game = GameConnection(self.pool, loop, writer)
+        try:
+            while not game.closed:
+                line = await reader.readline()
+                if not line:
+                    break
+                line = line.decode()
+                elements = line.split()
+                if elements and elements[0].isdigit():
+                    elements = elements[1:]
+                if elements and elements[0] in SEARCH_COMMANDS:
+                    await loop.run_in_executor(self.threads, game.get_cmd, line)
+                else:
+                    game.get_cmd(line)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host, port, unix_path=None):
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_client, unix_path)
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.threads.shutdown()
+        self.pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-game Gomoku GTP server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="search processes, default one per CPU")
+    args = parser.parse_args()
+
+    server = GtpServer(args.workers)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from gtp_connection import format_point, point_to_coord
 import random
+import time
 import numpy as np
 from board_util import (
     GoBoardUtil,
@@ -7,10 +8,9 @@ from board_util import (
     WHITE,
     EMPTY,
     DRAW,
+    GO_POINT,
 )
 
-nodeid = 0
-
 
 def find(pred, arr):
     for e in arr:
@@ -24,30 +24,80 @@ def find(pred, arr):
 # C = np.sqrt(2)
 C = 2
 NUM_SIMS = 50
+# progressive widening: after n iterations through a node it has at most
+# WIDENING_K * n^WIDENING_ALPHA children, admitted in policy order
+WIDENING_K = 2
+WIDENING_ALPHA = 0.5
+# expansion only considers the empty points this close to a stone
+CANDIDATE_DISTANCE = 2
+# RAVE: simulations through a node at which its own win rate and the
+# AMAF win rate weigh the same in selection
+RAVE_EQUIVALENCE = 1000
+
+
+def candidate_moves(board):
+    """
+    The moves a node can expand: the empty points near the stones,
+    the center on a board without stones
+    """
+    moves = board.get_nearby_points(CANDIDATE_DISTANCE)
+    if not moves:
+        center = (board.size + 1) // 2
+        moves = [board.pt(center, center)]
+    return moves
+
+
+class SearchStats:
+    """
+    Counters of one search, reported by the search_stats GTP command.
+    """
+    def __init__(self):
+        self.iterations = 0
+        self.nodes = 1  # the root
+        # expansions that reached a position already in the search
+        self.transpositions = 0
+        self.max_depth = 0
+        self.playouts = 0
+        self.select_time = 0.0
+        self.expand_time = 0.0
+        self.simulate_time = 0.0
+        self.backprop_time = 0.0
 
+    def __str__(self):
+        total = self.select_time + self.expand_time + self.simulate_time + self.backprop_time
+        lines = [
+            "iterations {}".format(self.iterations),
+            "nodes {}".format(self.nodes),
+            "transpositions {}".format(self.transpositions),
+            "max_depth {}".format(self.max_depth),
+            "playouts {}".format(self.playouts),
+        ]
+        for phase in ("select", "expand", "simulate", "backprop"):
+            seconds = getattr(self, phase + "_time")
+            share = seconds / total if total > 0 else 0
+            lines.append("{}_time {:.3f}s ({:.0%})".format(phase, seconds, share))
+        return "\n".join(lines)
 
-class MctsNode:
-    def __init__(self, parent, move, color, boardsize):
-        global nodeid
-        self.id = nodeid
-        nodeid += 1
 
-        self.parent = parent
-        self.children = []
-        self.move = move
+class MctsNode:
+    """
+    A position of the search. The move orders that reach the same position
+    share its node, see MctsTree.table, so a node can have several parents
+    and its statistics pool the simulations of all of them.
+    """
+    def __init__(self, color, position_hash, boardsize):
+        self.hash = position_hash
+        self.children = []  # the MctsEdge of every expanded move
         self.wins = 0
         self.sims = 0
         self.boardsize = boardsize
         self.color = color  # color that just played
         self.winner = EMPTY
         self.is_fully_expanded = False
-
-        if parent is None:
-            # if node is root
-            self.move_list = []
-        else:
-            self.move_list = parent.move_list.copy()
-            self.move_list.append(move)
+        # the moves of the policy, best first, computed when the node is
+        # first expanded; moves[:next_move] have children
+        self.moves = None
+        self.next_move = 0
 
     def add_child(self, child):
         self.children.append(child)
@@ -60,105 +110,156 @@ class MctsNode:
         self.wins += wins
         self.sims += sims
 
+    def can_widen(self):
+        """ Whether progressive widening admits another child at the node's visits """
+        if self.is_fully_expanded:
+            return False
+        visits = self.sims / NUM_SIMS
+        return len(self.children) < max(1, WIDENING_K * visits ** WIDENING_ALPHA)
+
     def winrate(self):
         if self.sims == 0:
             return 0
         return self.wins / self.sims
 
-    def uct(self):
-        if self.sims == 0:
-            return 0
-
-        parent_sims = self.parent.sims if self.parent is not None else self.sims
-        return self.winrate() + C * np.sqrt(np.log(parent_sims) / self.sims)
-
-    def __eq__(self, other):
-        return other.id == self.id
-
     def __str__(self):
-        return "{} {}/{}".format(format_point(point_to_coord(self.move, self.boardsize)), self.wins, self.sims)
+        return "{}/{}".format(self.wins, self.sims)
 
     def __repr__(self, level=0):
-        ret = "  " * level + str(self) + "\n"
+        ret = ""
         children = sorted(self.children, key=lambda n: n.winrate(), reverse=True)
         for child in children:
-            ret += child.__repr__(level + 1)
+            ret += "  " * level + str(child) + "\n"
+            ret += child.node.__repr__(level + 1)
         return ret
 
 
+class MctsEdge:
+    """
+    A move from a node to the node of the position it leads to. The edge
+    counts the simulations that went through this move, the win rate is
+    the shared one of the position.
+    """
+    def __init__(self, move, node):
+        self.move = move
+        self.node = node
+        self.sims = 0
+        # all moves as first: the simulations below the parent in which
+        # the color of node played move at any time, and its wins in them
+        self.amaf_wins = 0
+        self.amaf_sims = 0
+
+    def winrate(self):
+        return self.node.winrate()
+
+    def uct(self, parent_sims):
+        if self.sims == 0:
+            return 0
+
+        value = self.node.winrate()
+        if self.amaf_sims > 0:
+            beta = np.sqrt(RAVE_EQUIVALENCE / (3 * self.node.sims + RAVE_EQUIVALENCE))
+            value = (1 - beta) * value + beta * self.amaf_wins / self.amaf_sims
+        return value + C * np.sqrt(np.log(parent_sims) / self.sims)
+
+    def __str__(self):
+        return "{} {}".format(format_point(point_to_coord(self.move, self.node.boardsize)), self.node)
+
+
 class MctsTree:
     def __init__(self, board, color, rule_policy):
+        """
+        Search for color to play on board, which the tree owns. Despite
+        the name the search graph is a DAG: every position has one node,
+        found by the hash of the board in self.table.
+        """
         self.board = board
         opp_color = GoBoardUtil.opponent(color)
-        self.root = MctsNode(None, None, opp_color, board.size)
+        self.root = MctsNode(opp_color, board.hash, board.size)
+        self.table = {board.hash: self.root}
         self.color = color
         self.rule_policy = rule_policy
+        self.stats = SearchStats()
+        # [color][point]: the playouts of the last simulation in which
+        # color played point, and the wins of color in them
+        self.amaf_sims = np.zeros((3, board.maxpoint))
+        self.amaf_wins = np.zeros((3, board.maxpoint))
 
     def select(self):
+        """
+        Follow the moves with the best UCT from the root down to a node
+        that may add a child, or that has none. Returns the edges of the
+        path and a copy of the board at its end.
+        """
+        board_copy = self.board.copy()
+        path = []
         current = self.root
-        while True:
-            if current.is_fully_expanded and current == self.root:
+        while current.children and not current.can_widen():
+            choices = list(filter(lambda e: e.node.winner == EMPTY, current.children))
+            if len(choices) == 0:
+                # every child ends the game, we still need one to simulate
                 choices = current.children
-            else:
-                choices = [current] + current.children
-
-            filtered_choices = list(filter(lambda n: n.winner == EMPTY, choices))
-
-            if len(filtered_choices) == 0:
-                # If the end move is a win state, we get no filtered choices
-                # So we hard override this to all choices in this case
-                filtered_choices = choices
-
-            choice_ucts = list(map(lambda n: n.uct(), filtered_choices))
-            max_uct_index = np.argmax(choice_ucts)
-            next_node = choices[max_uct_index]
-
-            if next_node == current:
-                return current
-
-            current = next_node
-
-    def expand(self, node):
-        # recreate board for that node
-        board_copy = self.board.copy()
-        for move in node.move_list:
-            board_copy.play_move(move, board_copy.current_player)
-
+            edge = max(choices, key=lambda e: e.uct(current.sims))
+            board_copy.play_move(edge.move, board_copy.current_player)
+            path.append(edge)
+            current = edge.node
+        return path, board_copy
+
+    def expand(self, path, board_copy):
+        """
+        Add the next move of the policy to the node at the end of path,
+        and play it on board_copy. Returns the node to simulate from.
+        """
+        node = path[-1].node if path else self.root
         if node.is_fully_expanded:
-            return node, board_copy
-
-        already_expanded_moves = set(map(lambda n: n.move, node.children))
+            return node
 
         num_available_moves = len(board_copy.get_empty_points())
 
-        best_moves = self.rule_policy.best_moves(board_copy, board_copy.current_player)
-        best_moves = list(map(lambda x: x[0], best_moves))
-        next_move = find(lambda el: el not in already_expanded_moves, best_moves)
+        if node.moves is None:
+            best_moves = self.rule_policy.best_moves(board_copy, board_copy.current_player,
+                                                     candidate_moves(board_copy))
+            node.moves = np.array([move for move, _ in best_moves], dtype=GO_POINT)
+        next_move = int(node.moves[node.next_move])
+        node.next_move += 1
 
         board_copy.play_move(next_move, board_copy.current_player)
-        opp_color = GoBoardUtil.opponent(node.color)
-        new_node = MctsNode(node, next_move, opp_color, self.board.size)
-        node.add_child(new_node)
+        new_node = self.table.get(board_copy.hash)
+        if new_node is None:
+            opp_color = GoBoardUtil.opponent(node.color)
+            new_node = MctsNode(opp_color, board_copy.hash, self.board.size)
+            self.table[board_copy.hash] = new_node
+            self.stats.nodes += 1
+            if num_available_moves == 1:
+                new_node.is_fully_expanded = True
+        else:
+            self.stats.transpositions += 1
+        node.add_child(MctsEdge(next_move, new_node))
+        path.append(node.children[-1])
+        self.stats.max_depth = max(self.stats.max_depth, len(path))
 
-        if len(node.children) == len(best_moves):
+        if node.next_move == len(node.moves):
             node.is_fully_expanded = True
 
-        if num_available_moves == 1:
-            new_node.is_fully_expanded = True
-
-        return new_node, board_copy
+        return new_node
 
     def simulate(self, node, board_copy):
+        self.amaf_sims.fill(0)
+        self.amaf_wins.fill(0)
         if len(board_copy.get_empty_points()) == 0:
             node.set_winner(DRAW)
             return NUM_SIMS / 2
 
-        initial_winner = board_copy.check_win(node.move)
+        last_move = board_copy.last_move
+        initial_winner = EMPTY if last_move is None else board_copy.check_win(last_move)
         if initial_winner != EMPTY:
             node.set_winner(initial_winner)
             return NUM_SIMS
 
         wins = 0
+        self.stats.playouts += NUM_SIMS
+        first = board_copy.current_player
+        second = GoBoardUtil.opponent(first)
         for i in range(NUM_SIMS):
             moves_played = []
             winner = EMPTY
@@ -170,37 +271,92 @@ class MctsTree:
                 last_move = next_move
                 winner = board_copy.check_win(last_move)
 
-            for move in moves_played:
+            for move in reversed(moves_played):
                 board_copy.undo_move(move)
 
             if winner == node.color:
-                wins += 1
+                win = 1
             elif winner == EMPTY:
-                wins += 0.5
+                win = 0.5
+            else:
+                win = 0
+            wins += win
+
+            # a point is played at most once in a playout
+            played = np.array(moves_played, dtype=np.intp)
+            self.amaf_sims[first, played[0::2]] += 1
+            self.amaf_wins[first, played[0::2]] += 1 - win
+            self.amaf_sims[second, played[1::2]] += 1
+            self.amaf_wins[second, played[1::2]] += win
 
         return wins
 
-    def back_propagate(self, node, wins):
+    def back_propagate(self, path, wins):
+        """
+        Add the simulations to the nodes and edges of path, wins are those
+        of the color that played the last move of path
+        """
+        nodes = [self.root] + [edge.node for edge in path]
+        node = nodes[-1]
         if node.winner in (WHITE, BLACK):
             node.update(wins, NUM_SIMS)
-            parent = node.parent
-            if parent is not None:
+            if path:
+                path[-1].sims += NUM_SIMS
+                parent = nodes[-2]
                 parent.set_winner(node.winner)
                 wins = -parent.wins
 
-                current = parent
-                while current is not None:
-                    current.update(wins, NUM_SIMS)
+                for i in range(len(path) - 1, -1, -1):
+                    nodes[i].update(wins, NUM_SIMS)
+                    if i > 0:
+                        path[i - 1].sims += NUM_SIMS
                     wins = NUM_SIMS - wins
-                    current = current.parent
 
             return
 
-        current = node
-        while current is not None:
+        for i in range(len(path), -1, -1):
+            current = nodes[i]
             current.update(wins, NUM_SIMS)
+            # the moves below current count as played in every simulation
+            if i > 0:
+                edge = path[i - 1]
+                edge.sims += NUM_SIMS
+                self.amaf_sims[current.color, edge.move] += NUM_SIMS
+                self.amaf_wins[current.color, edge.move] += wins
+            for child in current.children:
+                child.amaf_sims += self.amaf_sims[child.node.color, child.move]
+                child.amaf_wins += self.amaf_wins[child.node.color, child.move]
             wins = NUM_SIMS - wins
-            current = current.parent
+
+    def advance(self, move):
+        """
+        Play move at the root and keep the part of the search below it.
+        Returns False, leaving the tree unchanged, if move was never expanded.
+        """
+        edge = find(lambda e: e.move == move, self.root.children)
+        if edge is None:
+            return False
+        self.root = edge.node
+        # positions without the stone of move are out of reach now
+        self.table = {}
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.hash not in self.table:
+                self.table[node.hash] = node
+                stack.extend(child.node for child in node.children)
+        self.board.play_move(move, self.board.current_player)
+        self.color = GoBoardUtil.opponent(self.color)
+        return True
+
+    def top_two(self):
+        """
+        Visits of the two most visited children of the root,
+        in iterations (every iteration runs NUM_SIMS simulations)
+        """
+        visits = sorted((child.sims for child in self.root.children), reverse=True)
+        visits += [0, 0]
+        return visits[0] / NUM_SIMS, visits[1] / NUM_SIMS
 
     def best_move(self):
         robust_limit = 2 * NUM_SIMS
@@ -220,7 +376,18 @@ class MctsTree:
 
 
 def mcts_step(mcts_tree):
-    selected_node = mcts_tree.select()
-    new_node, board_copy = mcts_tree.expand(selected_node)
+    stats = mcts_tree.stats
+    t0 = time.perf_counter()
+    path, board_copy = mcts_tree.select()
+    t1 = time.perf_counter()
+    new_node = mcts_tree.expand(path, board_copy)
+    t2 = time.perf_counter()
     wins = mcts_tree.simulate(new_node, board_copy)
-    mcts_tree.back_propagate(new_node, wins)
+    t3 = time.perf_counter()
+    mcts_tree.back_propagate(path, wins)
+    t4 = time.perf_counter()
+    stats.iterations += 1
+    stats.select_time += t1 - t0
+    stats.expand_time += t2 - t1
+    stats.simulate_time += t3 - t2
+    stats.backprop_time += t4 - t3
@@ -0,0 +1,60 @@
+"""
+sampling_profiler.py
+
+A low overhead sampling profiler. While it runs, a SIGPROF timer
+interrupts the program every interval seconds of CPU time and the profiler
+records the Python call stack at that moment. Unlike cProfile nothing is
+traced, so the cost is one stack walk per sample.
+
+The samples are written in the collapsed stack format of flamegraph.pl,
+one line per distinct stack:
+    Gomoku4.py:run;gtp_connection.py:genmove_cmd;mcts.py:simulate 42
+"""
+
+import os
+import signal
+
+DEFAULT_INTERVAL = 0.005
+
+
+class SamplingProfiler:
+    def __init__(self, interval=DEFAULT_INTERVAL):
+        self.interval = interval
+        self.counts = {}
+        self.samples = 0
+        self._previous_handler = None
+
+    def start(self):
+        self._previous_handler = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _sample(self, signum, frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append("{}:{}".format(os.path.basename(code.co_filename), code.co_name))
+            frame = frame.f_back
+        key = ";".join(reversed(stack))
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.samples += 1
+
+    def collapsed(self):
+        """ The samples as lines of collapsed stacks, most frequent first """
+        stacks = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        return ["{} {}".format(stack, count) for stack, count in stacks]
+
+    def write(self, filename):
+        with open(filename, "w") as f:
+            for line in self.collapsed():
+                f.write(line + "\n")
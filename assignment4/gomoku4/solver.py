@@ -0,0 +1,128 @@
+"""
+solver.py
+
+Exact gomoku solver for the solve command and batch analysis.
+
+Negamax with alpha-beta over win (1), draw (0) and loss (-1) for the side
+to move, with a transposition table keyed by the Zobrist hash of the board. Moves
+are generated with the two forcing rules: a winning move is played right
+away, and when the opponent threatens to win only the blocking moves are
+searched. The remaining moves are ordered by the open lines they extend
+or block.
+
+The search stops at the time limit of its TimeManager, the result is then
+unknown.
+"""
+
+from board_util import GoBoardUtil, EMPTY, DRAW
+from time_manager import TimeManager, TimeUp
+
+WIN = 1
+LOSS = -1
+# nodes between two reads of the clock
+SOLVER_CHECK_EVERY = 64
+
+
+class Solver:
+    def __init__(self, timelimit):
+        self.time_manager = TimeManager(timelimit, SOLVER_CHECK_EVERY)
+        self.table = {}
+        self.nodes = 0
+
+    def solve(self, board):
+        """
+        Returns (winner, move): winner is BLACK, WHITE or DRAW, or None if
+        the time ran out. move is a best move, None if the side to move loses.
+        """
+        if board.detect_five_in_a_row() != EMPTY:
+            return board.detect_five_in_a_row(), None
+        if len(board.get_empty_points()) == 0:
+            return DRAW, None
+        color = board.current_player
+        try:
+            value, move = self.negamax(board, LOSS, WIN)
+        except TimeUp:
+            return None, None
+        if value == WIN:
+            return color, move
+        if value == 0:
+            return DRAW, move
+        return GoBoardUtil.opponent(color), None
+
+    def negamax(self, board, alpha, beta):
+        self.nodes += 1
+        self.time_manager.check(self.nodes)
+        key = board.hash, board.current_player
+        if key in self.table:
+            return self.table[key]
+        moves, winning = self.moves(board)
+        if winning:
+            return WIN, moves[0]
+        if not moves:
+            return 0, None
+        best_value, best_move = LOSS - 1, moves[0]
+        original_alpha = alpha
+        for move in moves:
+            board.play_move(move, board.current_player)
+            if len(board.get_empty_points()) == 0:
+                value = 0
+            else:
+                value = -self.negamax(board, -beta, -alpha)[0]
+            board.undo_move(move)
+            if value > best_value:
+                best_value, best_move = value, move
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+        # only exact values can be reused under other windows
+        if original_alpha < best_value < beta or best_value in (WIN, LOSS):
+            self.table[key] = best_value, best_move
+        return best_value, best_move
+
+    def moves(self, board):
+        """
+        Returns (moves, winning): the moves to search, and whether the
+        first one wins on the spot.
+        """
+        color = board.current_player
+        opponent = GoBoardUtil.opponent(color)
+        empty = board.get_empty_points()
+        blocks = []
+        for move in empty:
+            board.play_move(move, color)
+            wins = board.check_win(move) == color
+            board.undo_move(move)
+            if wins:
+                return [move], True
+            board.play_move(move, opponent)
+            if board.check_win(move) == opponent:
+                blocks.append(move)
+            board.undo_move(move)
+            # undo_move passes the turn back, but the probe did not take it
+            board.current_player = color
+        if blocks:
+            return blocks, False
+        return self.ordered(board, empty), False
+
+    def ordered(self, board, empty):
+        """
+        empty sorted by how much the move adds to the open lines of
+        either color: every line of five through the move without stones
+        of one color scores 4 ** (stones of the other color)
+        """
+        scores = []
+        for move in empty.tolist():
+            score = 0
+            for line in board.boardLines5[board.unpadded_point(move)]:
+                black, white, _ = board.get_counts(line)
+                if white == 0:
+                    score += 4 ** black
+                if black == 0:
+                    score += 4 ** white
+            scores.append((-score, move))
+        scores.sort()
+        return [move for _, move in scores]
+
+
+def solve(board, timelimit):
+    return Solver(timelimit).solve(board)
@@ -0,0 +1,135 @@
+"""
+gtp_tests.py
+
+Parser for the .gtp regression test files used with gogui-regress.
+
+A test file is a sequence of GTP commands. Numbered commands are tests and
+are followed by a line "#?[expected]", where expected is a regular
+expression for the response (gogui-regress syntax: a leading ! negates the
+pattern, as in "#?[!pass]", a trailing * marks an expected failure).
+
+The parser turns every numbered command into an independent GtpTestCase:
+the setup commands rebuild the same engine state (board size, time limit,
+policy, komi and the moves played since the last clear_board) from a fresh
+engine, so test cases can run in any order and in separate processes.
+Moves made by numbered genmove commands cannot be replayed and are not part
+of the setup of later test cases.
+"""
+
+import re
+
+DEFAULT_BOARDSIZE = 7
+
+# commands whose last value is part of the engine state
+STATE_COMMANDS = ("timelimit", "policy", "komi")
+
+
+class GtpTestCase(object):
+    def __init__(self, filename, line, number, setup, command, expected,
+                 negated=False, expected_failure=False):
+        self.filename = filename
+        self.line = line
+        self.number = number
+        self.setup = setup
+        self.command = command
+        self.expected = expected
+        self.negated = negated
+        self.expected_failure = expected_failure
+
+    @property
+    def name(self):
+        return "{}:{}".format(self.filename, self.number)
+
+    def boardsize(self):
+        return int(self.setup[0].split()[1])
+
+    def moves(self):
+        """ The (color, move) pairs played in the setup, both lowercase """
+        moves = []
+        for command in self.setup:
+            elements = command.split()
+            if elements[0] == "play":
+                moves.append((elements[1].lower(), elements[2].lower()))
+        return moves
+
+    def check(self, response):
+        """
+        Check a response (without the leading "= ") against the expected
+        pattern. Returns True if the test passes.
+        """
+        if self.expected is None:
+            return True
+        matched = re.fullmatch(self.expected, response.strip()) is not None
+        return matched != self.negated
+
+    def __repr__(self):
+        return "GtpTestCase({}, {!r})".format(self.name, self.command)
+
+
+def parse_test_file(filename):
+    with open(filename) as f:
+        return parse_tests(f, filename)
+
+
+def parse_tests(lines, filename="<gtp>"):
+    """
+    Parse the lines of a .gtp test file into a list of GtpTestCase.
+    """
+    cases = []
+    boardsize = DEFAULT_BOARDSIZE
+    state = {}
+    plays = []
+    pending = None
+    for line_number, line in enumerate(lines, 1):
+        line = line.rstrip("\n")
+        stripped = line.strip()
+        if stripped.startswith("#?"):
+            if pending is not None:
+                _set_expected(pending, stripped[2:].strip())
+                pending = None
+            continue
+        command = stripped.split("#")[0].strip()
+        if not command:
+            continue
+        elements = command.split()
+        number = None
+        if elements[0].isdigit():
+            number = elements[0]
+            elements = elements[1:]
+            if not elements:
+                continue
+            command = " ".join(elements)
+
+        if number is not None:
+            setup = ["boardsize {}".format(boardsize), "clear_board"]
+            setup += ["{} {}".format(name, state[name]) for name in STATE_COMMANDS if name in state]
+            setup += plays
+            pending = GtpTestCase(filename, line_number, number, setup, command, None)
+            cases.append(pending)
+
+        name = elements[0]
+        if name == "boardsize" and len(elements) == 2:
+            boardsize = int(elements[1])
+            plays = []
+        elif name == "clear_board":
+            plays = []
+        elif name == "play":
+            plays = plays + [command]
+        elif name in STATE_COMMANDS and len(elements) >= 2:
+            state[name] = " ".join(elements[1:])
+    return cases
+
+
+def _set_expected(case, text):
+    if text.startswith("!"):
+        case.negated = True
+        text = text[1:].strip()
+    if text.endswith("*"):
+        case.expected_failure = True
+        text = text[:-1].strip()
+    if text.startswith("[") and text.endswith("]"):
+        text = text[1:-1].strip()
+    if text.startswith("!"):
+        case.negated = True
+        text = text[1:]
+    case.expected = text.strip()
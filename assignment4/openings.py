@@ -0,0 +1,160 @@
+"""
+openings.py
+
+Opening suites for arena matches.
+
+An opening suite is a text file of GTP play sequences. Every opening is a
+block of "play {b,w} MOVE" lines, openings are separated by blank lines and
+lines starting with # are comments, e.g.
+
+    # opening 1
+    play b D4
+    play w E5
+
+    play b C3
+    play w D4
+    play b E3
+
+Each opening is played twice with the colors swapped (a game pair in the
+arena), so most of the advantage an opening gives one side cancels out.
+
+The generator samples quiet openings with the RulePolicy of gomoku4: every
+ply is a random move that creates no tactical pattern, near the stones
+already on the board, and the final position must be nearly even according
+to the gomoku4 evaluation function.
+
+Usage:
+    python3 openings.py -n 50 --plies 4 --boardsize 7 -o openings.txt
+"""
+
+import argparse
+import random
+
+from arena import COLUMN_LETTERS, engine_spec, load_engine_modules
+
+BLACK = 1
+WHITE = 2
+
+DEFAULT_PLIES = 4
+# evaluate() scores a single open three as 5, an open four as 15
+DEFAULT_MAX_IMBALANCE = 4
+
+
+def parse_openings(lines):
+    """
+    Parse an opening suite.
+    Returns a list of openings, each a list of (color, move) strings.
+    """
+    openings = []
+    current = []
+    for line in lines:
+        line = line.split("#")[0].strip()
+        if not line:
+            if current:
+                openings.append(current)
+                current = []
+            continue
+        elements = line.split()
+        if elements[0] != "play" or len(elements) != 3:
+            raise ValueError("not a play command: {}".format(line))
+        current.append((elements[1].lower(), elements[2].upper()))
+    if current:
+        openings.append(current)
+    return openings
+
+
+def load_openings(path):
+    with open(path) as f:
+        return parse_openings(f)
+
+
+def save_openings(path, openings):
+    with open(path, "w") as f:
+        for i, opening in enumerate(openings):
+            f.write("# opening {}\n".format(i + 1))
+            for color, move in opening:
+                f.write("play {} {}\n".format(color, move))
+            f.write("\n")
+
+
+def _format_point(board, point):
+    row, col = divmod(point, board.NS)
+    return COLUMN_LETTERS[col - 1] + str(row)
+
+
+def _near_stones(board, point, distance=2):
+    row, col = divmod(point, board.NS)
+    for r in range(max(1, row - distance), min(board.size, row + distance) + 1):
+        for c in range(max(1, col - distance), min(board.size, col + distance) + 1):
+            if board.board[r * board.NS + c] in (BLACK, WHITE):
+                return True
+    return False
+
+
+def _center_moves(board):
+    center = (board.size + 1) // 2
+    return [r * board.NS + c
+            for r in range(center - 1, center + 2)
+            for c in range(center - 1, center + 2)]
+
+
+def generate_openings(count, plies=DEFAULT_PLIES, boardsize=7,
+                      max_imbalance=DEFAULT_MAX_IMBALANCE, seed=None, max_tries=100000):
+    """
+    Sample count distinct balanced openings of the given number of plies.
+    """
+    gomoku, board_module = load_engine_modules(engine_spec("gomoku4"))
+    policy = gomoku.RulePolicy()
+    rng = random.Random(seed)
+    openings = []
+    seen = set()
+    for _ in range(max_tries):
+        if len(openings) == count:
+            break
+        board = board_module.GoBoard(boardsize)
+        sequence = []
+        for ply in range(plies):
+            color = board.current_player
+            if ply == 0:
+                candidates = _center_moves(board)
+            else:
+                candidates = [move for move, score in policy.best_moves(board, color)
+                              if score == gomoku.RANDOM and _near_stones(board, move)]
+            if not candidates:
+                break
+            move = rng.choice(candidates)
+            board.play_move(move, color)
+            sequence.append(("b" if color == BLACK else "w", _format_point(board, move)))
+        if len(sequence) < plies:
+            continue
+        # the side to move must not have a tactical move available either
+        if policy.best_moves(board, board.current_player)[0][1] != gomoku.RANDOM:
+            continue
+        if abs(gomoku.evaluate(board, BLACK)) > max_imbalance:
+            continue
+        key = frozenset(sequence)
+        if key in seen:
+            continue
+        seen.add(key)
+        openings.append(sequence)
+    return openings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a balanced opening suite.")
+    parser.add_argument("-n", "--count", type=int, default=50)
+    parser.add_argument("--plies", type=int, default=DEFAULT_PLIES)
+    parser.add_argument("--boardsize", type=int, default=7)
+    parser.add_argument("--max-imbalance", type=int, default=DEFAULT_MAX_IMBALANCE)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("-o", "--output", default="openings.txt")
+    args = parser.parse_args()
+
+    openings = generate_openings(args.count, args.plies, args.boardsize,
+                                 args.max_imbalance, args.seed)
+    save_openings(args.output, openings)
+    print("wrote {} openings to {}".format(len(openings), args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+regress.py
+
+Parallel regression runner for the .gtp test files, a replacement for
+running them serially with gogui-regress.
+
+Every numbered command of the test files becomes an independent test case
+(see gtp_tests.py). The cases run on a pool of workers, each worker drives
+its own engine process over GTP and replays the setup commands of a case
+before sending the test command. A case that does not answer within its
+timeout fails, and its engine is killed and restarted for the next case.
+
+The timeout of a case is its timelimit plus a grace period, or --timeout
+if the case does not set a timelimit.
+
+Usage:
+    python3 regress.py ../assignment2/Gomoku.py ../assignment2/tests-*.gtp \\
+        -j 4 [--json results.json] [--junit results.xml]
+"""
+
+import argparse
+import json
+import os
+import selectors
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree import ElementTree
+
+from gtp_tests import STATE_COMMANDS, parse_test_file
+
+DEFAULT_TIMEOUT = 30
+GRACE_PERIOD = 5
+# time to answer one setup command
+SETUP_TIMEOUT = 10
+
+PASS = "pass"
+FAIL = "fail"
+EXPECTED_FAIL = "expected_fail"
+UNEXPECTED_PASS = "unexpected_pass"
+TIMEOUT = "timeout"
+ERROR = "error"
+
+# outcomes that make the run fail
+FAILURES = (FAIL, UNEXPECTED_PASS, TIMEOUT, ERROR)
+
+
+class EngineTimeout(Exception):
+    pass
+
+
+class EngineError(Exception):
+    pass
+
+
+class GtpEngine(object):
+    """
+    A GTP engine running as a subprocess.
+    """
+    def __init__(self, program, verbose=False, args=()):
+        self.program = os.path.abspath(program)
+        self.process = subprocess.Popen(
+            [sys.executable, self.program] + list(args),
+            cwd=os.path.dirname(self.program),
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=None if verbose else subprocess.DEVNULL)
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.process.stdout, selectors.EVENT_READ)
+        self.buffer = b""
+        # state commands sent so far, e.g. {"timelimit": "timelimit 30"}
+        self.state = {}
+
+    def send(self, command, timeout):
+        """
+        Send one command and wait for its response.
+        Returns (ok, response), ok is False for a "?" error response.
+        """
+        try:
+            self.process.stdin.write((command + "\n").encode())
+            self.process.stdin.flush()
+        except BrokenPipeError:
+            raise EngineError("engine exited")
+        name = command.split()[0]
+        if name in STATE_COMMANDS:
+            self.state[name] = command
+        text = self._read_response(time.monotonic() + timeout)
+        return text[0] == "=", text[1:].strip()
+
+    def _read_response(self, deadline):
+        while True:
+            # a response is "= ..." or "? ..." terminated by an empty line
+            end = self.buffer.find(b"\n\n")
+            if end >= 0:
+                lines = self.buffer[:end].decode().split("\n")
+                self.buffer = self.buffer[end + 2:]
+                # skip debug output some engines print to stdout
+                for i, line in enumerate(lines):
+                    if line[:1] in ("=", "?"):
+                        return "\n".join(lines[i:])
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.selector.select(remaining):
+                raise EngineTimeout
+            data = os.read(self.process.stdout.fileno(), 65536)
+            if not data:
+                raise EngineError("engine exited")
+            self.buffer += data.replace(b"\r", b"")
+
+    def close(self):
+        self.selector.close()
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+
+
+class Runner(object):
+    """
+    Runs test cases on a pool of workers, one engine per worker.
+    """
+    def __init__(self, program, workers=None, timeout=None, verbose=False):
+        self.program = program
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.verbose = verbose
+        self.local = threading.local()
+        self.engines = []
+        self.lock = threading.Lock()
+
+    def case_timeout(self, case):
+        if self.timeout is not None:
+            return self.timeout
+        for command in case.setup:
+            elements = command.split()
+            if elements[0] == "timelimit":
+                return int(elements[1]) + GRACE_PERIOD
+        return DEFAULT_TIMEOUT
+
+    def _engine(self, case):
+        engine = getattr(self.local, "engine", None)
+        state = {c.split()[0] for c in case.setup if c.split()[0] in STATE_COMMANDS}
+        if engine is not None and not set(engine.state) <= state:
+            # the case relies on the engine defaults, which the
+            # previous case has changed
+            self._drop_engine()
+            engine = None
+        if engine is None:
+            engine = GtpEngine(self.program, self.verbose)
+            self.local.engine = engine
+            with self.lock:
+                self.engines.append(engine)
+        return engine
+
+    def _drop_engine(self):
+        engine = self.local.engine
+        engine.close()
+        with self.lock:
+            self.engines.remove(engine)
+        self.local.engine = None
+
+    def run_case(self, case):
+        start = time.monotonic()
+        engine = self._engine(case)
+        result = {
+            "name": case.name,
+            "file": case.filename,
+            "number": case.number,
+            "command": case.command,
+            "expected": case.expected,
+            "response": None,
+        }
+        try:
+            for command in case.setup:
+                ok, response = engine.send(command, SETUP_TIMEOUT)
+                if not ok:
+                    raise EngineError("setup command {} failed: {}".format(command, response))
+            ok, response = engine.send(case.command, self.case_timeout(case))
+            result["response"] = response
+            passed = ok and case.check(response)
+            if case.expected_failure:
+                status = UNEXPECTED_PASS if passed else EXPECTED_FAIL
+            else:
+                status = PASS if passed else FAIL
+        except EngineTimeout:
+            status = TIMEOUT
+            self._drop_engine()
+        except EngineError as e:
+            status = ERROR
+            result["response"] = str(e)
+            self._drop_engine()
+        result["status"] = status
+        result["seconds"] = time.monotonic() - start
+        return result
+
+    def run(self, cases):
+        """ Run the cases, yielding results in the order the cases were given """
+        try:
+            with ThreadPoolExecutor(self.workers) as executor:
+                for result in executor.map(self.run_case, cases):
+                    yield result
+        finally:
+            with self.lock:
+                for engine in self.engines:
+                    engine.close()
+                self.engines = []
+
+
+def junit_xml(results, suite_name="regress"):
+    suite = ElementTree.Element("testsuite", {
+        "name": suite_name,
+        "tests": str(len(results)),
+        "failures": str(sum(r["status"] in (FAIL, UNEXPECTED_PASS) for r in results)),
+        "errors": str(sum(r["status"] in (TIMEOUT, ERROR) for r in results)),
+        "time": "{:.3f}".format(sum(r["seconds"] for r in results)),
+    })
+    for r in results:
+        case = ElementTree.SubElement(suite, "testcase", {
+            "classname": os.path.basename(r["file"]),
+            "name": "{} {}".format(r["number"], r["command"]),
+            "time": "{:.3f}".format(r["seconds"]),
+        })
+        message = "expected [{}], got [{}]".format(r["expected"], r["response"])
+        if r["status"] in (FAIL, UNEXPECTED_PASS):
+            ElementTree.SubElement(case, "failure", {"message": message, "type": r["status"]})
+        elif r["status"] in (TIMEOUT, ERROR):
+            ElementTree.SubElement(case, "error", {"message": message, "type": r["status"]})
+        elif r["status"] == EXPECTED_FAIL:
+            ElementTree.SubElement(case, "skipped", {"message": "expected failure: " + message})
+    return ElementTree.tostring(suite, encoding="unicode")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run .gtp regression tests in parallel.")
+    parser.add_argument("program", help="GTP engine, e.g. ../assignment2/Gomoku.py")
+    parser.add_argument("files", nargs="+", help=".gtp test files")
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="timeout per test, default timelimit + {}s".format(GRACE_PERIOD))
+    parser.add_argument("--json", help="write the results as JSON")
+    parser.add_argument("--junit", help="write the results as JUnit XML")
+    parser.add_argument("-v", "--verbose", action="store_true", help="show engine stderr")
+    args = parser.parse_args()
+
+    cases = [case for filename in args.files for case in parse_test_file(filename)]
+    runner = Runner(args.program, args.workers, args.timeout, args.verbose)
+    start = time.monotonic()
+    results = []
+    for result in runner.run(cases):
+        results.append(result)
+        if result["status"] != PASS:
+            print("{:16} {} {} expected [{}] got [{}] ({:.1f}s)".format(
+                result["status"].upper(), result["name"], result["command"],
+                result["expected"], result["response"], result["seconds"]))
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    print("{} tests in {:.1f}s: {}".format(
+        len(results), time.monotonic() - start,
+        ", ".join("{} {}".format(n, status) for status, n in sorted(counts.items()))))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.junit:
+        with open(args.junit, "w") as f:
+            f.write(junit_xml(results) + "\n")
+    sys.exit(1 if any(r["status"] in FAILURES for r in results) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+sprt.py
+
+Elo estimation and sequential probability ratio test (SPRT) for arena
+matches, so a match stops as soon as its outcome is statistically clear.
+
+Games are scored in pairs: game 2k and its alternative game 2k+1 are played
+from the same start (the same opening of the suite, if one is given) with
+the colors swapped, and the SPRT is updated with the average score of each
+finished pair. This removes most of the first move advantage from the
+variance.
+
+H0: elo difference = elo0, H1: elo difference = elo1. The log-likelihood
+ratio uses the usual normal approximation
+    LLR = N * (s1 - s0) * (2 * mean - s0 - s1) / (2 * var)
+where s0, s1 are the expected scores at elo0 and elo1 and mean, var are
+the mean and variance of the pair scores.
+
+Usage:
+    python3 sprt.py gomoku4 flat_mc_player --elo0 0 --elo1 50 --max-games 1000
+"""
+
+import argparse
+import math
+
+from arena import Arena, MatchResult, ENGINES
+from openings import load_openings
+
+DEFAULT_ALPHA = 0.05
+DEFAULT_BETA = 0.05
+
+H0 = "H0"
+H1 = "H1"
+
+
+def expected_score(elo):
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def score_to_elo(score):
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+
+def elo_difference(wins, losses, draws, z=1.96):
+    """
+    Elo difference and confidence interval (default 95%) from the point of
+    view of the player with the given wins.
+    Returns (elo, lower, upper).
+    """
+    n = wins + losses + draws
+    if n == 0:
+        return 0.0, -math.inf, math.inf
+    score = (wins + 0.5 * draws) / n
+    variance = (wins * (1 - score) ** 2 + losses * score ** 2
+                + draws * (0.5 - score) ** 2) / n
+    margin = z * math.sqrt(variance / n)
+    return score_to_elo(score), score_to_elo(score - margin), score_to_elo(score + margin)
+
+
+class SPRT(object):
+    """
+    Sequential probability ratio test over paired game scores.
+    """
+    def __init__(self, elo0=0, elo1=50, alpha=DEFAULT_ALPHA, beta=DEFAULT_BETA):
+        self.elo0 = elo0
+        self.elo1 = elo1
+        self.lower = math.log(beta / (1 - alpha))
+        self.upper = math.log((1 - beta) / alpha)
+        self.scores = []
+
+    def add(self, score):
+        """ score is the player's average score in one pair of games """
+        self.scores.append(score)
+
+    def llr(self):
+        n = len(self.scores)
+        if n < 2:
+            return 0.0
+        mean = sum(self.scores) / n
+        variance = sum((s - mean) ** 2 for s in self.scores) / n
+        if variance == 0:
+            # every pair had the same outcome, assume the smallest
+            # variance a single different pair would give
+            variance = 1 / (4 * n)
+        s0 = expected_score(self.elo0)
+        s1 = expected_score(self.elo1)
+        return n * (s1 - s0) * (2 * mean - s0 - s1) / (2 * variance)
+
+    def status(self):
+        """ H0, H1, or None while the test is undecided """
+        llr = self.llr()
+        if llr >= self.upper:
+            return H1
+        if llr <= self.lower:
+            return H0
+        return None
+
+
+def game_score(game):
+    """ Score of player1 in a finished arena game """
+    if game["result"] == "draw":
+        return 0.5
+    return 1.0 if (game["result"] == "black") != game["alternative"] else 0.0
+
+
+def run_match(arena, sprt, max_games):
+    """
+    Play up to max_games games, stopping when the SPRT decides.
+    Returns (MatchResult, decision), decision is None if max_games was reached.
+    """
+    result = MatchResult(arena.player1, arena.player2)
+    pending = {}
+    decision = None
+    games = arena.games(max_games)
+    try:
+        for game in games:
+            result.add(game)
+            pair = game["game"] // 2
+            if pair not in pending:
+                pending[pair] = game_score(game)
+                continue
+            sprt.add((pending.pop(pair) + game_score(game)) / 2)
+            decision = sprt.status()
+            if decision is not None:
+                break
+    finally:
+        games.close()
+    return result, decision
+
+
+def report(result, sprt, decision):
+    elo, lower, upper = elo_difference(result.win1, result.win2, result.draw)
+    lines = [
+        "player 1: {}".format(result.player1),
+        "player 2: {}".format(result.player2),
+        "player 1 wins {}".format(result.win1),
+        "player 2 wins {}".format(result.win2),
+        "draw {}".format(result.draw),
+        "elo {:.1f} [{:.1f}, {:.1f}]".format(elo, lower, upper),
+        "LLR {:.2f} [{:.2f}, {:.2f}] elo0={} elo1={}".format(
+            sprt.llr(), sprt.lower, sprt.upper, sprt.elo0, sprt.elo1),
+        "decision {}".format(decision if decision else "none"),
+    ]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SPRT match between two Gomoku players.")
+    parser.add_argument("player1", choices=sorted(ENGINES))
+    parser.add_argument("player2", choices=sorted(ENGINES))
+    parser.add_argument("--elo0", type=float, default=0)
+    parser.add_argument("--elo1", type=float, default=50)
+    parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA)
+    parser.add_argument("--beta", type=float, default=DEFAULT_BETA)
+    parser.add_argument("--max-games", type=int, default=1000)
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    parser.add_argument("--boardsize", type=int, default=7)
+    parser.add_argument("--timelimit", type=float, default=2)
+    parser.add_argument("--log", default="match.jsonl")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--openings", help="opening suite file, see openings.py")
+    args = parser.parse_args()
+
+    openings = load_openings(args.openings) if args.openings else None
+    arena = Arena(args.player1, args.player2, args.boardsize, args.timelimit,
+                  args.workers, args.log, args.seed, openings)
+    sprt = SPRT(args.elo0, args.elo1, args.alpha, args.beta)
+    result, decision = run_match(arena, sprt, args.max_games)
+    summary = report(result, sprt, decision)
+    print(summary)
+    with open("game_results.txt", "w") as f:
+        f.write(summary + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -167,7 +167,8 @@ class Gomoku:
         self.timelimit = limit
 
     def get_move(self, board, color):
-        signal.alarm(self.timelimit)  # sets an alarm for the given time_limit
+        # sets an alarm for the given time_limit, which may be fractional
+        signal.setitimer(signal.ITIMER_REAL, self.timelimit)
 
         try:
             mcts_tree = MctsTree(board, color, CombinedPolicy())
@@ -181,7 +182,7 @@ class Gomoku:
         except Exception:
             return mcts_tree.best_move()
         finally:
-            signal.alarm(0)  # disable the alarm
+            signal.setitimer(signal.ITIMER_REAL, 0)  # disable the alarm
 
 
 def run():
@@ -0,0 +1,80 @@
+#!/usr/local/bin/python3
+# /usr/bin/python3
+# Set the path to your python3 above
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from arena import Referee, BLACK, WHITE
+
+PROGRAM = os.path.join(os.path.dirname(os.path.abspath(__file__)), "arena.py")
+
+
+class ArenaTestCase(unittest.TestCase):
+    """Tests for arena.py, playing short matches on worker processes"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.log = os.path.join(self.directory.name, "match.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def match(self, player1, player2, games):
+        output = subprocess.run(
+            [sys.executable, PROGRAM, player1, player2, "-n", str(games), "-j", "2",
+             "--timelimit", "0.5", "--seed", "1", "--log", self.log],
+            capture_output=True, text=True, timeout=300, check=True).stdout
+        with open(self.log) as f:
+            records = [json.loads(line) for line in f]
+        return output, sorted(records, key=lambda record: record["game"])
+
+    def check_game(self, record):
+        """ Replay the moves of a game and check its result """
+        referee = Referee(record["boardsize"])
+        color = BLACK
+        for move_str in record["moves"]:
+            move = referee.parse_move(move_str)
+            self.assertTrue(referee.is_legal(move))
+            referee.play(move, color)
+            color = WHITE if color == BLACK else BLACK
+        last_color = WHITE if color == BLACK else BLACK
+        names = {BLACK: "black", WHITE: "white"}
+        if record["reason"] == "five":
+            self.assertTrue(referee.check_win(move))
+            self.assertEqual(record["result"], names[last_color])
+        elif record["reason"] == "timeout":
+            # the side to move lost on time
+            self.assertEqual(record["result"], names[last_color])
+        else:
+            self.assertEqual(record["reason"], "full")
+            self.assertTrue(referee.is_full())
+            self.assertEqual(record["result"], "draw")
+        expected = {"black": record["black"], "white": record["white"], "draw": None}
+        self.assertEqual(record["winner"], expected[record["result"]])
+
+    def test_match(self):
+        output, records = self.match("random_player", "sweet_mangos", 4)
+        self.assertEqual([record["game"] for record in records], [0, 1, 2, 3])
+        for record in records:
+            # the colors alternate, player1 is white in the alternative games
+            alternative = record["game"] % 2 == 1
+            self.assertEqual(record["alternative"], alternative)
+            players = ["random_player", "sweet_mangos"]
+            self.assertEqual([record["black"], record["white"]],
+                             players[::-1] if alternative else players)
+            self.assertEqual(record["boardsize"], 7)
+            self.check_game(record)
+        wins = [sum(record["winner"] == name for record in records)
+                for name in ("random_player", "sweet_mangos")]
+        draws = sum(record["winner"] is None for record in records)
+        timeouts = sum(record["reason"] == "timeout" for record in records)
+        self.assertIn("player1 win {} player2 win {} draw {} (timeouts {})".format(
+            wins[0], wins[1], draws, timeouts), output)
+
+
+if __name__ == "__main__":
+    unittest.main()
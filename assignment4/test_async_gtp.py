@@ -0,0 +1,60 @@
+#!/usr/local/bin/python3
+# /usr/bin/python3
+# Set the path to your python3 above
+
+import os
+import time
+import unittest
+from regress import GtpEngine
+
+PROGRAM = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gomoku4", "Gomoku4.py")
+
+
+class AsyncGtpEngine(GtpEngine):
+    def __init__(self):
+        super().__init__(PROGRAM, args=["--async"])
+
+    def write(self, line):
+        self.process.stdin.write((line + "\n").encode())
+        self.process.stdin.flush()
+
+    def read(self, timeout=10):
+        return self._read_response(time.monotonic() + timeout).strip()
+
+
+class AsyncGtpTestCase(unittest.TestCase):
+    """Tests for gomoku4/async_gtp.py"""
+
+    def setUp(self):
+        self.engine = AsyncGtpEngine()
+        self.engine.write("timelimit 60")
+        self.assertEqual(self.engine.read(), "=")
+
+    def tearDown(self):
+        self.engine.close()
+
+    def test_cheap_commands_during_search(self):
+        self.engine.write("1 genmove b")
+        self.engine.write("2 gogui-rules_side_to_move")
+        self.assertEqual(self.engine.read(), "=2 black")
+        start = time.monotonic()
+        self.engine.write("3 stop")
+        self.assertRegex(self.engine.read(), r"^=1 [A-G][1-7]$")
+        self.assertEqual(self.engine.read(), "=3")
+        self.assertLess(time.monotonic() - start, 5)
+        self.engine.write("4 gogui-rules_side_to_move")
+        self.assertEqual(self.engine.read(), "=4 white")
+
+    def test_interrupt_and_quit(self):
+        self.engine.write("genmove b")
+        self.engine.write("# interrupt")
+        self.assertRegex(self.engine.read(), r"^= [A-G][1-7]$")
+        self.engine.write("genmove w")
+        self.engine.write("quit")
+        self.assertRegex(self.engine.read(), r"^= [A-G][1-7]$")
+        self.assertEqual(self.engine.read(), "=")
+        self.assertEqual(self.engine.process.wait(timeout=10), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
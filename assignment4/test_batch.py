@@ -0,0 +1,96 @@
+#!/usr/local/bin/python3
+# /usr/bin/python3
+# Set the path to your python3 above
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from arena import load_modules
+
+batch, solver, board_module = load_modules("gomoku4", ["batch", "solver", "board"])
+
+BLACK = 1
+WHITE = 2
+BATCH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gomoku4", "batch.py")
+
+POSITIONS = """
+# black wins at E7
+XXXX...
+OOOO...
+.......
+.......
+.......
+.......
+.......
+
+# white cannot stop both ends
+(;SZ[7];B[cd];W[cc];B[dd];W[dc];B[ed];W[ec];B[fd])
+
+size 7
+play b d4
+play w d5
+"""
+
+
+class BatchTestCase(unittest.TestCase):
+    """Tests for gomoku4/batch.py"""
+
+    def test_parse_formats(self):
+        board, sgf, moves = batch.parse_positions(POSITIONS)
+        self.assertEqual(board[0], 7)
+        self.assertEqual(board[2], BLACK)
+        self.assertIn((BLACK, 7, 1), board[1])
+        self.assertIn((WHITE, 6, 4), board[1])
+        self.assertEqual(sgf, (7, [(BLACK, 4, 3), (WHITE, 5, 3), (BLACK, 4, 4),
+                                   (WHITE, 5, 4), (BLACK, 4, 5), (WHITE, 5, 5),
+                                   (BLACK, 4, 6)], WHITE))
+        self.assertEqual(moves, (7, [(BLACK, 4, 4), (WHITE, 5, 4)], BLACK))
+
+    def test_solver_blocks_on_the_board(self):
+        board = board_module.GoBoard(7)
+        for row, col in [(4, 3), (5, 3), (4, 4), (5, 4), (4, 5), (5, 5), (1, 1), (5, 6)]:
+            board.play_move(board.pt(row, col), board.current_player)
+        before = board.copy()
+        # black cannot win at once, and must stop white's four at B5 or G5
+        moves, winning = solver.Solver(1).moves(board)
+        self.assertFalse(winning)
+        self.assertEqual(sorted(moves), [board.pt(5, 2), board.pt(5, 7)])
+        # the probes leave the board as they found it
+        self.assertEqual(board.current_player, before.current_player)
+        self.assertEqual(board.hash, before.hash)
+        self.assertEqual(board.board.tolist(), before.board.tolist())
+        self.assertEqual(board.get_empty_points().tolist(), before.get_empty_points().tolist())
+        self.assertEqual(solver.solve(board, 5)[0], WHITE)
+
+    def test_analyze_in_process(self):
+        positions = batch.parse_positions(POSITIONS)[:2]
+        results = list(batch.analyze_positions(positions, timelimit=5, workers=0))
+        self.assertEqual([r["index"] for r in results], [0, 1])
+        self.assertEqual(results[0]["solve"], "b E7")
+        self.assertEqual(results[0]["policy_moves"], "Win E7")
+        self.assertEqual(results[1]["to_play"], "w")
+        self.assertEqual(results[1]["solve"], "b")
+        self.assertEqual(results[1]["policy_moves"], "BlockWin B4 G4")
+        self.assertIsInstance(results[1]["evaluation"], int)
+
+    def test_command_line_workers(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            infile = os.path.join(tmp, "positions.txt")
+            outfile = os.path.join(tmp, "results.jsonl")
+            with open(infile, "w") as f:
+                f.write(POSITIONS)
+            subprocess.run([sys.executable, BATCH, infile, "-o", outfile, "-j", "2",
+                            "--timelimit", "0.5", "--analyses", "solve,evaluation"],
+                           check=True, stderr=subprocess.DEVNULL)
+            with open(outfile) as f:
+                results = [json.loads(line) for line in f]
+        self.assertEqual([r["index"] for r in results], [0, 1, 2])
+        self.assertEqual(results[0]["solve"], "b E7")
+        self.assertNotIn("policy_moves", results[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
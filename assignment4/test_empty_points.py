@@ -0,0 +1,71 @@
+#!/usr/local/bin/python3
+# /usr/bin/python3
+# Set the path to your python3 above
+
+import unittest
+import numpy as np
+from arena import load_modules
+
+gomoku4_board, = load_modules("gomoku4", ["board"])
+simple_board, flat_mc_util = load_modules("flat_mc_player", ["simple_board", "board_util"])
+
+EMPTY = 0
+
+
+class EmptyPointsTestCase(unittest.TestCase):
+    """Tests for the incrementally maintained empty points of the boards"""
+
+    def assertEmptyPoints(self, board):
+        expected = np.where(board.board == EMPTY)[0]
+        empty = board.get_empty_points()
+        self.assertEqual(sorted(empty.tolist()), expected.tolist())
+        for i, point in enumerate(empty.tolist()):
+            self.assertEqual(board.empty_index[point], i)
+
+    def check_play_and_undo(self, board, play, undo):
+        """ play and undo are the names of the board's methods """
+        np.random.seed(5)
+        start = board.get_empty_points().tolist()
+        moves = []
+        for _ in range(20):
+            empty = board.get_empty_points()
+            move = int(empty[np.random.randint(len(empty))])
+            getattr(board, play)(move, board.current_player)
+            moves.append(move)
+            self.assertEmptyPoints(board)
+        copy = board.copy()
+        self.assertEmptyPoints(copy)
+        # undo in reverse order restores the order
+        for move in reversed(moves):
+            getattr(board, undo)(move)
+        self.assertEmptyPoints(board)
+        self.assertEqual(board.get_empty_points().tolist(), start)
+        # in any other order the set
+        for move in moves:
+            getattr(copy, undo)(move)
+            self.assertEmptyPoints(copy)
+        self.assertEqual(len(copy.get_empty_points()), len(start))
+
+    def test_gomoku4_board(self):
+        board = gomoku4_board.GoBoard(7)
+        self.check_play_and_undo(board, "play_move", "undo_move")
+        board.board[board.pt(4, 4)] = 1
+        board.update_empty_points()
+        self.assertEmptyPoints(board)
+
+    def test_simple_board_gomoku(self):
+        board = simple_board.SimpleGoBoard(7)
+        self.check_play_and_undo(board, "play_move_gomoku", "undo_move_gomoku")
+
+    def test_simple_board_go_captures(self):
+        np.random.seed(11)
+        board = simple_board.SimpleGoBoard(5)
+        for _ in range(200):
+            color = board.current_player
+            move = flat_mc_util.GoBoardUtil.generate_random_move(board, color, True)
+            board.play_move(move, color)
+            self.assertEmptyPoints(board)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+#!/usr/local/bin/python3
+# /usr/bin/python3
+# Set the path to your python3 above
+
+import unittest
+import numpy as np
+from arena import load_modules
+
+simple_board, alphabeta, board_util, gomoku3 = load_modules(
+    "flat_mc_player", ["simple_board", "alphabeta", "board_util", "Gomoku3"])
+
+BLACK = 1
+WHITE = 2
+
+
+class GameEndTestCase(unittest.TestCase):
+    """Tests for the last move game end check of flat_mc_player"""
+
+    def test_last_move_check_agrees_with_full_scan(self):
+        np.random.seed(7)
+        for _ in range(20):
+            board = simple_board.SimpleGoBoard(7)
+            while True:
+                move = board_util.GoBoardUtil.generate_random_move_gomoku(board)
+                board.play_move_gomoku(move, board.current_player)
+                result = alphabeta.game_end(board, move)
+                self.assertEqual(result, alphabeta.game_end(board))
+                if result is not None:
+                    break
+
+    def test_overline(self):
+        board = simple_board.SimpleGoBoard(7)
+        for black, white in zip([1, 3, 4, 5, 6], [1, 3, 5, 7, 2]):
+            board.play_move_gomoku(board.pt(1, black), BLACK)
+            board.play_move_gomoku(board.pt(7, white), WHITE)
+        # six in a row
+        board.play_move_gomoku(board.pt(1, 2), BLACK)
+        self.assertEqual(board.check_game_end_gomoku(), (True, BLACK))
+        self.assertEqual(alphabeta.game_end(board, board.pt(1, 2)), -1)
+        self.assertEqual(gomoku3.game_result(board, board.pt(1, 2)), BLACK)
+
+    def test_solve(self):
+        board = simple_board.SimpleGoBoard(7)
+        for row, col in [(4, 1), (5, 1), (4, 2), (5, 2), (4, 3), (5, 3), (4, 4), (5, 4)]:
+            board.play_move_gomoku(board.pt(row, col), board.current_player)
+        self.assertEqual(board.solve(), ("b", board.pt(4, 5)))
+        board.play_move_gomoku(board.pt(4, 5), BLACK)
+        self.assertEqual(board.solve(), ("b", "NoMove"))
+
+
+if __name__ == "__main__":
+    unittest.main()
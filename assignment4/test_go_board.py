@@ -0,0 +1,223 @@
+#!/usr/local/bin/python3
+# /usr/bin/python3
+# Set the path to your python3 above
+
+import unittest
+import numpy as np
+from arena import load_modules
+
+simple_board, board_util = load_modules("flat_mc_player", ["simple_board", "board_util"])
+
+BLACK = board_util.BLACK
+WHITE = board_util.WHITE
+EMPTY = board_util.EMPTY
+PASS = board_util.PASS
+
+
+def flood_fill_blocks(board):
+    """ The blocks of board as {frozenset of stones: set of liberties} """
+    blocks = {}
+    seen = set()
+    for point in range(board.maxpoint):
+        color = board.board[point]
+        if color not in (BLACK, WHITE) or point in seen:
+            continue
+        stones, liberties, stack = {point}, set(), [point]
+        while stack:
+            p = stack.pop()
+            for nb in board.neighbors[p]:
+                if board.board[nb] == EMPTY:
+                    liberties.add(nb)
+                elif board.board[nb] == color and nb not in stones:
+                    stones.add(nb)
+                    stack.append(nb)
+        seen |= stones
+        blocks[frozenset(stones)] = liberties
+    return blocks
+
+
+def scan_is_eye(board, point, color):
+    """ is_eye computed from the neighbor and diagonal points """
+    if any(board.board[nb] != color for nb in board.neighbors[point]):
+        return False
+    NS = board.NS
+    diagonals = [point - NS - 1, point - NS + 1, point + NS - 1, point + NS + 1]
+    false_count, at_edge = 0, False
+    for d in diagonals:
+        if board.board[d] == board_util.BORDER:
+            at_edge = True
+        elif board.board[d] == board_util.GoBoardUtil.opponent(color):
+            false_count += 1
+    return false_count <= 1 - at_edge
+
+
+def zobrist_hash(board):
+    """ The Zobrist hash of board, from its stones """
+    code = 0
+    for point in range(board.maxpoint):
+        if board.board[point] in (BLACK, WHITE):
+            code ^= simple_board.ZOBRIST[board.board[point]][point]
+    return code
+
+
+def zobrist_hash_after(board, move, color):
+    after = board.copy()
+    after.play_move(move, color)
+    return zobrist_hash(after)
+
+
+def board_state(board):
+    """ Everything play_move changes, for comparing positions exactly """
+    stones = [p for p in range(board.maxpoint) if board.block[p] != board_util.NULLPOINT]
+    return (board.board.tolist(), board.get_empty_points().tolist(), list(board.empty_index),
+            list(board.block), [board.next_stone[p] for p in stones],
+            {block: set(libs) for block, libs in board.liberties.items()},
+            dict(board.block_size), list(board.pattern), board.hash, set(board.history),
+            board.ko_recapture, board.current_player)
+
+
+class GoBoardTestCase(unittest.TestCase):
+    """Tests for the Go rules of flat_mc_player/simple_board.py"""
+
+    def assertPatternsConsistent(self, board):
+        """ only the patterns of points on the board are maintained """
+        expected = board._compute_patterns()
+        for point in range(board.maxpoint):
+            if board.board[point] != board_util.BORDER:
+                self.assertEqual(board.pattern[point], expected[point])
+
+    def play(self, board, moves):
+        for color, row, col in moves:
+            self.assertTrue(board.play_move(board.pt(row, col), color))
+
+    def assertBlocksConsistent(self, board):
+        expected = flood_fill_blocks(board)
+        self.assertEqual(len(expected), len(board.liberties))
+        for stones, liberties in expected.items():
+            stone = next(iter(stones))
+            self.assertEqual(set(board.block_stones(stone)), set(stones))
+            self.assertEqual(board.block_liberties(stone), liberties)
+            self.assertEqual(board.block_size[board.block[stone]], len(stones))
+
+    def test_capture_and_ko(self):
+        board = simple_board.SimpleGoBoard(5)
+        self.play(board, [(BLACK, 2, 2), (WHITE, 2, 3), (BLACK, 1, 3), (WHITE, 1, 4),
+                          (BLACK, 3, 3), (WHITE, 3, 4), (BLACK, 5, 5), (WHITE, 2, 5)])
+        # black captures the white stone, white may not take back at once
+        self.assertTrue(board.play_move(board.pt(2, 4), BLACK))
+        self.assertEqual(board.board[board.pt(2, 3)], EMPTY)
+        self.assertEqual(board.ko_recapture, board.pt(2, 3))
+        self.assertFalse(board.is_legal(board.pt(2, 3), WHITE))
+        self.assertFalse(board.play_move(board.pt(2, 3), WHITE))
+        self.assertBlocksConsistent(board)
+
+    def test_suicide(self):
+        board = simple_board.SimpleGoBoard(5)
+        self.play(board, [(BLACK, 1, 2), (WHITE, 5, 5), (BLACK, 2, 1)])
+        self.assertFalse(board.is_legal(board.pt(1, 1), WHITE))
+        self.assertFalse(board.play_move(board.pt(1, 1), WHITE))
+        # filling the last liberty of the own block is suicide too
+        board = simple_board.SimpleGoBoard(5)
+        self.play(board, [(BLACK, 4, 5), (WHITE, 5, 5), (BLACK, 4, 4), (WHITE, 1, 1),
+                          (BLACK, 5, 3)])
+        self.assertFalse(board.is_legal(board.pt(5, 4), WHITE))
+        self.assertTrue(board.is_legal(board.pt(5, 4), BLACK))
+        self.assertBlocksConsistent(board)
+
+    def test_random_games_keep_blocks_consistent(self):
+        np.random.seed(3)
+        for size in (5, 7):
+            board = simple_board.SimpleGoBoard(size)
+            passes = 0
+            for _ in range(3 * size * size):
+                color = board.current_player
+                move = board_util.GoBoardUtil.generate_random_move(board, color, True)
+                self.assertTrue(board.play_move(move, color))
+                self.assertBlocksConsistent(board)
+                passes = passes + 1 if move == PASS else 0
+                if passes == 2:
+                    break
+            copy = board.copy()
+            self.assertBlocksConsistent(copy)
+            self.assertIsNot(copy.liberties, board.liberties)
+
+    def test_undo_restores_positions(self):
+        np.random.seed(6)
+        for size in (5, 7):
+            board = simple_board.SimpleGoBoard(size)
+            states = []
+            for _ in range(4 * size * size):
+                color = board.current_player
+                move = board_util.GoBoardUtil.generate_random_move(board, color, True)
+                states.append(board_state(board))
+                self.assertTrue(board.play_move(move, color))
+            while states:
+                board.undo_move()
+                self.assertEqual(board_state(board), states.pop())
+            self.assertEqual(board.undo_stack, [])
+
+    def test_undo_capture_and_ko(self):
+        board = simple_board.SimpleGoBoard(5)
+        self.play(board, [(BLACK, 2, 2), (WHITE, 2, 3), (BLACK, 1, 3), (WHITE, 1, 4),
+                          (BLACK, 3, 3), (WHITE, 3, 4), (BLACK, 5, 5), (WHITE, 2, 5)])
+        before = board_state(board)
+        self.assertTrue(board.play_move(board.pt(2, 4), BLACK))
+        self.assertEqual(board.ko_recapture, board.pt(2, 3))
+        board.undo_move()
+        self.assertEqual(board_state(board), before)
+        self.assertEqual(board.board[board.pt(2, 3)], WHITE)
+        self.assertBlocksConsistent(board)
+
+    def test_hash_and_history(self):
+        np.random.seed(8)
+        board = simple_board.SimpleGoBoard(7)
+        hashes = {0}
+        for _ in range(150):
+            color = board.current_player
+            move = board_util.GoBoardUtil.generate_random_move(board, color, True)
+            if move != PASS:
+                self.assertEqual(board._next_hash(move, color), zobrist_hash_after(board, move, color))
+            board.play_move(move, color)
+            self.assertEqual(board.hash, zobrist_hash(board))
+            hashes.add(board.hash)
+        self.assertEqual(board.history, hashes)
+        self.assertEqual(board.copy().history, hashes)
+        for _ in range(150):
+            board.undo_move()
+        self.assertEqual(board.history, {0})
+
+    def test_superko(self):
+        board = simple_board.SimpleGoBoard(5)
+        self.play(board, [(BLACK, 2, 2), (WHITE, 2, 3), (BLACK, 1, 3), (WHITE, 1, 4),
+                          (BLACK, 3, 3), (WHITE, 3, 4), (BLACK, 5, 5), (WHITE, 2, 5),
+                          (BLACK, 2, 4)])
+        # after two passes the ko rule allows the recapture, which repeats
+        # the position before black took the ko
+        board.play_move(PASS, WHITE)
+        board.play_move(PASS, BLACK)
+        ko = board.pt(2, 3)
+        self.assertTrue(board.is_legal(ko, WHITE))
+        self.assertFalse(board.is_legal(ko, WHITE, superko=True))
+        self.assertFalse(board.play_move(ko, WHITE, superko=True))
+        self.assertTrue(board.play_move(ko, WHITE))
+
+    def test_patterns_follow_the_board(self):
+        np.random.seed(4)
+        board = simple_board.SimpleGoBoard(7)
+        for _ in range(150):
+            color = board.current_player
+            board.play_move(board_util.GoBoardUtil.generate_random_move(board, color, True), color)
+            self.assertPatternsConsistent(board)
+            for point in board.get_empty_points().tolist():
+                for c in (BLACK, WHITE):
+                    self.assertEqual(bool(board.is_eye(point, c)), scan_is_eye(board, point, c))
+        for move in [board.pt(1, 1), board.pt(4, 4)]:
+            if board.board[move] == EMPTY:
+                board.play_move_gomoku(move, BLACK)
+                self.assertPatternsConsistent(board)
+                board.undo_move_gomoku(move)
+                self.assertPatternsConsistent(board)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+#!/usr/local/bin/python3
+# /usr/bin/python3
+# Set the path to your python3 above
+
+import os
+import subprocess
+import sys
+import time
+import unittest
+from arena import load_modules
+
+Go4, simple_board, mcts, board_util = load_modules(
+    "go_player", ["Go4", "simple_board", "mcts", "board_util"])
+
+BLACK = board_util.BLACK
+WHITE = board_util.WHITE
+PASS = board_util.PASS
+PROGRAM = os.path.join(os.path.dirname(os.path.abspath(__file__)), "go_player", "Go4.py")
+
+
+class GoPlayerTestCase(unittest.TestCase):
+    """Tests for the UCT Go player in go_player"""
+
+    def play(self, board, moves):
+        for color, row, col in moves:
+            self.assertTrue(board.play_move(board.pt(row, col), color))
+
+    def test_area_score(self):
+        board = simple_board.SimpleGoBoard(5)
+        for row in range(1, 6):
+            self.play(board, [(BLACK, row, 3), (WHITE, row, 4)])
+        # black owns columns 1-3, white columns 4-5
+        self.assertEqual(board.score(0.5), 15 - 10 - 0.5)
+        # empty points that reach both colors are no one's
+        board = simple_board.SimpleGoBoard(5)
+        self.play(board, [(BLACK, 1, 1), (WHITE, 5, 5)])
+        self.assertEqual(board.score(0), 0)
+
+    def test_passes_end_the_game(self):
+        board = simple_board.SimpleGoBoard(5)
+        board.play_move(PASS, BLACK)
+        self.play(board, [(WHITE, 3, 3)])
+        self.assertEqual(board.passes, 0)
+        board.play_move(PASS, BLACK)
+        board.play_move(PASS, WHITE)
+        self.assertEqual(board.passes, 2)
+        self.assertEqual(board.copy().passes, 2)
+        self.assertEqual(mcts.winner(board, 6.5), WHITE)
+
+    def test_undo_playout(self):
+        board = simple_board.SimpleGoBoard(7)
+        self.play(board, [(BLACK, 4, 4), (WHITE, 3, 4)])
+        board.play_move(PASS, BLACK)
+        start = board.copy()
+        _, moves = mcts.playout(board, 6.5)
+        self.assertEqual(board.passes, 2)
+        for _ in range(moves):
+            board.undo_move()
+        self.assertTrue(Go4.same_position(board, start))
+        self.assertEqual(board.get_empty_points().tolist(), start.get_empty_points().tolist())
+        self.assertEqual(board.liberties, start.liberties)
+        self.assertEqual(board.pattern, start.pattern)
+
+    def test_captures_the_group_in_atari(self):
+        board = simple_board.SimpleGoBoard(5)
+        self.play(board, [(BLACK, 2, 2), (WHITE, 3, 2), (BLACK, 2, 3), (WHITE, 3, 3),
+                          (BLACK, 2, 4), (WHITE, 3, 4), (BLACK, 3, 1), (WHITE, 5, 5),
+                          (BLACK, 4, 2), (WHITE, 5, 1), (BLACK, 4, 3), (WHITE, 1, 5),
+                          (BLACK, 4, 4)])
+        # white's three stones have a single liberty left
+        self.assertEqual(board.block_liberties(board.pt(3, 2)), {board.pt(3, 5)})
+        board.play_move(PASS, WHITE)
+        engine = Go4.Go4()
+        engine.set_timeout(1)
+        self.assertEqual(engine.get_move(board, BLACK), board.pt(3, 5))
+
+    def test_tree_reuse(self):
+        engine = Go4.Go4()
+        engine.set_timeout(0.5)
+        board = simple_board.SimpleGoBoard(7)
+        move = engine.get_move(board, BLACK)
+        board.play_move(move, BLACK)
+        node = next(child for child in engine.tree.root.children if child.move == move)
+        answer = max(node.children, key=lambda child: child.visits)
+        board.play_move(answer.move, WHITE)
+        tree = engine._reuse_tree(board, BLACK)
+        self.assertIs(tree.root, answer)
+        self.assertTrue(Go4.same_position(tree.board, board))
+        # not a continuation of the tree
+        engine.tree = tree
+        self.assertIsNone(engine._reuse_tree(simple_board.SimpleGoBoard(7), BLACK))
+
+    def test_root_parallel_gtp(self):
+        commands = "boardsize 7\nkomi 9\ntimelimit 1\ngenmove b\nsearch_stats\n" \
+                   "genmove w\nfinal_score\nquit\n"
+        output = subprocess.run([sys.executable, PROGRAM, "-j", "2"], input=commands,
+                                capture_output=True, text=True, timeout=60).stdout
+        responses = [r for r in output.split("\n\n") if r.strip()]
+        self.assertEqual(len(responses), 8)
+        self.assertTrue(all(r.startswith("=") for r in responses))
+        self.assertRegex(responses[3], r"^= [A-G][1-7]$")
+        self.assertIn("iterations", responses[4])
+        self.assertRegex(responses[6], r"^= (B|W)\+")
+
+    def test_root_parallel_time_limit(self):
+        engine = subprocess.Popen([sys.executable, PROGRAM, "-j", "2"], stdin=subprocess.PIPE,
+                                  stdout=subprocess.PIPE, text=True)
+
+        def send(command):
+            engine.stdin.write(command + "\n")
+            engine.stdin.flush()
+            lines = []
+            while True:
+                line = engine.stdout.readline()
+                if line in ("\n", ""):
+                    return "".join(lines).strip()
+                lines.append(line)
+
+        try:
+            # the workers are up before the first command is answered
+            self.assertEqual(send("timelimit 1"), "=")
+            for color in "bwb":
+                start = time.monotonic()
+                self.assertRegex(send("genmove " + color), r"^= [A-G][1-7]$")
+                self.assertLess(time.monotonic() - start, 1)
+        finally:
+            engine.stdin.close()
+            engine.kill()
+            engine.wait()
+            engine.stdout.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
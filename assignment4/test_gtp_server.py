@@ -0,0 +1,100 @@
+#!/usr/local/bin/python3
+# /usr/bin/python3
+# Set the path to your python3 above
+
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+PROGRAM = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gomoku4", "gtp_server.py")
+
+
+class Client(object):
+    def __init__(self, path):
+        self.socket = socket.socket(socket.AF_UNIX)
+        self.socket.connect(path)
+        self.file = self.socket.makefile("rw")
+
+    def send(self, command):
+        self.write(command)
+        return self.read()
+
+    def write(self, command):
+        self.file.write(command + "\n")
+        self.file.flush()
+
+    def read(self):
+        lines = []
+        while True:
+            line = self.file.readline()
+            if line in ("\n", ""):
+                return "".join(lines).strip()
+            lines.append(line)
+
+    def close(self):
+        self.file.close()
+        self.socket.close()
+
+
+class GtpServerTestCase(unittest.TestCase):
+    """Tests for gomoku4/gtp_server.py"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "gtp.sock")
+        self.server = subprocess.Popen(
+            [sys.executable, PROGRAM, "--unix", self.path, "-j", "2"],
+            cwd=os.path.dirname(PROGRAM), stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + 10
+        while not os.path.exists(self.path) and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+    def tearDown(self):
+        self.server.kill()
+        self.server.wait()
+        self.directory.cleanup()
+
+    def test_independent_games(self):
+        first = Client(self.path)
+        second = Client(self.path)
+        self.assertEqual(first.send("boardsize 5"), "=")
+        self.assertEqual(second.send("boardsize 9"), "=")
+        self.assertEqual(first.send("timelimit 0.5"), "=")
+        self.assertEqual(first.send("play b c3"), "=")
+        self.assertEqual(first.send("search_stats"), "= no search")
+        self.assertRegex(first.send("genmove w"), r"^= [A-E][1-5]$")
+        self.assertRegex(first.send("search_stats"), r"^= iterations [1-9]")
+        self.assertEqual(first.send("gogui-rules_side_to_move"), "= black")
+        self.assertEqual(second.send("gogui-rules_board_size"), "= 9")
+        self.assertEqual(second.send("gogui-rules_side_to_move"), "= black")
+        self.assertEqual(first.send("quit"), "=")
+        first.close()
+        # the server keeps serving the other games
+        self.assertEqual(second.send("gogui-rules_board_size"), "= 9")
+        second.close()
+
+    def test_search_does_not_block_other_games(self):
+        first = Client(self.path)
+        second = Client(self.path)
+        self.assertEqual(first.send("timelimit 3"), "=")
+        self.assertEqual(first.send("policy rule_based"), "= policy set to rule_based")
+        self.assertEqual(first.send("play b d4"), "=")
+        self.assertRegex(first.send("policy_moves"), r"^= Random( [A-G][1-7]){48}$")
+        # the empty 7x7 board cannot be solved in time
+        start = time.monotonic()
+        first.write("solve")
+        for command in ["play b c3", "play w d4", "showboard"]:
+            self.assertTrue(second.send(command).startswith("="))
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(first.read(), "= unknown")
+        self.assertGreater(time.monotonic() - start, 2)
+        first.close()
+        second.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
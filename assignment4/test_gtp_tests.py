@@ -0,0 +1,55 @@
+#!/usr/local/bin/python3
+# /usr/bin/python3
+# Set the path to your python3 above
+
+import unittest
+from gtp_tests import parse_tests
+from benchmark import load_positions, parse_sizes
+
+
+class GtpTestsTestCase(unittest.TestCase):
+    """Tests for gtp_tests.py"""
+
+    def test_setup_replays_state_and_moves(self):
+        lines = [
+            "boardsize 5\n",
+            "clear_board\n",
+            "timelimit 10\n",
+            "play b A1\n",
+            "play w B2\n",
+            "10 solve\n",
+            "#? [b a2]\n",
+            "clear_board\n",
+            "play b C3\n",
+            "20 genmove w\n",
+            "#? [!pass]\n",
+        ]
+        first, second = parse_tests(lines)
+        self.assertEqual(first.setup, ["boardsize 5", "clear_board", "timelimit 10",
+                                       "play b A1", "play w B2"])
+        self.assertEqual(first.command, "solve")
+        self.assertEqual(first.moves(), [("b", "a1"), ("w", "b2")])
+        self.assertTrue(first.check("b a2"))
+        self.assertFalse(first.check("b a3"))
+        self.assertEqual(second.setup, ["boardsize 5", "clear_board", "timelimit 10",
+                                        "play b C3"])
+        self.assertTrue(second.negated)
+        self.assertTrue(second.check("c4"))
+        self.assertFalse(second.check("pass"))
+
+    def test_expected_failure_and_alternatives(self):
+        case, = parse_tests(["1 solve\n", "#? [b|w]*\n"])
+        self.assertTrue(case.expected_failure)
+        self.assertTrue(case.check("w"))
+        self.assertEqual(case.boardsize(), 7)
+
+    def test_benchmark_positions(self):
+        positions = load_positions()
+        self.assertEqual(sorted(positions), parse_sizes("5-25"))
+        # mid-game positions, no empty boards
+        self.assertTrue(all(moves for moves in positions.values()))
+        self.assertEqual(parse_sizes("5,7-9"), [5, 7, 8, 9])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+#!/usr/local/bin/python3
+# /usr/bin/python3
+# Set the path to your python3 above
+
+import unittest
+from arena import load_modules
+
+gomoku4, board_module, mcts = load_modules("gomoku4", ["Gomoku4", "board", "mcts"])
+
+BLACK = 1
+WHITE = 2
+
+
+class GomokuMctsTestCase(unittest.TestCase):
+    """Tests for the MCTS search of gomoku4"""
+
+    def play(self, board, points):
+        for row, col in points:
+            board.play_move(board.pt(row, col), board.current_player)
+
+    def tree(self, board):
+        return mcts.MctsTree(board.copy(), board.current_player, gomoku4.CombinedPolicy())
+
+    def test_candidates_near_stones(self):
+        board = board_module.GoBoard(15)
+        self.assertEqual(board.get_nearby_points(2), [])
+        self.assertEqual(mcts.candidate_moves(board), [board.pt(8, 8)])
+        self.play(board, [(1, 1), (8, 8)])
+        expected = sorted(board.pt(row, col)
+                          for row in range(1, 16) for col in range(1, 16)
+                          if (max(row, col) <= 3 or max(abs(row - 8), abs(col - 8)) <= 2)
+                          and (row, col) not in [(1, 1), (8, 8)])
+        self.assertEqual(mcts.candidate_moves(board), expected)
+
+    def test_progressive_widening(self):
+        board = board_module.GoBoard(19)
+        self.play(board, [(10, 10), (10, 11), (11, 10)])
+        tree = self.tree(board)
+        for _ in range(10):
+            mcts.mcts_step(tree)
+            visits = tree.root.sims / mcts.NUM_SIMS
+            self.assertLessEqual(len(tree.root.children),
+                                 max(1, mcts.WIDENING_K * visits ** mcts.WIDENING_ALPHA) + 1)
+        # admitted in policy order, among the candidates
+        order = [move for move, _ in tree.rule_policy.best_moves(
+            board, board.current_player, mcts.candidate_moves(board))]
+        moves = [child.move for child in tree.root.children]
+        self.assertEqual(moves, order[:len(moves)])
+        self.assertFalse(tree.root.is_fully_expanded)
+
+    def test_policy_runs_once_per_node(self):
+        board = board_module.GoBoard(9)
+        self.play(board, [(5, 5), (5, 6)])
+        tree = self.tree(board)
+        policy = tree.rule_policy
+        calls = []
+
+        def best_moves(board, color, moves=None):
+            calls.append(tuple(board.board))
+            return gomoku4.CombinedPolicy.best_moves(policy, board, color, moves)
+        policy.best_moves = best_moves
+        for _ in range(30):
+            mcts.mcts_step(tree)
+        self.assertEqual(len(calls), len(set(calls)))
+        self.assertEqual(len(tree.root.children), tree.root.next_move)
+        self.assertEqual([child.move for child in tree.root.children],
+                         tree.root.moves[:tree.root.next_move].tolist())
+
+    def test_amaf_statistics(self):
+        board = board_module.GoBoard(7)
+        self.play(board, [(4, 4), (4, 5)])
+        tree = self.tree(board)
+        for _ in range(20):
+            mcts.mcts_step(tree)
+            # the simulations of the last iteration: every point at most
+            # once per playout, by one of the colors
+            played = tree.amaf_sims[BLACK] + tree.amaf_sims[WHITE]
+            self.assertLessEqual(played.max(), mcts.NUM_SIMS)
+            self.assertTrue((tree.amaf_wins <= tree.amaf_sims).all())
+        for child in tree.root.children:
+            # the iterations through a child played its move first
+            self.assertGreaterEqual(child.amaf_sims, child.sims)
+            self.assertLessEqual(child.amaf_sims, tree.root.sims)
+            self.assertLessEqual(child.amaf_wins, child.amaf_sims)
+        # and learn from the playouts of their siblings
+        self.assertTrue(any(child.amaf_sims > child.sims for child in tree.root.children))
+
+    def test_board_hash(self):
+        board = board_module.GoBoard(7)
+        self.play(board, [(4, 4), (4, 5), (3, 3)])
+        other = board_module.GoBoard(7)
+        self.play(other, [(3, 3), (4, 5), (4, 4)])
+        self.assertEqual(board.hash, other.hash)
+        self.assertEqual(board.copy().hash, board.hash)
+        board.undo_move(board.pt(3, 3))
+        self.assertNotEqual(board.hash, other.hash)
+        other.board[other.pt(3, 3)] = 0
+        other.update_empty_points()
+        self.assertEqual(board.hash, other.hash)
+
+    def test_transpositions_share_nodes(self):
+        class FirstTwoPolicy:
+            def best_moves(self, board, color, moves=None):
+                return [(move, 0) for move in moves[:2]]
+
+        board = board_module.GoBoard(7)
+        self.play(board, [(4, 4)])
+        tree = mcts.MctsTree(board.copy(), board.current_player, FirstTwoPolicy())
+        for _ in range(60):
+            mcts.mcts_step(tree)
+        self.assertGreater(tree.stats.transpositions, 0)
+        self.assertEqual(len(tree.table), tree.stats.nodes)
+        incoming = {}
+        for node in tree.table.values():
+            for edge in node.children:
+                incoming.setdefault(edge.node.hash, []).append(edge)
+        self.assertTrue(any(len(edges) > 1 for edges in incoming.values()))
+        # a position counts the simulations of all of its moves
+        for position, edges in incoming.items():
+            self.assertEqual(tree.table[position].sims, sum(edge.sims for edge in edges))
+
+        move = tree.best_move()
+        tree.advance(move)
+        board.play_move(move, board.current_player)
+        self.assertIs(tree.table[board.hash], tree.root)
+        # the positions that can still be reached
+        reachable, stack = set(), [tree.root]
+        while stack:
+            node = stack.pop()
+            reachable.add(node.hash)
+            stack.extend(edge.node for edge in node.children)
+        self.assertEqual(set(tree.table), reachable)
+        self.assertLess(len(tree.table), tree.stats.nodes)
+
+    def test_finds_win_on_large_board(self):
+        board = board_module.GoBoard(19)
+        self.play(board, [(10, 5), (1, 1), (10, 6), (1, 3), (10, 7), (19, 19), (10, 8), (19, 17)])
+        tree = self.tree(board)
+        for _ in range(3):
+            mcts.mcts_step(tree)
+        self.assertIn(tree.best_move(), [board.pt(10, 4), board.pt(10, 9)])
+
+
+if __name__ == "__main__":
+    unittest.main()
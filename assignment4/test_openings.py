@@ -0,0 +1,46 @@
+#!/usr/local/bin/python3
+# /usr/bin/python3
+# Set the path to your python3 above
+
+import unittest
+from openings import parse_openings, generate_openings
+from arena import Arena
+
+
+class OpeningsTestCase(unittest.TestCase):
+    """Tests for openings.py"""
+
+    def test_parse_openings(self):
+        lines = [
+            "# two openings\n",
+            "play b D4\n",
+            "play w e5\n",
+            "\n",
+            "\n",
+            "play b C3  # corner\n",
+        ]
+        self.assertEqual(parse_openings(lines),
+                         [[("b", "D4"), ("w", "E5")], [("b", "C3")]])
+
+    def test_parse_rejects_other_commands(self):
+        with self.assertRaises(ValueError):
+            parse_openings(["genmove b\n"])
+
+    def test_generate_openings(self):
+        openings = generate_openings(5, plies=4, boardsize=7, seed=1)
+        self.assertEqual(len(openings), 5)
+        for opening in openings:
+            self.assertEqual([color for color, _ in opening], ["b", "w", "b", "w"])
+            self.assertEqual(len(set(move for _, move in opening)), 4)
+
+    def test_pairs_share_opening(self):
+        openings = [[("b", "D4")], [("b", "C3")]]
+        arena = Arena("random_player", "random_player", openings=openings)
+        jobs = [arena.job(game) for game in range(6)]
+        self.assertEqual([job["opening_index"] for job in jobs], [0, 0, 1, 1, 0, 0])
+        self.assertEqual([job["alternative"] for job in jobs], [False, True] * 3)
+
+
+"""Main"""
+if __name__ == "__main__":
+    unittest.main()
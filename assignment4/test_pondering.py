@@ -0,0 +1,60 @@
+#!/usr/local/bin/python3
+# /usr/bin/python3
+# Set the path to your python3 above
+
+import time
+import unittest
+from arena import load_modules
+
+gomoku4, board_module = load_modules("gomoku4", ["Gomoku4", "board"])
+
+BLACK = 1
+WHITE = 2
+
+
+class PonderingTestCase(unittest.TestCase):
+    """Tests for tree reuse and pondering in gomoku4"""
+
+    def setUp(self):
+        self.engine = gomoku4.Gomoku()
+        self.engine.set_timeout(0.3)
+        self.board = board_module.GoBoard(7)
+
+    def test_ponder_then_reuse_subtree(self):
+        move = self.engine.get_move(self.board, BLACK)
+        self.board.play_move(move, BLACK)
+        self.engine.start_pondering(self.board)
+        time.sleep(0.3)
+        self.engine.stop_pondering()
+        tree = self.engine.tree
+        self.assertEqual(tree.color, WHITE)
+        self.assertGreater(tree.root.sims, 0)
+        self.assertIs(tree.table[self.board.hash], tree.root)
+        pondered = self.board.hash
+
+        answer = max(tree.root.children, key=lambda n: n.sims)
+        self.board.play_move(answer.move, WHITE)
+        self.engine.get_move(self.board, BLACK)
+        tree = self.engine.tree
+        self.assertIs(tree.root, answer.node)
+        # only the positions after the answer are left
+        self.assertIs(tree.table[self.board.hash], answer.node)
+        self.assertNotIn(pondered, tree.table)
+        for child in answer.node.children:
+            self.board.play_move(child.move, BLACK)
+            self.assertIs(tree.table[self.board.hash], child.node)
+            self.board.undo_move(child.move)
+
+    def test_new_tree_for_unrelated_position(self):
+        self.engine.get_move(self.board, BLACK)
+        old_tree = self.engine.tree
+        self.board.play_move(self.board.pt(1, 1), BLACK)
+        self.board.play_move(self.board.pt(1, 2), WHITE)
+        self.board.play_move(self.board.pt(1, 3), BLACK)
+        self.engine.get_move(self.board, WHITE)
+        self.assertIsNot(self.engine.tree, old_tree)
+        self.assertEqual(self.engine.tree.color, WHITE)
+
+
+if __name__ == "__main__":
+    unittest.main()
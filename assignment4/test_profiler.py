@@ -0,0 +1,49 @@
+#!/usr/local/bin/python3
+# /usr/bin/python3
+# Set the path to your python3 above
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+from arena import load_modules
+
+gomoku4, board_module, gtp_connection, sampling_profiler = load_modules(
+    "gomoku4", ["Gomoku4", "board", "gtp_connection", "sampling_profiler"])
+
+
+class ProfilerTestCase(unittest.TestCase):
+    """Tests for the profile_start and profile_stop commands of gomoku4"""
+
+    def setUp(self):
+        self.con = gtp_connection.GtpConnection(gomoku4.Gomoku(), board_module.GoBoard(7))
+        self.responses = []
+        self.con.respond = lambda response="": self.responses.append(response)
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.con.go_engine.stop_pondering()
+        self.directory.cleanup()
+
+    def test_profile_genmove(self):
+        path = os.path.join(self.directory.name, "genmove.folded")
+        # profile_start imports the profiler on use, by its bare name
+        with mock.patch.dict(sys.modules, {"sampling_profiler": sampling_profiler}):
+            for command in ["timelimit 0.5", "play b d4", "play w e5", "ponder on",
+                            "profile_start 1", "genmove b", "profile_stop " + path]:
+                self.con.get_cmd(command)
+        samples = int(self.responses[-1].split()[0])
+        self.assertGreater(samples, 0)
+        self.assertEqual(self.responses[-1], "{} samples written to {}".format(samples, path))
+        with open(path) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(sum(int(line.rsplit(" ", 1)[1]) for line in lines), samples)
+        self.assertTrue(any("genmove_cmd" in line for line in lines))
+        # profiling leaves the other settings alone
+        self.assertIsNone(self.con.profiler)
+        self.assertTrue(self.con.ponder)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+#!/usr/local/bin/python3
+# /usr/bin/python3
+# Set the path to your python3 above
+
+import os
+import unittest
+from xml.etree import ElementTree
+from gtp_tests import parse_test_file, parse_tests
+from regress import Runner, junit_xml, PASS, TIMEOUT, EXPECTED_FAIL
+
+ASSIGNMENT2 = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "assignment2")
+PROGRAM = os.path.join(ASSIGNMENT2, "Gomoku.py")
+
+
+class RegressTestCase(unittest.TestCase):
+    """Tests for regress.py"""
+
+    def test_easy_tests_pass_in_parallel(self):
+        cases = parse_test_file(os.path.join(ASSIGNMENT2, "tests-easy.gtp"))
+        results = list(Runner(PROGRAM, workers=2).run(cases))
+        self.assertEqual([r["name"] for r in results], [c.name for c in cases])
+        self.assertEqual({r["status"] for r in results}, {PASS})
+        suite = ElementTree.fromstring(junit_xml(results))
+        self.assertEqual(suite.get("tests"), str(len(cases)))
+        self.assertEqual(suite.get("failures"), "0")
+
+    def test_timeout_restarts_engine(self):
+        cases = parse_tests([
+            "boardsize 7\n", "timelimit 10\n",
+            "1 solve\n", "#?[unknown]\n",
+            "boardsize 5\n", "play b a1\n",
+            "2 gogui-rules_legal_moves\n", "#?[b1]*\n",
+        ])
+        results = list(Runner(PROGRAM, workers=1, timeout=0.5).run(cases))
+        self.assertEqual([r["status"] for r in results], [TIMEOUT, EXPECTED_FAIL])
+
+
+if __name__ == "__main__":
+    unittest.main()
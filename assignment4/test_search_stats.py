@@ -0,0 +1,57 @@
+#!/usr/local/bin/python3
+# /usr/bin/python3
+# Set the path to your python3 above
+
+import os
+import re
+import subprocess
+import sys
+import unittest
+
+ASSIGNMENT4 = os.path.dirname(os.path.abspath(__file__))
+PROGRAMS = {
+    "gomoku4": os.path.join(ASSIGNMENT4, "gomoku4", "Gomoku4.py"),
+    "alphabeta_player": os.path.join(ASSIGNMENT4, "alphabeta_player", "Gomoku.py"),
+    "assignment2": os.path.join(ASSIGNMENT4, "..", "assignment2", "Gomoku.py"),
+}
+COMMANDS = "boardsize 7\ntimelimit 1\nsearch_stats\nplay b d4\nplay w e5\n" \
+           "genmove b\nsearch_stats\nquit\n"
+
+
+class SearchStatsTestCase(unittest.TestCase):
+    """Tests for the search_stats GTP command of the players"""
+
+    def search_stats(self, program):
+        """ The search_stats answers before and after a genmove """
+        output = subprocess.run([sys.executable, program], input=COMMANDS,
+                                cwd=os.path.dirname(program), capture_output=True,
+                                text=True, timeout=60).stdout
+        responses = [r for r in output.split("\n\n") if r.strip()]
+        self.assertEqual(len(responses), 8)
+        self.assertTrue(all(r.startswith("=") for r in responses))
+        return responses[2], responses[6]
+
+    def counter(self, stats, name):
+        match = re.search(r"^(= )?{} (\d+)$".format(name), stats, re.MULTILINE)
+        self.assertIsNotNone(match, stats)
+        return int(match.group(2))
+
+    def test_gomoku4(self):
+        before, after = self.search_stats(PROGRAMS["gomoku4"])
+        self.assertEqual(before, "= no search")
+        self.assertGreater(self.counter(after, "iterations"), 0)
+        self.assertGreater(self.counter(after, "nodes"), 0)
+
+    def test_alphabeta_player(self):
+        before, after = self.search_stats(PROGRAMS["alphabeta_player"])
+        self.assertEqual(before, "= no search")
+        self.assertGreater(self.counter(after, "nodes"), 0)
+
+    def test_assignment2(self):
+        before, after = self.search_stats(PROGRAMS["assignment2"])
+        self.assertEqual(before, "= no search")
+        self.assertGreater(self.counter(after, "nodes"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
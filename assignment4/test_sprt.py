@@ -0,0 +1,48 @@
+#!/usr/local/bin/python3
+# /usr/bin/python3
+# Set the path to your python3 above
+
+import unittest
+from sprt import SPRT, H0, H1, elo_difference, expected_score, score_to_elo, game_score
+
+
+class SprtTestCase(unittest.TestCase):
+    """Tests for sprt.py"""
+
+    def test_score_elo_roundtrip(self):
+        self.assertAlmostEqual(expected_score(0), 0.5)
+        for elo in (-200, -35, 0, 50, 400):
+            self.assertAlmostEqual(score_to_elo(expected_score(elo)), elo, places=6)
+
+    def test_elo_difference(self):
+        elo, lower, upper = elo_difference(60, 40, 0)
+        self.assertAlmostEqual(elo, score_to_elo(0.6))
+        self.assertLess(lower, elo)
+        self.assertGreater(upper, elo)
+        self.assertEqual(elo_difference(30, 30, 40)[0], 0)
+
+    def test_sprt_accepts_h1(self):
+        sprt = SPRT(0, 50)
+        for i in range(200):
+            sprt.add(1.0 if i % 4 else 0.5)
+            if sprt.status() is not None:
+                break
+        self.assertEqual(sprt.status(), H1)
+
+    def test_sprt_accepts_h0(self):
+        sprt = SPRT(0, 50)
+        for i in range(2000):
+            sprt.add((0.0, 0.5, 1.0, 0.5)[i % 4])
+            if sprt.status() is not None:
+                break
+        self.assertEqual(sprt.status(), H0)
+
+    def test_game_score(self):
+        self.assertEqual(game_score({"result": "black", "alternative": False}), 1.0)
+        self.assertEqual(game_score({"result": "black", "alternative": True}), 0.0)
+        self.assertEqual(game_score({"result": "draw", "alternative": True}), 0.5)
+
+
+"""Main"""
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+#!/usr/local/bin/python3
+# /usr/bin/python3
+# Set the path to your python3 above
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from arena import load_modules
+from benchmark import Gomoku4Bench, first_response
+
+board_module, = load_modules("gomoku4", ["board"])
+
+GOMOKU4_DIR = os.path.dirname(Gomoku4Bench.program)
+# generous, a launch takes well under a second on a laptop
+STARTUP_LIMIT = 3
+
+
+class StartupTestCase(unittest.TestCase):
+    """Tests for the startup time of gomoku4"""
+
+    def test_time_to_first_response(self):
+        self.assertLess(first_response(Gomoku4Bench.program), STARTUP_LIMIT)
+        self.assertLess(first_response(Gomoku4Bench.program, ["boardsize 25"]), STARTUP_LIMIT)
+
+    def test_profilers_not_imported(self):
+        code = ("import sys; sys.path.insert(0, {!r}); import Gomoku4; "
+                "print('cProfile' in sys.modules, 'sampling_profiler' in sys.modules)"
+                .format(GOMOKU4_DIR))
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True,
+                                text=True, check=True).stdout
+        self.assertEqual(output.split(), ["False", "False"])
+
+    def test_geometry_disk_cache(self):
+        saved_dir = board_module.GEOMETRY_CACHE_DIR
+        saved = board_module._geometry.pop(11, None)
+        with tempfile.TemporaryDirectory() as tmp:
+            board_module.GEOMETRY_CACHE_DIR = tmp
+            try:
+                computed = board_module.GoBoard(11)
+                self.assertTrue(os.path.exists(board_module._geometry_file(11)))
+                del board_module._geometry[11]
+                loaded = board_module.GoBoard(11)
+                self.assertEqual(loaded.boardLines5, computed.boardLines5)
+                self.assertEqual(loaded.boardLines6, computed.boardLines6)
+                self.assertEqual(loaded.diags, computed.diags)
+                self.assertIsNot(loaded.boardLines5, computed.boardLines5)
+            finally:
+                board_module.GEOMETRY_CACHE_DIR = saved_dir
+                board_module._geometry.pop(11, None)
+                if saved is not None:
+                    board_module._geometry[11] = saved
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+#!/usr/local/bin/python3
+# /usr/bin/python3
+# Set the path to your python3 above
+
+import time
+import unittest
+from arena import load_modules
+
+time_manager, = load_modules("gomoku4", ["time_manager"])
+TimeManager = time_manager.TimeManager
+
+
+def started(timelimit, elapsed, check_every=1):
+    """ A TimeManager that has been running for elapsed seconds """
+    manager = TimeManager(timelimit, check_every)
+    manager.start_time -= elapsed
+    return manager
+
+
+class TimeManagerTestCase(unittest.TestCase):
+    """Tests for the time_manager.py shared by the players"""
+
+    def test_identical_copies(self):
+        copies = [load_modules(name, ["time_manager"])[0].__file__
+                  for name in ("gomoku4", "flat_mc_player", "alphabeta_player", "go_player")]
+        sources = set()
+        for path in copies:
+            with open(path) as f:
+                sources.add(f.read())
+        self.assertEqual(len(sources), 1)
+
+    def test_hard_deadline_checked_every_k(self):
+        manager = TimeManager(0.01, check_every=16)
+        time.sleep(0.02)
+        self.assertFalse(manager.should_stop(15))
+        self.assertTrue(manager.should_stop(16))
+        with self.assertRaises(time_manager.TimeUp):
+            manager.check(32)
+
+    def test_stop_early_when_decided(self):
+        # 100 iterations in 4s, 50 more until the soft deadline at 6s
+        self.assertTrue(started(10, 4).should_stop(100, 100, 10))
+        self.assertFalse(started(10, 4).should_stop(100, 50, 40))
+        # too early to trust the visit counts
+        self.assertFalse(started(10, 1).should_stop(100, 100, 0))
+
+    def test_extend_when_close(self):
+        manager = started(10, 6.5)
+        self.assertFalse(manager.should_stop(100, 50, 48))
+        self.assertEqual(manager.extensions, 1)
+        self.assertAlmostEqual(manager.soft_deadline, 7.5)
+        self.assertTrue(started(10, 6.5).should_stop(100, 50, 20))
+        # never beyond the hard deadline
+        self.assertTrue(started(10, 9.6).should_stop(100, 50, 50))
+
+
+if __name__ == "__main__":
+    unittest.main()
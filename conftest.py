@@ -0,0 +1,25 @@
+"""
+Every assignment directory is a standalone program whose modules import
+each other by bare name (board, board_util, gtp_connection, ...). When one
+pytest run collects tests from several of these directories, drop the
+modules cached from another directory before a test module is imported, so
+that each test module gets the copies that live next to it.
+"""
+import os
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def pytest_collectstart(collector):
+    if not isinstance(collector, pytest.Module):
+        return
+    directory = os.path.dirname(str(collector.path))
+    for name, module in list(sys.modules.items()):
+        filename = getattr(module, "__file__", None)
+        if filename is None:
+            continue
+        module_dir = os.path.dirname(os.path.abspath(filename))
+        if module_dir.startswith(ROOT + os.sep) and module_dir != directory:
+            del sys.modules[name]